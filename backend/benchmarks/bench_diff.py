@@ -0,0 +1,57 @@
+"""Version diff benchmark.
+
+Times the two-level Myers diff (lines, then words inside changed lines)
+against a flat word-level difflib.SequenceMatcher pass on a synthetic resume
+repeated until it reaches the requested size, with a few words edited, and
+reports how many words each marks as changed.
+
+    python -m benchmarks.bench_diff --size-kb 512
+"""
+import argparse
+import difflib
+import random
+import time
+
+from benchmarks.bench_sections import SAMPLE_RESUME
+from utils.text_diff import diff_stats, diff_texts, word_tokens
+
+
+def edit_words(content: str, edits: int, seed: int = 7) -> str:
+    """Replace a few random words, as an enhancement pass might"""
+    rng = random.Random(seed)
+    tokens = word_tokens(content)
+    for index in rng.sample(range(len(tokens)), min(edits, len(tokens))):
+        tokens[index] = "improved" + tokens[index][len(tokens[index].rstrip()):]
+    return "".join(tokens)
+
+
+def difflib_changed_words(old: str, new: str) -> int:
+    matcher = difflib.SequenceMatcher(None, word_tokens(old), word_tokens(new), autojunk=False)
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume version diffs")
+    parser.add_argument("--size-kb", type=int, default=128, help="Size of the synthetic input")
+    parser.add_argument("--edits", type=int, default=50, help="Words changed in the new version")
+    args = parser.parse_args()
+
+    copies = max(1, args.size_kb * 1024 // len(SAMPLE_RESUME))
+    old = SAMPLE_RESUME * copies
+    new = edit_words(old, args.edits)
+    print(f"input: {len(old) / 1024:.0f} KB, {args.edits} words edited")
+
+    start = time.perf_counter()
+    stats = diff_stats(diff_texts(old, new))
+    myers_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    difflib_words = difflib_changed_words(old, new)
+    difflib_seconds = time.perf_counter() - start
+
+    print(f"difflib word diff: {difflib_seconds * 1000:.1f} ms, {difflib_words} words changed")
+    print(f"two-level myers:   {myers_seconds * 1000:.1f} ms, "
+          f"{stats['deleted_words']} deleted / {stats['inserted_words']} inserted")
+
+
+if __name__ == "__main__":
+    main()
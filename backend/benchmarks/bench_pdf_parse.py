@@ -0,0 +1,113 @@
+"""PDF parsing benchmark.
+
+Times plain PyMuPDF text extraction against the layout-aware PyMuPDF4LLM
+loader on a directory of PDF resumes, shows which path PDF_PARSE_MODE=auto
+would take, and compares the sections detected from each output.
+
+    python -m benchmarks.bench_pdf_parse ./sample_resumes
+
+Put a `<name>.sections.json` file (a list of section names) next to a PDF to
+score both paths against hand-labelled sections instead of the layout output.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import pymupdf
+
+from utils.resume_parser import analyze_pdf_layout, extract_pdf_text, parse_pdf_layout, extract_resume_sections
+
+
+def detected_sections(content: str) -> set:
+    return {name for name, text in extract_resume_sections(content).items() if text.strip()}
+
+
+def load_expected(pdf_path: str):
+    labels_path = os.path.splitext(pdf_path)[0] + ".sections.json"
+    if not os.path.exists(labels_path):
+        return None
+    with open(labels_path, "r", encoding="utf-8") as f:
+        return set(json.load(f))
+
+
+def bench_file(pdf_path: str, repeat: int) -> dict:
+    fast_times, layout_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with pymupdf.open(pdf_path) as doc:
+            layout = analyze_pdf_layout(doc)
+            fast_text = extract_pdf_text(doc)
+        fast_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        layout_text = parse_pdf_layout(pdf_path)
+        layout_times.append(time.perf_counter() - start)
+
+    fast_sections = detected_sections(fast_text)
+    layout_sections = detected_sections(layout_text)
+    expected = load_expected(pdf_path)
+    reference = expected if expected is not None else layout_sections
+    return {
+        "file": os.path.basename(pdf_path),
+        "fast_seconds": statistics.median(fast_times),
+        "layout_seconds": statistics.median(layout_times),
+        "auto_path": "layout" if layout["complex"] else "fast",
+        "layout": layout,
+        "labelled": expected is not None,
+        "fast_matches": fast_sections == reference,
+        "layout_matches": layout_sections == reference,
+        "fast_sections": sorted(fast_sections),
+        "reference_sections": sorted(reference),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fast and layout-aware PDF extraction")
+    parser.add_argument("directory", help="Directory of PDF resumes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file (median is reported)")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(
+        os.path.join(args.directory, name)
+        for name in os.listdir(args.directory)
+        if name.lower().endswith(".pdf")
+    )
+    if not pdf_paths:
+        parser.error(f"no PDF files in {args.directory}")
+
+    results = []
+    print(f"{'file':<40} {'fast ms':>9} {'layout ms':>10} {'auto':>7} {'fast ok':>8} {'layout ok':>10}")
+    for pdf_path in pdf_paths:
+        try:
+            result = bench_file(pdf_path, args.repeat)
+        except Exception as e:
+            print(f"{os.path.basename(pdf_path):<40} error: {str(e)}")
+            continue
+        results.append(result)
+        print(
+            f"{result['file'][:40]:<40} {result['fast_seconds'] * 1000:>9.1f} "
+            f"{result['layout_seconds'] * 1000:>10.1f} {result['auto_path']:>7} "
+            f"{str(result['fast_matches']):>8} {str(result['layout_matches']) if result['labelled'] else '-':>10}"
+        )
+        if not result["fast_matches"]:
+            print(f"    fast: {result['fast_sections']}  reference: {result['reference_sections']}")
+
+    if not results:
+        return
+    fast_total = sum(r["fast_seconds"] for r in results)
+    layout_total = sum(r["layout_seconds"] for r in results)
+    auto_total = sum(r["layout_seconds"] if r["auto_path"] == "layout" else r["fast_seconds"] for r in results)
+    simple = [r for r in results if r["auto_path"] == "fast"]
+    print()
+    print(f"files: {len(results)}, auto fast path: {len(simple)}")
+    print(f"total fast: {fast_total:.2f}s  layout: {layout_total:.2f}s  auto: {auto_total:.2f}s")
+    print(f"auto vs always-layout: {layout_total / auto_total:.1f}x")
+    if simple:
+        agreement = sum(r["fast_matches"] for r in simple) / len(simple)
+        print(f"section agreement on auto fast-path files: {agreement:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Section detection benchmark.
+
+Times the single-pass detector against the previous per-line keyword scan
+on a synthetic resume repeated until it reaches the requested size, and
+checks both against a small set of labelled header and body lines.
+
+    python -m benchmarks.bench_sections --size-kb 2048
+"""
+import argparse
+import time
+
+from utils.section_detector import detect_sections, find_section_headers
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100 | linkedin.com/in/janedoe
+
+PROFESSIONAL SUMMARY
+Backend engineer with 8 years of experience building data platforms.
+
+## Work Experience
+Senior Engineer, Acme Corp (2019 - Present)
+- Experience with AWS, Kafka and PostgreSQL at scale
+- Led projects migrating 40 services to Kubernetes
+
+Education
+B.Sc. Computer Science, MIT
+
+**Skills:**
+Python, Go, SQL, Terraform, Docker
+
+Projects
+- Open source contributor to FastAPI
+"""
+
+# (line, expected section or None for body lines)
+LABELLED_LINES = [
+    ("Experience", "experience"), ("WORK EXPERIENCE", "experience"), ("## Professional Experience", "experience"),
+    ("Relevant Experience", "experience"), ("Berufserfahrung", "experience"), ("Experiencia Laboral", "experience"),
+    ("工作经验", "experience"), ("Education", "education"), ("Formation", "education"), ("学歴", "education"),
+    ("**Skills:**", "skills"), ("Technical Skills", "skills"), ("Skills & Tools", "skills"),
+    ("Compétences", "skills"), ("Projects", "projects"), ("Proyectos", "projects"),
+    ("Contact Information", "contact"), ("Kontakt", "contact"), ("Professional Summary", "summary"),
+    ("Perfil Profesional", "summary"),
+    ("Experience with AWS and Python", None), ("Email: jane@example.com", None), ("Phone: +1 555 0100", None),
+    ("8 years of experience in backend development", None), ("Strong communication skills", None),
+    ("Led projects across three teams", None), ("Contacted vendors to negotiate contracts", None),
+    ("Education technology startup, 2018", None),
+]
+
+
+def legacy_section_for_line(line_lower: str):
+    """The previous detector: substring keywords anywhere in the line"""
+    if any(keyword in line_lower for keyword in ['experience', 'work history', 'employment']):
+        return "experience"
+    elif any(keyword in line_lower for keyword in ['education', 'academic']):
+        return "education"
+    elif any(keyword in line_lower for keyword in ['skills', 'technical skills']):
+        return "skills"
+    elif any(keyword in line_lower for keyword in ['projects', 'portfolio']):
+        return "projects"
+    elif any(keyword in line_lower for keyword in ['contact', 'email', 'phone']):
+        return "contact"
+    return None
+
+
+def legacy_headers(content: str) -> int:
+    return sum(1 for line in content.split("\n") if legacy_section_for_line(line.lower().strip()))
+
+
+def detected_section(line: str):
+    headers = find_section_headers(line)
+    return headers[0][0] if headers else None
+
+
+def time_call(fn, content: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume section detection")
+    parser.add_argument("--size-kb", type=int, default=1024, help="Size of the synthetic input")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per detector (best is reported)")
+    args = parser.parse_args()
+
+    copies = max(1, args.size_kb * 1024 // len(SAMPLE_RESUME))
+    content = SAMPLE_RESUME * copies
+    legacy_seconds = time_call(legacy_headers, content, args.repeat)
+    detector_seconds = time_call(detect_sections, content, args.repeat)
+    size_mb = len(content) / (1024 * 1024)
+    print(f"input: {size_mb:.1f} MB ({copies} resumes)")
+    print(f"legacy per-line scan: {legacy_seconds * 1000:.1f} ms ({size_mb / legacy_seconds:.1f} MB/s)")
+    print(f"single-pass detector: {detector_seconds * 1000:.1f} ms ({size_mb / detector_seconds:.1f} MB/s)")
+
+    legacy_correct = sum(legacy_section_for_line(line.lower()) == expected for line, expected in LABELLED_LINES)
+    detector_correct = sum(detected_section(line) == expected for line, expected in LABELLED_LINES)
+    print(f"labelled lines: legacy {legacy_correct}/{len(LABELLED_LINES)}, "
+          f"detector {detector_correct}/{len(LABELLED_LINES)}")
+    for line, expected in LABELLED_LINES:
+        found = detected_section(line)
+        if found != expected:
+            print(f"    {line!r}: expected {expected}, got {found}")
+
+
+if __name__ == "__main__":
+    main()
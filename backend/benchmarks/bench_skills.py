@@ -0,0 +1,88 @@
+"""Skill extraction benchmark.
+
+Times the Aho-Corasick extractor against a per-alias regex scan (one
+word-bounded search per alias, the usual way keyword matching is written)
+on a synthetic job description repeated until it reaches the requested
+size, and compares the skills each finds (the regex scan also reports
+skills inside longer ones, such as GitHub in "GitHub Actions").
+
+    python -m benchmarks.bench_skills --size-kb 256
+"""
+import argparse
+import re
+import time
+
+from utils.skills_engine import build_automaton, load_taxonomy
+
+SAMPLE_JOB = """Senior Backend Engineer
+
+We are looking for an engineer with 5+ years of Python or Go experience to
+build data services on AWS. You will design REST APIs with FastAPI, run
+workloads on Kubernetes (k8s) with Helm and Terraform, and own PostgreSQL and
+Redis in production. Experience with Kafka, Airflow and dbt is a plus, as is
+familiarity with React and TypeScript for internal tools.
+
+Requirements:
+- Strong SQL and data modelling skills
+- CI/CD with GitHub Actions or Jenkins
+- Observability with Prometheus and Grafana
+- Agile / Scrum teams, code review and TDD
+"""
+
+
+def build_regex_scan(taxonomy: dict):
+    """One compiled pattern per alias, each searched over the whole text"""
+    patterns = []
+    case_sensitive = set(taxonomy.get("case_sensitive", []))
+    for skills in taxonomy["categories"].values():
+        for skill, aliases in skills.items():
+            for alias in [skill, *aliases]:
+                flags = 0 if alias in case_sensitive or len(alias) <= 2 else re.IGNORECASE
+                patterns.append((skill, re.compile(r"(?<![\w+#&])" + re.escape(alias) + r"(?![\w+#&])", flags)))
+
+    def scan(text: str) -> set:
+        return {skill for skill, pattern in patterns if pattern.search(text)}
+    return scan
+
+
+def time_call(fn, content: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill extraction")
+    parser.add_argument("--size-kb", type=int, default=64, help="Size of the synthetic input")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per extractor (best is reported)")
+    args = parser.parse_args()
+
+    taxonomy = load_taxonomy()
+    start = time.perf_counter()
+    automaton = build_automaton(taxonomy)
+    build_seconds = time.perf_counter() - start
+    regex_scan = build_regex_scan(taxonomy)
+    aliases = sum(len(aliases) + 1 for skills in taxonomy["categories"].values() for aliases in skills.values())
+    print(f"taxonomy: {aliases} names and aliases, automaton built in {build_seconds * 1000:.1f} ms")
+
+    copies = max(1, args.size_kb * 1024 // len(SAMPLE_JOB))
+    content = SAMPLE_JOB * copies
+    regex_seconds = time_call(regex_scan, content, args.repeat)
+    automaton_seconds = time_call(automaton.find, content, args.repeat)
+    size_kb = len(content) / 1024
+    print(f"input: {size_kb:.0f} KB ({copies} job descriptions)")
+    print(f"per-alias regex scan: {regex_seconds * 1000:.1f} ms ({size_kb / regex_seconds:.0f} KB/s)")
+    print(f"aho-corasick:         {automaton_seconds * 1000:.1f} ms ({size_kb / automaton_seconds:.0f} KB/s)")
+
+    regex_skills = regex_scan(SAMPLE_JOB)
+    automaton_skills = {match.skill for match in automaton.find(SAMPLE_JOB)}
+    print(f"skills in sample: regex {len(regex_skills)}, automaton {len(automaton_skills)}")
+    for skill in sorted(regex_skills ^ automaton_skills):
+        print(f"    {skill}: only {'regex' if skill in regex_skills else 'automaton'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""API cold start benchmark.
+
+Imports the API in fresh interpreters under `python -X importtime`, reports
+the wall time and the modules with the largest cumulative import time, and
+exits non-zero when the median is over STARTUP_BUDGET_SECONDS, so it can
+gate CI.
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from workflow.startup import STARTUP_BUDGET_SECONDS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_api() -> Tuple[float, str]:
+    """Import main in a fresh interpreter; returns wall seconds and the -X importtime report"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    return seconds, result.stderr
+
+
+def slowest_imports(report: str, top: int) -> List[Tuple[int, str]]:
+    """(cumulative microseconds, module) for the slowest top-level-ish imports"""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [import_api() for _ in range(args.runs)]
+    median = statistics.median(seconds for seconds, _ in runs)
+    print(f"import main: median {median:.3f}s over {args.runs} runs (budget {STARTUP_BUDGET_SECONDS:.2f}s)")
+    print("slowest imports (cumulative):")
+    for micros, module in slowest_imports(runs[-1][1], args.top):
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+
+    if median > STARTUP_BUDGET_SECONDS:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
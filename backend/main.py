@@ -1,15 +1,105 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+# Imported first: starts the startup clock and loads .env
+from workflow.startup import ensure_loaded, mark_startup, start_warm_up, startup_report
+from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse, JSONResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
+from contextlib import asynccontextmanager
+import asyncio
+import importlib
+import json
 import uuid
-from workflow.graph import invoke_with_checkpointer, get_user_config
-from utils.resume_parser import parse_uploaded_file, extract_resume_sections
-from workflow.chains import latex_conversion_chain
+from utils.resume_parser import parse_uploaded_file, extract_resume_sections, UploadTooLargeError, UPLOAD_MAX_BYTES
+from workflow.llm_gateway import LLMOverloadedError, LLMDeadlineExceeded
+from workflow.models import AgentResult, RESPONSE_SCHEMA_VERSION
 from utils.latex_compiler import compile_latex_to_pdf, is_latex_available
+from workflow.pdf_jobs import get_pdf_job_queue, convert_to_latex, SUCCEEDED, FAILED
+from workflow.speculation import start_speculation, speculation_stats, SPECULATIVE_PRECOMPUTE
+from workflow.session_channel import SessionChannel, notify_pdf_job
+from workflow.pdf_export import export_version_pdfs, safe_filename
+from utils.zip_stream import stream_zip
+from utils.skills_engine import skill_gap_report
+from utils.resume_store import store_structured_resume, get_structured_resume, resume_store_maintenance_loop
+from workflow.version_diff import diff_versions, DIFF_GRANULARITIES
+from workflow.response_cache import response_cache
 
-app = FastAPI(title="Resume Optimization API")
+mark_startup("imported")
+
+async def checkpoint_maintenance():
+    # LangGraph's checkpointer is loaded here, off the event loop, instead of at import
+    store = await asyncio.to_thread(importlib.import_module, "workflow.checkpoint_store")
+    await store.checkpoint_maintenance_loop()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Apply checkpoint retention and vacuum the database in the background
+    maintenance_task = asyncio.create_task(checkpoint_maintenance())
+    # Expire old resume versions (uploads, agent outputs, manual edits)
+    resume_retention_task = asyncio.create_task(resume_store_maintenance_loop())
+    # Start the PDF job workers (jobs left from a previous run are picked up again)
+    pdf_jobs = get_pdf_job_queue()
+    pdf_jobs.add_listener(notify_pdf_job)
+    pdf_jobs.start()
+    mark_startup("ready")
+    # Load the workflow graph and parsers in the background so first requests don't wait for them
+    start_warm_up()
+    yield
+    pdf_jobs.stop()
+    maintenance_task.cancel()
+    resume_retention_task.cancel()
+
+# orjson serializes the (large) resume payloads much faster than the stdlib encoder
+app = FastAPI(title="Resume Optimization API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Multipart boundaries and headers on top of the file itself
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject /upload bodies over the limit with 413 before they are spooled
+
+    Content-Length is checked up front; bodies without one (chunked
+    transfer encoding) are counted as they arrive and cut off as soon as
+    they pass the limit.
+    """
+
+    def __init__(self, app, path: str = "/upload", max_bytes: int = UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {UPLOAD_MAX_BYTES / (1024 * 1024):.1f} MB upload limit",
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = self._too_large()
+            await JSONResponse(status_code=error.status_code, content={"detail": error.detail})(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes the response
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(UploadSizeLimitMiddleware)
 
 # Add CORS middleware to allow React frontend to communicate with backend
 app.add_middleware(
@@ -30,76 +120,212 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     message: str
     resume_content: Optional[str] = None
+    enhancement_mode: Optional[str] = None  # "single" or "fanout" (per-section, parallel)
+    include_text: bool = True  # False omits the formatted display text and returns only `result`
+
+class ChatResponse(BaseModel):
+    success: bool
+    schema_version: int = RESPONSE_SCHEMA_VERSION
+    response: str  # formatted display text (empty when include_text is False)
+    intent: str
+    session_id: Optional[str] = None
+    result: Optional[AgentResult] = None
+    memory: Optional[dict] = None  # conversation memory budget usage (see workflow.memory)
 
 class UploadResponse(BaseModel):
     success: bool
     content: str
     sections: dict
     session_id: str
+    speculating: bool = False  # a general enhancement is being precomputed for this resume
+    version_id: Optional[str] = None  # content hash of the resume in the resume store
+    structured: Optional[dict] = None  # parsed fields (see utils.resume_structure.StructuredResume)
 
 class LaTeXDownloadRequest(BaseModel):
     enhanced_content: str
     filename: Optional[str] = "resume"
 
+class PDFJobRequest(BaseModel):
+    enhanced_content: str
+    filename: Optional[str] = "resume"
+    callback_url: Optional[str] = None  # notified on completion; must be on localhost
+
+class ResumeVersion(BaseModel):
+    name: Optional[str] = None
+    content: str
+
+class ExportRequest(BaseModel):
+    versions: List[ResumeVersion]
+    filename: Optional[str] = "resume_versions"
+
+class TranslationBatchRequest(BaseModel):
+    resume_content: str
+    languages: List[str]
+    instructions: Optional[str] = ""
+
+class ResumeVersionRequest(BaseModel):
+    content: str
+    source: Optional[str] = None
+
+class SkillGapRequest(BaseModel):
+    resume_content: str
+    job_description: str
+
+def overloaded_error(error: LLMOverloadedError) -> HTTPException:
+    """Map an LLM gateway rejection to 429 Too Many Requests"""
+    return HTTPException(
+        status_code=429,
+        detail=f"The assistant is busy, please retry shortly: {str(error)}",
+        headers={"Retry-After": str(int(error.retry_after))},
+    )
+
+def deadline_error(error: LLMDeadlineExceeded) -> HTTPException:
+    """Map an LLM call that ran past its deadline to 504 Gateway Timeout"""
+    return HTTPException(
+        status_code=504,
+        detail=f"The assistant took too long to respond, please retry: {str(error)}",
+    )
+
 @app.post("/upload", response_model=UploadResponse)
-async def upload_resume(file: UploadFile = File(...)):
-    """Upload and parse resume file"""
+async def upload_resume(file: UploadFile = File(...), speculate: Optional[bool] = None):
+    """Upload and parse resume file
+
+    With speculate=true (default SPECULATIVE_PRECOMPUTE) the general enhancement
+    is precomputed in the background so a first "enhance my resume" is instant.
+    """
     try:
         # Validate file type
         if not file.filename.endswith(('.pdf', '.docx')):
             raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
         
-        # Parse resume content
-        content = await parse_uploaded_file(file)
+        # Stream to disk with a size limit; identical re-uploads reuse the parsed text
+        content = await parse_uploaded_file(file, cache=response_cache)
         
-        # Extract sections
+        # Extract sections, and parse the resume into fields once for this version
         sections = extract_resume_sections(content)
+        structured = await asyncio.to_thread(store_structured_resume, content, file.filename)
         
         # Generate session ID
         session_id = str(uuid.uuid4())
         
+        speculating = start_speculation(content) if (SPECULATIVE_PRECOMPUTE if speculate is None else speculate) else False
+        
         return UploadResponse(
             success=True,
             content=content,
             sections=sections,
-            session_id=session_id
+            session_id=session_id,
+            speculating=speculating,
+            version_id=structured.version_id,
+            structured=structured.model_dump()
         )
         
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
-@app.post("/chat")
+@app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint for resume optimization"""
     try:
+        await ensure_loaded("workflow.graph")
+        from workflow.graph import invoke_with_checkpointer, get_user_config, initial_chat_state
+        from workflow.memory import memory_usage
+
         # Get user configuration
         config = get_user_config(request.user_id, request.session_id)
         
         # Prepare initial state - let the workflow handle intent classification
-        initial_state = {
-            "user_query": request.message,
-            "resume_content": request.resume_content or "",
-            "messages": [],
-            "current_intent": "",  # Will be set by the workflow's classify_intent node
-            "context": {},  # Will be populated by the workflow
-            "agent_response": "",
-            "resume_versions": []
-        }
+        initial_state = initial_chat_state(
+            request.message,
+            request.resume_content,
+            {"enhancement_mode": request.enhancement_mode}
+        )
         
         # Invoke LangGraph workflow with proper context manager
         result = await invoke_with_checkpointer(initial_state, config)
         print(result)
         
-        return {
-            "success": True,
-            "response": result["agent_response"],
-            "intent": result["current_intent"],
-            "session_id": request.session_id
-        }
+        return ChatResponse(
+            success=True,
+            response=result["agent_response"] if request.include_text else "",
+            intent=result["current_intent"],
+            session_id=request.session_id,
+            result=result.get("agent_result") or None,
+            memory=memory_usage(result)
+        )
         
+    except LLMOverloadedError as e:
+        raise overloaded_error(e)
+    except LLMDeadlineExceeded as e:
+        raise deadline_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.websocket("/ws/{session_id}")
+async def session_channel(websocket: WebSocket, session_id: str, user_id: str):
+    """Session channel for chat turns, partial results, PDF job notices and heartbeats"""
+    await SessionChannel(websocket, user_id, session_id).run()
+
+@app.post("/translate/batch")
+async def translate_batch(request: TranslationBatchRequest):
+    """Translate a resume into several languages, streaming each result as NDJSON"""
+    if not request.resume_content.strip():
+        raise HTTPException(status_code=400, detail="resume_content is required")
+    if not any(lang.strip() for lang in request.languages):
+        raise HTTPException(status_code=400, detail="At least one target language is required")
+
+    await ensure_loaded("workflow.translation")
+    from workflow.translation import translate_to_languages
+
+    async def stream_translations():
+        async for result in translate_to_languages(
+            request.resume_content,
+            request.languages,
+            instructions=request.instructions or ""
+        ):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream_translations(), media_type="application/x-ndjson")
+
+@app.post("/resumes")
+async def store_resume_version(request: ResumeVersionRequest):
+    """Store a resume version (e.g. a manual edit) and return its version id"""
+    if not request.content.strip():
+        raise HTTPException(status_code=400, detail="content is required")
+    structured = await asyncio.to_thread(store_structured_resume, request.content, request.source)
+    return {"version_id": structured.version_id}
+
+@app.get("/resumes/diff")
+async def diff_resume_versions(old: str, new: str, granularity: str = "word", context: Optional[int] = None):
+    """Word or line level edit script between two stored resume versions"""
+    if granularity not in DIFF_GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(DIFF_GRANULARITIES)}")
+    if context is not None and context < 0:
+        raise HTTPException(status_code=400, detail="context must be zero or more lines")
+    diff = await asyncio.to_thread(diff_versions, old, new, granularity, context)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Resume version not found")
+    return diff
+
+@app.get("/resumes/{version_id}/structured")
+async def get_resume_structure(version_id: str):
+    """Structured fields of a stored resume version (from /upload or a chat result's resume_version)"""
+    structured = await asyncio.to_thread(get_structured_resume, version_id)
+    if structured is None:
+        raise HTTPException(status_code=404, detail="Resume version not found")
+    return structured.model_dump()
+
+@app.post("/skills/gaps")
+async def skills_gaps(request: SkillGapRequest):
+    """Compare job description keywords with a resume using the local skills taxonomy"""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="job_description is required")
+    return skill_gap_report(request.resume_content, request.job_description)
+
 @app.post("/download-latex-pdf")
 async def download_latex_pdf(request: LaTeXDownloadRequest):
     """Convert enhanced resume content to LaTeX and compile to PDF"""
@@ -126,14 +352,16 @@ async def download_latex_pdf(request: LaTeXDownloadRequest):
         
         # Convert enhanced content to LaTeX using LLM
         try:
-            latex_chain = latex_conversion_chain()
-            logger.info("LaTeX chain created successfully")
-            
-            latex_response = latex_chain.invoke({
-                "enhanced_content": request.enhanced_content
-            })
-            logger.info(f"LaTeX chain invoked successfully, content length: {len(latex_response.latex_content)}")
+            # Reuses a speculative pre-render of this content when there is one
+            latex_content = await asyncio.to_thread(convert_to_latex, request.enhanced_content)
+            logger.info(f"LaTeX conversion finished, content length: {len(latex_content)}")
             
+        except LLMOverloadedError as e:
+            logger.warning(f"LaTeX chain shed by LLM gateway: {str(e)}")
+            raise overloaded_error(e)
+        except LLMDeadlineExceeded as e:
+            logger.warning(f"LaTeX chain exceeded its deadline: {str(e)}")
+            raise deadline_error(e)
         except Exception as chain_error:
             logger.error(f"Error in LaTeX chain: {str(chain_error)}")
             logger.error(f"Chain error traceback: {traceback.format_exc()}")
@@ -142,7 +370,7 @@ async def download_latex_pdf(request: LaTeXDownloadRequest):
         # Compile LaTeX to PDF
         try:
             logger.info("Starting LaTeX compilation")
-            pdf_bytes = compile_latex_to_pdf(latex_response.latex_content)
+            pdf_bytes = compile_latex_to_pdf(latex_content)
             logger.info(f"LaTeX compilation successful, PDF size: {len(pdf_bytes)} bytes")
             
         except Exception as compile_error:
@@ -168,6 +396,68 @@ async def download_latex_pdf(request: LaTeXDownloadRequest):
         logger.error(f"Full traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Unexpected error generating PDF: {str(e)}")
 
+@app.post("/pdf-jobs", status_code=202)
+async def submit_pdf_job(request: PDFJobRequest):
+    """Queue LaTeX PDF generation and return a job id to poll"""
+    if not is_latex_available():
+        raise HTTPException(
+            status_code=500,
+            detail="LaTeX is not installed on the server. Please install texlive or similar LaTeX distribution."
+        )
+    try:
+        job_id = get_pdf_job_queue().submit(
+            request.enhanced_content,
+            filename=request.filename or "resume",
+            callback_url=request.callback_url
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/pdf-jobs/{job_id}")
+async def get_pdf_job(job_id: str):
+    """Status of a PDF generation job"""
+    job = get_pdf_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    job["result_url"] = f"/pdf-jobs/{job_id}/result" if job["status"] == SUCCEEDED else None
+    return job
+
+@app.get("/pdf-jobs/{job_id}/result")
+async def get_pdf_job_result(job_id: str):
+    """Download the PDF produced by a finished job"""
+    job = get_pdf_job_queue().get(job_id, include_pdf=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {job['error']}")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"PDF job is {job['status']}")
+    return Response(
+        content=job["pdf"],
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={job['filename']}.pdf"}
+    )
+
+@app.post("/export-versions")
+async def export_versions(request: ExportRequest):
+    """Render several resume versions to PDF concurrently and stream them back as a zip"""
+    if not request.versions:
+        raise HTTPException(status_code=400, detail="At least one version is required")
+    if not is_latex_available():
+        raise HTTPException(
+            status_code=500,
+            detail="LaTeX is not installed on the server. Please install texlive or similar LaTeX distribution."
+        )
+    
+    entries = export_version_pdfs([version.model_dump() for version in request.versions])
+    filename = f"{safe_filename(request.filename or '', 'resume_versions')}.zip"
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -175,5 +465,14 @@ async def health_check():
     return {
         "status": "healthy", 
         "service": "resume-optimization-api",
-        "latex_available": latex_available
+        "latex_available": latex_available,
+        "startup": startup_report()
     }
+
+@app.get("/metrics")
+async def metrics():
+    """LLM chain call metrics"""
+    await ensure_loaded("workflow.chains")
+    from workflow.chains import get_chain_metrics
+
+    return {**get_chain_metrics(), "speculation": speculation_stats()}
@@ -0,0 +1,128 @@
+"""Bulk resume ingestion.
+
+Walks a directory for PDF/DOCX resumes, parses them in a process pool and
+streams one JSON line per file. Re-running with the same output file skips
+files that were already processed, so an interrupted run can be resumed.
+
+    python -m utils.bulk_ingest ./ats_export --out ingested.jsonl --workers 8
+    python -m utils.bulk_ingest ./ats_export --out ingested.jsonl --store
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from typing import Iterator, Set
+
+from utils.resume_parser import parse_pdf, parse_docx, extract_resume_sections
+from utils.resume_store import save_resume, resume_hash, RESUME_STORE_PATH
+from utils.resume_structure import parse_structured_resume
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+
+def find_resume_files(root: str) -> Iterator[str]:
+    """Yield PDF/DOCX files under root in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(dirpath, filename)
+
+
+def load_processed(out_path: str, retry_errors: bool = False) -> Set[str]:
+    """Paths already recorded in an existing output file"""
+    processed = set()
+    if not os.path.exists(out_path):
+        return processed
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            if retry_errors and not record.get("success"):
+                continue
+            processed.add(record["path"])
+    return processed
+
+
+def ingest_file(path: str) -> dict:
+    """Parse one resume file; errors are captured in the record, never raised"""
+    start = time.perf_counter()
+    record = {"path": path}
+    try:
+        record["size_bytes"] = os.path.getsize(path)
+        if path.lower().endswith(".pdf"):
+            content = parse_pdf(path)
+        else:
+            content = parse_docx(path)
+        digest = resume_hash(content)
+        record.update({
+            "success": True,
+            "content_hash": digest,
+            "content": content,
+            "sections": extract_resume_sections(content),
+            "structured": parse_structured_resume(content, digest).model_dump(),
+        })
+    except Exception as e:
+        record.update({
+            "success": False,
+            "error": f"{type(e).__name__}: {str(e)}",
+            "traceback": traceback.format_exc(limit=3),
+        })
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a directory of PDF/DOCX resumes into JSONL")
+    parser.add_argument("directory", help="Directory to scan recursively")
+    parser.add_argument("--out", default="ingested.jsonl", help="JSONL output (also the resume log)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--store", action="store_true",
+                        help=f"Save parsed resumes to the local resume store ({RESUME_STORE_PATH}) "
+                             "and omit content from the JSONL")
+    parser.add_argument("--retry-errors", action="store_true", help="Re-process files that failed before")
+    parser.add_argument("--restart", action="store_true", help="Ignore the existing output and start over")
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(args.out):
+        os.remove(args.out)
+    processed = load_processed(args.out, args.retry_errors)
+    pending = [path for path in find_resume_files(args.directory) if path not in processed]
+    total = len(pending)
+    print(f"{len(processed)} files already processed, {total} to go", file=sys.stderr)
+    if not pending:
+        return
+
+    succeeded = failed = 0
+    start = time.perf_counter()
+    with open(args.out, "a", encoding="utf-8") as out, multiprocessing.Pool(args.workers) as pool:
+        try:
+            for done, record in enumerate(pool.imap_unordered(ingest_file, pending, chunksize=4), 1):
+                if record["success"]:
+                    succeeded += 1
+                    if args.store:
+                        save_resume(record.pop("content"), record["sections"], source=record["path"],
+                                    structured=record.pop("structured"))
+                else:
+                    failed += 1
+                # One complete line per file, flushed, so an interrupted run can resume
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+                rate = done / (time.perf_counter() - start)
+                status = "ok " if record["success"] else "ERR"
+                print(f"[{done}/{total}] {status} {record['path']} ({rate:.1f} files/s)", file=sys.stderr)
+        except KeyboardInterrupt:
+            pool.terminate()
+            print("Interrupted; re-run the same command to resume", file=sys.stderr)
+
+    print(f"Done: {succeeded} parsed, {failed} failed in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Process environment.
+
+.env is read once per process, by whichever module needs configuration
+first; variables already set in the environment take precedence.
+"""
+import threading
+
+from dotenv import load_dotenv
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env():
+    """Load .env into os.environ the first time it is called"""
+    global _loaded
+    with _lock:
+        if not _loaded:
+            load_dotenv()
+            _loaded = True
@@ -3,6 +3,7 @@ import tempfile
 import os
 from pathlib import Path
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -108,8 +109,9 @@ def compile_latex_to_pdf(latex_content: str) -> bytes:
             raise
 
 
+@lru_cache(maxsize=None)
 def is_latex_available() -> bool:
-    """Check if LaTeX is available on the system"""
+    """Check if LaTeX is available on the system (checked once per process)"""
     try:
         result = subprocess.run(['pdflatex', '--version'], 
                               capture_output=True, 
@@ -0,0 +1,80 @@
+"""Deterministic LaTeX rendering of a structured resume.
+
+Fills a fixed article-class template from StructuredResume fields, so a
+resume whose structure was parsed reliably gets its PDF without an LLM
+conversion. Only packages from a basic TeX Live install are used.
+"""
+import re
+from typing import List
+
+from utils.resume_structure import ResumeEntry, StructuredResume
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#",
+    "_": r"\_", "{": r"\{", "}": r"\}", "~": r"\textasciitilde{}", "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIALS_RE = re.compile("|".join(re.escape(char) for char in _LATEX_SPECIALS))
+
+PREAMBLE = r"""\documentclass[11pt,a4paper]{article}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[margin=2cm]{geometry}
+\usepackage[hidelinks]{hyperref}
+\setlength{\parindent}{0pt}
+\pagestyle{empty}
+\newcommand{\resumesection}[1]{\vspace{8pt}{\large\bfseries #1}\\[-6pt]\rule{\linewidth}{0.4pt}\par\vspace{2pt}}
+"""
+
+
+def escape_latex(text: str) -> str:
+    return _LATEX_SPECIALS_RE.sub(lambda match: _LATEX_SPECIALS[match.group(0)], text)
+
+
+def is_renderable(resume: StructuredResume) -> bool:
+    """True when the parsed structure is complete enough to render without the LLM"""
+    entries = resume.experience + resume.education + resume.projects
+    return (
+        bool(resume.contact.name)
+        and bool(resume.experience)
+        and all(entry.title for entry in entries)
+    )
+
+
+def _entry(entry: ResumeEntry) -> List[str]:
+    dates = " -- ".join(escape_latex(date) for date in (entry.start, entry.end) if date)
+    subtitle = ", ".join(escape_latex(part) for part in (entry.organization, entry.location) if part)
+    lines = []
+    if entry.title or dates:
+        lines.append(rf"\textbf{{{escape_latex(entry.title or '')}}}\hfill {dates}\\")
+    if subtitle:
+        lines.append(rf"\textit{{{subtitle}}}\\")
+    if entry.bullets:
+        lines.append(r"\begin{itemize}\setlength{\itemsep}{0pt}")
+        lines.extend(rf"\item {escape_latex(bullet)}" for bullet in entry.bullets)
+        lines.append(r"\end{itemize}")
+    lines.append(r"\vspace{4pt}")
+    return lines
+
+
+def render_latex(resume: StructuredResume) -> str:
+    """Render a structured resume as a complete LaTeX document"""
+    contact = resume.contact
+    details = [escape_latex(contact.email) if contact.email else None, escape_latex(contact.phone) if contact.phone else None]
+    details += [rf"\url{{{link}}}" for link in contact.links]
+    lines = [PREAMBLE, r"\begin{document}", r"\begin{center}", rf"{{\LARGE\bfseries {escape_latex(contact.name or '')}}}\\[4pt]"]
+    lines.append(r" \textbar{} ".join(detail for detail in details if detail))
+    lines.append(r"\end{center}")
+
+    if resume.summary:
+        lines.append(r"\resumesection{Summary}")
+        lines.append(escape_latex(resume.summary).replace("\n", "\n\n"))
+    for name, entries in (("Experience", resume.experience), ("Education", resume.education), ("Projects", resume.projects)):
+        if entries:
+            lines.append(rf"\resumesection{{{name}}}")
+            for entry in entries:
+                lines.extend(_entry(entry))
+    if resume.skills:
+        lines.append(r"\resumesection{Skills}")
+        lines.append(", ".join(escape_latex(skill) for skill in resume.skills))
+    lines.append(r"\end{document}")
+    return "\n".join(lines) + "\n"
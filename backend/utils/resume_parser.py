@@ -1,36 +1,152 @@
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
-from langchain_pymupdf4llm import PyMuPDF4LLMLoader
 from fastapi import UploadFile
+import asyncio
 import tempfile
 import os
+import xxhash
+from collections import Counter
+from typing import List, Tuple
+from utils.section_detector import detect_sections
 
-async def parse_uploaded_file(file: UploadFile) -> str:
-    """Parse uploaded PDF/DOCX file and return text content"""
-    
-    # Create temporary file
+# PyMuPDF, pymupdf4llm and the langchain_community loaders are imported in the
+# functions that use them, so importing this module (and the API) stays fast
+
+# auto: plain PyMuPDF text for simple layouts, PyMuPDF4LLM otherwise; fast/layout force one path
+PDF_PARSE_MODE = os.getenv("PDF_PARSE_MODE", "auto").lower()
+PDF_FAST_MAX_PAGES = int(os.getenv("PDF_FAST_MAX_PAGES", "4"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES"""
+
+async def save_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[str, str]:
+    """
+    Stream an upload to a temporary file in chunks
+
+    The content hash is computed while streaming and the copy stops as soon
+    as max_bytes is exceeded, so at most one chunk is held in memory.
+
+    Returns:
+        Tuple[str, str]: (temporary file path, xxh3-128 hex digest of the bytes)
+    """
+    hasher = xxhash.xxh3_128()
+    size = 0
     with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as tmp_file:
-        content = await file.read()
-        tmp_file.write(content)
-        tmp_file_path = tmp_file.name
-    
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File exceeds the {max_bytes / (1024 * 1024):.1f} MB upload limit")
+                hasher.update(chunk)
+                tmp_file.write(chunk)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    return tmp_file.name, hasher.hexdigest()
+
+def parse_file(file_path: str, filename: str) -> str:
+    """Parse a PDF/DOCX file on disk and return text content"""
+    if filename.endswith('.pdf'):
+        return parse_pdf(file_path)
+    elif filename.endswith('.docx'):
+        return parse_docx(file_path)
+    else:
+        raise ValueError("Unsupported file format")
+
+async def parse_uploaded_file(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES, cache=None) -> str:
+    """
+    Parse uploaded PDF/DOCX file and return text content
+
+    If a cache (anything with get/set) is given, re-uploads of identical
+    bytes skip parsing.
+    """
+    tmp_file_path, digest = await save_upload(file, max_bytes)
     try:
-        if file.filename.endswith('.pdf'):
-            return parse_pdf(tmp_file_path)
-        elif file.filename.endswith('.docx'):
-            return parse_docx(tmp_file_path)
-        else:
-            raise ValueError("Unsupported file format")
+        cache_key = ("parsed_upload", digest, os.path.splitext(file.filename)[1].lower())
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        content = await asyncio.to_thread(parse_file, tmp_file_path, file.filename)
+        if cache is not None:
+            cache.set(cache_key, content)
+        return content
     finally:
         os.unlink(tmp_file_path)
 
-def parse_pdf(file_path: str) -> str:
-    """Parse PDF file and return text content"""
+def parse_pdf(file_path: str, mode: str = None) -> str:
+    """Parse PDF file and return text content
+
+    Simple single-column resumes are read with direct PyMuPDF text extraction;
+    multi-column, tabular or long documents go through the slower,
+    layout-aware PyMuPDF4LLM loader.
+    """
+    import pymupdf
+
+    mode = (mode or PDF_PARSE_MODE).lower()
+    if mode != "layout":
+        with pymupdf.open(file_path) as doc:
+            if mode == "fast" or not analyze_pdf_layout(doc)["complex"]:
+                return extract_pdf_text(doc)
+    return parse_pdf_layout(file_path)
+
+def parse_pdf_layout(file_path: str) -> str:
+    """Parse PDF file with layout analysis (markdown output)"""
+    from langchain_pymupdf4llm import PyMuPDF4LLMLoader
+
     loader = PyMuPDF4LLMLoader(file_path)
     docs = loader.load()
     return "\n".join([doc.page_content for doc in docs])
 
+def extract_pdf_text(doc) -> str:
+    """Plain text of an open PyMuPDF document in reading order"""
+    return "\n".join(page.get_text("text", sort=True).strip() for page in doc)
+
+def analyze_pdf_layout(doc) -> dict:
+    """
+    Cheap complexity check on an open PyMuPDF document
+
+    Returns page count, the number of pages with side-by-side text columns
+    and with table-like rows, and whether the layout needs the layout-aware
+    loader.
+    """
+    column_pages = table_pages = 0
+    for page in doc:
+        layout = page.get_text("dict")["blocks"]
+        blocks = [b["bbox"] for b in layout if b["type"] == 0]
+        lines = [line["bbox"] for b in layout if b["type"] == 0 for line in b["lines"]]
+
+        if not blocks:
+            continue
+
+        # Columns: blocks side by side (disjoint horizontally) over a large share
+        # of the text height; short runs such as right-aligned dates don't count
+        text_height = max(b[3] for b in blocks) - min(b[1] for b in blocks)
+        overlap = sum(
+            max(0, min(l[3], r[3]) - max(l[1], r[1]))
+            for l in blocks for r in blocks
+            if r[0] >= l[2]
+        )
+        if overlap > text_height * 0.3:
+            column_pages += 1
+
+        # Tables: several rows holding three or more separate text lines
+        rows = Counter(round(line[3] / 3) for line in lines)
+        if sum(1 for count in rows.values() if count >= 3) >= 3:
+            table_pages += 1
+
+    return {
+        "pages": doc.page_count,
+        "column_pages": column_pages,
+        "table_pages": table_pages,
+        "complex": doc.page_count > PDF_FAST_MAX_PAGES or column_pages > 0 or table_pages > 0,
+    }
+
 def parse_docx(file_path: str) -> str:
     """Parse DOCX file and return text content"""
+    from langchain_community.document_loaders import Docx2txtLoader
+
     loader = Docx2txtLoader(file_path)
     docs = loader.load()
     return "\n".join([doc.page_content for doc in docs])
@@ -46,24 +162,24 @@ def extract_resume_sections(content: str) -> dict:
         "projects": ""
     }
     
-    # Simple section extraction logic
-    lines = content.split('\n')
-    current_section = "summary"
-    
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        if any(keyword in line_lower for keyword in ['experience', 'work history', 'employment']):
-            current_section = "experience"
-        elif any(keyword in line_lower for keyword in ['education', 'academic']):
-            current_section = "education"
-        elif any(keyword in line_lower for keyword in ['skills', 'technical skills']):
-            current_section = "skills"
-        elif any(keyword in line_lower for keyword in ['projects', 'portfolio']):
-            current_section = "projects"
-        elif any(keyword in line_lower for keyword in ['contact', 'email', 'phone']):
-            current_section = "contact"
-        else:
-            sections[current_section] += line + "\n"
+    # Header lines are dropped; repeated sections are concatenated
+    for span in detect_sections(content):
+        body = content[span.body_start:span.end]
+        if body and not body.endswith("\n"):
+            body += "\n"
+        sections[span.section] += body
     
     return sections
+
+def split_resume_sections(content: str) -> List[Tuple[str, str]]:
+    """
+    Split resume text into ordered (section, text) chunks
+
+    Header lines are kept with their section and document order is preserved,
+    so the chunks joined with newlines reproduce the original text.
+    """
+    # Every span but the last ends with the newline before the next header
+    return [
+        (span.section, content[span.start:span.end - 1] if span.end < len(content) else content[span.start:span.end])
+        for span in detect_sections(content)
+    ]
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import xxhash
+from utils.env import load_env
+
+from utils.resume_structure import STRUCTURE_VERSION, StructuredResume, parse_structured_resume
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+RESUME_STORE_PATH = os.getenv("RESUME_STORE_PATH", "resume_store.db")
+# Structured resumes kept in memory in front of the store
+STRUCTURE_CACHE_SIZE = int(os.getenv("STRUCTURE_CACHE_SIZE", "256"))
+# Retention: versions older than the TTL are deleted, and only the newest RESUME_STORE_MAX_VERSIONS kept (0 disables either)
+RESUME_STORE_TTL_HOURS = float(os.getenv("RESUME_STORE_TTL_HOURS", "720"))
+RESUME_STORE_MAX_VERSIONS = int(os.getenv("RESUME_STORE_MAX_VERSIONS", "20000"))
+RESUME_STORE_PRUNE_INTERVAL_MINUTES = float(os.getenv("RESUME_STORE_PRUNE_INTERVAL_MINUTES", "60"))
+
+
+def resume_hash(content: str) -> str:
+    """Content hash identifying a resume version"""
+    return xxhash.xxh3_128_hexdigest(content.encode("utf-8"))
+
+
+# Store files whose schema has been set up by this process
+_ready_paths = set()
+_schema_lock = threading.Lock()
+
+
+def _setup_schema(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resumes (
+            content_hash TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            sections TEXT,
+            source TEXT,
+            created_at REAL NOT NULL
+        )
+        """
+    )
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(resumes)")}
+    if "structured" not in columns:
+        # Stores created before structured resumes were cached
+        conn.execute("ALTER TABLE resumes ADD COLUMN structured TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS resumes_created_at ON resumes (created_at)")
+    conn.commit()
+
+
+def _connect(db_path: str = RESUME_STORE_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if db_path not in _ready_paths:
+        # Once per process and file, not on every lookup
+        with _schema_lock:
+            if db_path not in _ready_paths:
+                _setup_schema(conn)
+                _ready_paths.add(db_path)
+    return conn
+
+
+def save_resume(content: str, sections: Optional[dict] = None, source: Optional[str] = None,
+                structured: Optional[dict] = None, db_path: str = RESUME_STORE_PATH) -> str:
+    """Store a resume version (idempotent) and return its content hash"""
+    digest = resume_hash(content)
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO resumes (content_hash, content, sections, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (digest, content, json.dumps(sections) if sections is not None else None, source, time.time()),
+            )
+            if structured is not None:
+                conn.execute(
+                    "UPDATE resumes SET structured = ? WHERE content_hash = ?",
+                    (json.dumps(structured, ensure_ascii=False), digest),
+                )
+    finally:
+        conn.close()
+    return digest
+
+
+def get_resume(content_hash: str, db_path: str = RESUME_STORE_PATH) -> Optional[dict]:
+    """Return a stored resume version by content hash, or None"""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM resumes WHERE content_hash = ?", (content_hash,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    resume = dict(row)
+    resume["sections"] = json.loads(resume["sections"]) if resume["sections"] else None
+    resume["structured"] = json.loads(resume["structured"]) if resume["structured"] else None
+    return resume
+
+
+def prune_resumes(ttl_hours: float = RESUME_STORE_TTL_HOURS, max_versions: int = RESUME_STORE_MAX_VERSIONS,
+                  db_path: str = RESUME_STORE_PATH) -> dict:
+    """
+    Apply the retention policy to the store
+
+    Args:
+        ttl_hours: Delete versions stored longer ago than this (0 keeps them)
+        max_versions: Keep only this many of the newest versions (0 keeps all)
+        db_path: Store file
+
+    Returns:
+        dict: Versions deleted by age and by the version cap
+    """
+    conn = _connect(db_path)
+    try:
+        with conn:
+            expired = conn.execute(
+                "DELETE FROM resumes WHERE created_at < ?", (time.time() - ttl_hours * 3600,)
+            ).rowcount if ttl_hours > 0 else 0
+            over_cap = conn.execute(
+                "DELETE FROM resumes WHERE content_hash IN "
+                "(SELECT content_hash FROM resumes ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (max_versions,),
+            ).rowcount if max_versions > 0 else 0
+    finally:
+        conn.close()
+    return {"expired": expired, "over_cap": over_cap}
+
+
+async def resume_store_maintenance_loop(interval_minutes: float = RESUME_STORE_PRUNE_INTERVAL_MINUTES):
+    """Background task applying the retention policy every interval_minutes"""
+    if interval_minutes <= 0:
+        return
+    while True:
+        try:
+            stats = await asyncio.to_thread(prune_resumes)
+            if stats["expired"] or stats["over_cap"]:
+                logger.info(f"Resume store retention: {stats}")
+        except sqlite3.Error as e:
+            logger.error(f"Resume store retention failed: {str(e)}")
+        await asyncio.sleep(interval_minutes * 60)
+
+
+_structures: "OrderedDict[str, StructuredResume]" = OrderedDict()
+_structures_lock = threading.Lock()
+
+
+def _remember(structured: StructuredResume):
+    with _structures_lock:
+        _structures[structured.version_id] = structured
+        _structures.move_to_end(structured.version_id)
+        while len(_structures) > STRUCTURE_CACHE_SIZE:
+            _structures.popitem(last=False)
+
+
+def _stored_structure(resume: Optional[dict]) -> Optional[StructuredResume]:
+    structured = (resume or {}).get("structured")
+    if not structured or structured.get("structure_version") != STRUCTURE_VERSION:
+        return None
+    return StructuredResume.model_validate(structured)
+
+
+def structured_resume(content: str) -> StructuredResume:
+    """
+    Return the structured form of resume text, parsing it only once
+
+    Memoized in memory only; nothing is written to the store, so agents can
+    call it on intermediate outputs. Use store_structured_resume for versions
+    that clients keep.
+    """
+    digest = resume_hash(content)
+    with _structures_lock:
+        cached = _structures.get(digest)
+        if cached is not None:
+            _structures.move_to_end(digest)
+            return cached
+    structured = parse_structured_resume(content, digest)
+    _remember(structured)
+    return structured
+
+
+def store_structured_resume(content: str, source: Optional[str] = None,
+                            db_path: str = RESUME_STORE_PATH) -> StructuredResume:
+    """
+    Parse a resume version and save it to the store with its structure
+
+    For uploaded, user-submitted and final agent versions, which clients can
+    later fetch or diff by version id.
+    """
+    structured = structured_resume(content)
+    try:
+        save_resume(content, source=source, structured=structured.model_dump(), db_path=db_path)
+    except sqlite3.Error as e:
+        # The structure is still usable; the version just can't be fetched by id
+        logger.warning(f"Could not store structured resume {structured.version_id}: {str(e)}")
+    return structured
+
+
+def get_structured_resume(version_id: str, db_path: str = RESUME_STORE_PATH) -> Optional[StructuredResume]:
+    """Return the structure of a stored resume version by content hash, or None"""
+    resume = get_resume(version_id, db_path)
+    if resume is None:
+        return None
+    structured = _stored_structure(resume)
+    if structured is not None:
+        _remember(structured)
+        return structured
+    # Stored by an older parser
+    return store_structured_resume(resume["content"], resume["source"], db_path)
@@ -0,0 +1,243 @@
+"""Structured resume model.
+
+Resume text is parsed once into fields (contact details, roles with dates
+and bullets, education, projects, skills) without an LLM call. Sections come
+from the section detector; entries inside a section are split at header
+lines (a title, organization or date range) followed by their bullets.
+Results are memoized per resume version and saved with stored versions (see
+utils.resume_store.store_structured_resume).
+"""
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from utils.section_detector import detect_sections
+from utils.skills_engine import extract_skills
+
+# Bump when parsing changes so stored structures are rebuilt
+STRUCTURE_VERSION = 1
+
+ENTRY_SECTIONS = ("experience", "education", "projects")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+)?(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)\d{{2}}"
+_PRESENT = r"present|current|now|today|ongoing|heute|actualidad|actual|aujourd'hui|atual|oggi"
+_DATE_RANGE_RE = re.compile(
+    rf"\(?\b(?P<start>{_DATE})\s*(?:-|–|—|to|until|bis|a|à)\s*(?P<end>{_DATE}|{_PRESENT})\b\)?",
+    re.IGNORECASE
+)
+_SINGLE_DATE_RE = re.compile(rf"\(?\b(?P<date>{_DATE})\b\)?", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦‣●○■□➢➤►–—]|\d{1,2}[.)])\s+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{7,}\d(?![\w/])")
+_LINK_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com)/[\w./-]+|https?://[^\s|,)]+", re.IGNORECASE)
+# Separators between title, organization and location on an entry header line; commas
+# only split a line that has none of the others ("Software Engineer, Acme")
+_FIELD_SPLIT_RE = re.compile(r"\s+(?:@|at|–|—|-)\s+|\s*[|·•]\s*|\t+")
+_COMMA_SPLIT_RE = re.compile(r"\s*,\s*")
+_SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*")
+_MARKDOWN_RE = re.compile(r"^#+\s*|\*\*|__")
+
+_TITLE_WORDS = re.compile(
+    r"\b(engineer|developer|manager|analyst|lead|director|intern|consultant|scientist|designer|architect|"
+    r"specialist|officer|head|vp|president|founder|administrator|coordinator|associate|assistant|"
+    r"researcher|programmer|technician|owner|principal|staff)\b",
+    re.IGNORECASE
+)
+_DEGREE_WORDS = re.compile(
+    r"\b(b\.?\s?sc|m\.?\s?sc|b\.?\s?a|m\.?\s?a|b\.?\s?s|m\.?\s?s|b\.?\s?tech|m\.?\s?tech|b\.?\s?e|m\.?\s?e|"
+    r"ph\.?\s?d|mba|bachelor|master|doctor|diploma|degree|certificate|associate|licenciatura|abitur)\b",
+    re.IGNORECASE
+)
+
+
+class ContactInfo(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    links: List[str] = Field(default_factory=list)
+
+
+class ResumeEntry(BaseModel):
+    """A role, degree or project: header fields plus bullets"""
+    title: Optional[str] = None  # job title, degree or project name
+    organization: Optional[str] = None  # company or institution
+    location: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    bullets: List[str] = Field(default_factory=list)
+    header: str = ""  # the entry's header lines as written
+
+
+class ResumeSection(BaseModel):
+    name: str
+    header: Optional[str] = None
+    text: str  # header line included; joined with "\n" the sections reproduce the resume
+
+
+class StructuredResume(BaseModel):
+    version_id: str
+    structure_version: int = STRUCTURE_VERSION
+    contact: ContactInfo = Field(default_factory=ContactInfo)
+    summary: str = ""
+    experience: List[ResumeEntry] = Field(default_factory=list)
+    education: List[ResumeEntry] = Field(default_factory=list)
+    projects: List[ResumeEntry] = Field(default_factory=list)
+    skills: List[str] = Field(default_factory=list)  # as listed in the skills section
+    keywords: Dict[str, dict] = Field(default_factory=dict)  # taxonomy skills anywhere: {skill: {category, count}}
+    sections: List[ResumeSection] = Field(default_factory=list)
+
+    def section_texts(self) -> List[tuple]:
+        """Ordered (section, text) chunks, as utils.resume_parser.split_resume_sections returns"""
+        return [(section.name, section.text) for section in self.sections]
+
+
+def _clean(line: str) -> str:
+    return _MARKDOWN_RE.sub("", line).strip()
+
+
+def parse_contact(lines: List[str]) -> tuple:
+    """Contact details from the opening lines; returns (ContactInfo, lines that were not contact details)"""
+    contact = ContactInfo()
+    remaining = []
+    for line in lines:
+        text = _clean(line)
+        found = False
+        if contact.email is None and (match := _EMAIL_RE.search(text)):
+            contact.email, found = match.group(0), True
+        for link in _LINK_RE.findall(text):
+            if "@" not in link and link not in contact.links:
+                contact.links.append(link.rstrip("."))
+                found = True
+        if contact.phone is None and (match := _PHONE_RE.search(_EMAIL_RE.sub("", text))):
+            contact.phone, found = " ".join(match.group(0).split()), True
+        if found:
+            continue
+        if (
+            contact.name is None and not remaining and text and len(text) <= 60
+            and len(text.split()) <= 5 and not any(char.isdigit() for char in text)
+        ):
+            contact.name = text
+            continue
+        remaining.append(line)
+    return contact, remaining
+
+
+def _split_header(header: str, section: str) -> dict:
+    fields = {}
+    if match := _DATE_RANGE_RE.search(header):
+        fields["start"], fields["end"] = match.group("start"), match.group("end")
+        header = header[:match.start()] + " | " + header[match.end():]
+    elif section == "education" and (match := _SINGLE_DATE_RE.search(header)):
+        fields["end"] = match.group("date")
+        header = header[:match.start()] + " | " + header[match.end():]
+
+    parts = [part.strip(" (),") for part in _FIELD_SPLIT_RE.split(header) if part.strip(" (),")]
+    if len(parts) == 1:
+        parts = [part.strip(" ()") for part in _COMMA_SPLIT_RE.split(parts[0]) if part.strip(" ()")]
+    if section == "education":
+        # Put the degree first whichever way round the line is written
+        parts.sort(key=lambda part: not _DEGREE_WORDS.search(part))
+    elif section == "experience" and len(parts) > 1 and _TITLE_WORDS.search(parts[1]) and not _TITLE_WORDS.search(parts[0]):
+        parts[0], parts[1] = parts[1], parts[0]
+    for key, part in zip(("title", "organization", "location"), parts):
+        fields[key] = part
+    return fields
+
+
+def _entry_markers(text: str, section: str) -> set:
+    """What a header line holds that an entry has only one of: dates, and a degree in education"""
+    markers = set()
+    if _DATE_RANGE_RE.search(text) or (section == "education" and _SINGLE_DATE_RE.search(text)):
+        markers.add("dates")
+    if section == "education" and _DEGREE_WORDS.search(text):
+        markers.add("degree")
+    return markers
+
+
+def parse_entries(body: str, section: str) -> List[ResumeEntry]:
+    """
+    Split a section body into entries
+
+    A non-bullet line starts a new entry when the current one already has
+    bullets, or already has the dates (or degree) the line brings. Long
+    sentences are treated as description bullets, and lowercase lines
+    continue the previous bullet.
+    """
+    entries: List[dict] = []
+    for line in body.split("\n"):
+        text = _clean(line)
+        if not text:
+            continue
+        current = entries[-1] if entries else None
+        bullet = _BULLET_RE.match(line)
+        is_description = len(text) > 100 or (text.endswith(".") and len(text.split()) > 6)
+        if bullet or (current and current["header"] and is_description):
+            if current is None:
+                current = {"header": [], "bullets": [], "markers": set()}
+                entries.append(current)
+            current["bullets"].append(_clean(line[bullet.end():]) if bullet else text)
+        elif current and current["bullets"] and text[0].islower():
+            current["bullets"][-1] += " " + text
+        else:
+            markers = _entry_markers(text, section)
+            if current is None or current["bullets"] or markers & current["markers"]:
+                current = {"header": [], "bullets": [], "markers": set()}
+                entries.append(current)
+            current["header"].append(text)
+            current["markers"] |= markers
+
+    parsed = []
+    for entry in entries:
+        header = " | ".join(entry["header"])
+        parsed.append(ResumeEntry(header=header, bullets=entry["bullets"], **_split_header(header, section)))
+    return parsed
+
+
+def parse_skills(body: str) -> List[str]:
+    """Skill items as listed, with "Category:" prefixes and bullets removed"""
+    skills = []
+    for line in body.split("\n"):
+        text = _clean(_BULLET_RE.sub("", line))
+        if ":" in text:
+            text = text.split(":", 1)[1]
+        for item in _SKILL_SPLIT_RE.split(text):
+            item = item.strip(" .")
+            if item and len(item) <= 60 and item not in skills:
+                skills.append(item)
+    return skills
+
+
+def parse_structured_resume(content: str, version_id: str = "") -> StructuredResume:
+    """
+    Parse resume text into a StructuredResume
+
+    Args:
+        content: Resume text as returned by parse_uploaded_file
+        version_id: Content hash of the text (see utils.resume_store.resume_hash)
+
+    Returns:
+        StructuredResume: Fields found in the text; missing ones stay empty
+    """
+    spans = detect_sections(content)
+    resume = StructuredResume(version_id=version_id, keywords=extract_skills(content))
+    summary_lines, contact_lines = [], []
+    for index, span in enumerate(spans):
+        # Every span but the last ends with the newline before the next header
+        end = span.end - 1 if span.end < len(content) else span.end
+        resume.sections.append(ResumeSection(name=span.section, header=span.header, text=content[span.start:end]))
+        body = content[span.body_start:span.end]
+        if span.section in ENTRY_SECTIONS:
+            getattr(resume, span.section).extend(parse_entries(body, span.section))
+        elif span.section == "skills":
+            resume.skills.extend(skill for skill in parse_skills(body) if skill not in resume.skills)
+        elif span.section == "contact" or (index == 0 and span.header is None):
+            # Text before the first header usually holds the name and contact line
+            contact_lines.extend(body.split("\n"))
+        elif span.section == "summary":
+            summary_lines.extend(body.split("\n"))
+
+    resume.contact, leftover = parse_contact(contact_lines)
+    resume.summary = "\n".join(_clean(line) for line in leftover + summary_lines if _clean(line))
+    return resume
@@ -0,0 +1,181 @@
+"""Resume section detection.
+
+All header aliases (English plus Spanish, French, German, Portuguese,
+Italian, Chinese and Japanese) are compiled into one multiline regex, so a
+resume is scanned in a single pass. A line only counts as a header when the
+alias makes up the whole line, optionally with a few modifier words
+("Professional Experience", "Skills & Tools"), markdown markers or a
+trailing colon. Body lines that merely mention a keyword ("Experience with
+AWS", "Email: jane@example.com") are not headers.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+SECTION_ALIASES: Dict[str, List[str]] = {
+    "contact": [
+        "contact", "contact information", "contact info", "contact details",
+        "personal information", "personal details",
+        "contacto", "datos personales", "datos de contacto",
+        "coordonnées", "informations personnelles",
+        "kontakt", "kontaktdaten", "persönliche daten", "persönliche angaben",
+        "contato", "dados pessoais",
+        "contatti", "dati personali",
+        "联系方式", "个人信息", "連絡先",
+    ],
+    "summary": [
+        "summary", "professional summary", "career summary", "profile", "professional profile",
+        "objective", "career objective", "about me",
+        "resumen", "resumen profesional", "perfil", "perfil profesional", "objetivo", "sobre mí",
+        "résumé", "profil", "profil professionnel", "objectif", "à propos",
+        "zusammenfassung", "kurzprofil", "über mich",
+        "resumo", "resumo profissional", "sobre mim",
+        "profilo", "profilo professionale", "sommario", "obiettivo",
+        "个人简介", "自我评价", "職務要約", "自己pr",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "work history",
+        "employment", "employment history", "career history",
+        "experiencia", "experiencia laboral", "experiencia profesional",
+        "expérience", "expérience professionnelle", "expériences professionnelles", "parcours professionnel",
+        "berufserfahrung", "erfahrung", "beruflicher werdegang", "werdegang",
+        "experiência", "experiência profissional",
+        "esperienza", "esperienze", "esperienza professionale", "esperienze lavorative",
+        "工作经验", "工作经历", "職歴", "職務経歴",
+    ],
+    "education": [
+        "education", "academic background", "academics",
+        "educación", "formación", "formación académica",
+        "formation", "éducation", "études",
+        "ausbildung", "bildung", "studium", "bildungsweg",
+        "educação", "formação", "formação acadêmica",
+        "istruzione", "formazione",
+        "教育背景", "教育经历", "学歴",
+    ],
+    "skills": [
+        "skills", "technical skills", "competencies", "core competencies", "technologies",
+        "tech stack", "expertise",
+        "habilidades", "competencias", "conocimientos",
+        "compétences", "compétences techniques",
+        "kenntnisse", "fähigkeiten", "kompetenzen",
+        "competências",
+        "competenze", "abilità",
+        "技能", "专业技能", "スキル",
+    ],
+    "projects": [
+        "projects", "portfolio", "personal projects",
+        "proyectos", "projets", "projekte", "projetos", "progetti",
+        "项目经验", "项目", "プロジェクト",
+    ],
+}
+
+# Headers with this confidence or more start a section
+MIN_HEADER_CONFIDENCE = 0.5
+
+_WORD = r"[^\W\d_]+"
+# "Skills & Tools", "Education and Certifications", "Formación y Certificados"
+_CONJUNCTIONS = "and|y|et|und|e"
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex matching any of words, built as a prefix trie
+
+    Python's re tries alternatives one by one; factoring shared prefixes
+    means a body line is usually rejected after its first character instead
+    of after trying every alias.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        optional = "" in node
+        branches = [
+            (r"[ \t]+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+_ALIAS_SECTIONS = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+_HEADER_RE = re.compile(
+    r"^[ \t]*(?P<lead>#{1,6}[ \t]+|[*_]{1,2})?[ \t]*"
+    rf"(?P<pre>(?:{_WORD}[ \t]+){{0,2}}?)"
+    rf"(?P<alias>{_trie_pattern(list(_ALIAS_SECTIONS))})s?\b"
+    rf"(?P<post>(?:(?:[ \t]*[&/,+][ \t]*|[ \t]+(?:{_CONJUNCTIONS})[ \t]+){_WORD}(?:[ \t]+{_WORD})?)?)"
+    r"[ \t]*[*_]{0,2}[ \t]*(?P<colon>[:：])?[ \t]*[*_]{0,2}[ \t\r]*$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+
+class SectionSpan(NamedTuple):
+    """One section of a resume as character offsets into the original text"""
+    section: str
+    start: int  # header line start (or 0 for text before the first header)
+    body_start: int  # first character after the header line
+    end: int
+    header: Optional[str]
+    confidence: float  # 0.0 when there is no header line
+
+
+def _header_confidence(match: re.Match) -> float:
+    """Score a header line: exact aliases and formatting cues raise confidence"""
+    header = match.group(0).strip()
+    modified = bool(match.group("pre") or match.group("post"))
+    confidence = 0.6 if modified else 0.9
+    if match.group("lead") or match.group("colon") or header.endswith(("*", "_")) or header.isupper():
+        confidence += 0.1
+    elif modified and any(word[0].islower() for word in header.split() if len(word) > 3):
+        # "Strong leadership skills" reads like prose rather than a heading
+        confidence -= 0.2
+    return round(min(confidence, 1.0), 2)
+
+
+def find_section_headers(content: str, min_confidence: float = MIN_HEADER_CONFIDENCE) -> List[tuple]:
+    """Return (section, start, end, header text, confidence) for each header line in content"""
+    headers = []
+    for match in _HEADER_RE.finditer(content):
+        confidence = _header_confidence(match)
+        if confidence >= min_confidence:
+            section = _ALIAS_SECTIONS[" ".join(match.group("alias").lower().split())]
+            headers.append((section, match.start(), match.end(), match.group(0).strip(), confidence))
+    return headers
+
+
+def detect_sections(content: str, min_confidence: float = MIN_HEADER_CONFIDENCE) -> List[SectionSpan]:
+    """
+    Split resume text into contiguous section spans in one pass
+
+    Text before the first header is a "summary" span with confidence 0.0.
+    The spans cover the whole text, so content[span.start:span.end] for all
+    spans concatenates back to content.
+
+    Args:
+        content: Resume text
+        min_confidence: Ignore header lines scoring below this
+
+    Returns:
+        List[SectionSpan]: Spans in document order
+    """
+    spans = []
+    headers = find_section_headers(content, min_confidence)
+    first_start = headers[0][1] if headers else len(content)
+    if not headers or first_start > 0:
+        spans.append(SectionSpan("summary", 0, 0, first_start, None, 0.0))
+
+    ends = [header[1] for header in headers[1:]] + [len(content)]
+    for (section, start, header_end, header, confidence), end in zip(headers, ends):
+        # body starts after the header's newline
+        spans.append(SectionSpan(section, start, min(header_end + 1, end), end, header, confidence))
+    return spans
@@ -0,0 +1,186 @@
+"""Local ATS keyword extraction.
+
+Every skill name and alias in the taxonomy (skills_taxonomy.json, or
+SKILLS_TAXONOMY_FILE) is loaded into one Aho-Corasick automaton, so a resume
+or job description is scanned once, in time linear in its length, however
+large the taxonomy is. Matches must sit on word boundaries and are normalized
+to the canonical skill name ("k8s" -> "Kubernetes").
+"""
+import json
+import os
+import threading
+from collections import Counter, deque
+from typing import Dict, List, NamedTuple, Optional
+
+SKILLS_TAXONOMY_FILE = os.getenv(
+    "SKILLS_TAXONOMY_FILE",
+    os.path.join(os.path.dirname(__file__), "skills_taxonomy.json")
+)
+
+# Characters that continue a term: a match followed or preceded by one is part of a longer word
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#&")
+# Single-letter skills ("C", "R") also reject these neighbours, as in "C-level" or "R'n'B"
+_LETTER_NEIGHBOURS = _WORD_CHARS | frozenset("-'")
+
+
+class SkillMatch(NamedTuple):
+    skill: str  # canonical name
+    category: str
+    start: int
+    end: int
+
+
+class SkillsAutomaton:
+    """Aho-Corasick automaton over lowercased skill aliases"""
+
+    def __init__(self, aliases: Dict[str, tuple], case_sensitive: frozenset = frozenset()):
+        """
+        Args:
+            aliases: alias -> (canonical skill, category)
+            case_sensitive: Aliases that only match with their exact case ("Go", "R", "Spark")
+        """
+        self.case_sensitive = case_sensitive
+        # Trie as parallel lists: goto transitions, failure links and outputs per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+
+        for alias, target in aliases.items():
+            state = 0
+            for char in alias.lower():
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append((len(alias), alias, target))
+
+        # Breadth-first failure links; outputs of the failure state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """Return non-overlapping skill matches in text, preferring the longest at each position"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters (e.g. "İ") lowercase to two; keep offsets aligned with text
+            lowered = "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        state = 0
+        for index, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = index + 1
+            for length, alias, (skill, category) in out[state]:
+                start = end - length
+                neighbours = _LETTER_NEIGHBOURS if length == 1 else _WORD_CHARS
+                if start > 0 and lowered[start - 1] in neighbours and alias[0].lower() in _WORD_CHARS:
+                    continue
+                if end < len(lowered) and lowered[end] in neighbours and alias[-1].lower() in _WORD_CHARS:
+                    continue
+                if alias in self.case_sensitive and text[start:end] != alias:
+                    continue
+                candidates.append(SkillMatch(skill, category, start, end))
+
+        # Leftmost-longest: "Google Cloud Platform" wins over "Google Cloud"
+        candidates.sort(key=lambda match: (match.start, match.start - match.end))
+        matches, covered = [], 0
+        for match in candidates:
+            if match.start >= covered:
+                matches.append(match)
+                covered = match.end
+        return matches
+
+
+def load_taxonomy(path: str = SKILLS_TAXONOMY_FILE) -> dict:
+    """
+    Read a skills taxonomy
+
+    The file maps categories to {canonical skill: [aliases]} under
+    "categories", and lists aliases that must match case-exactly (common
+    English words such as "Go" or "Spark") under "case_sensitive". Aliases of
+    one or two characters are always case-sensitive.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_automaton(taxonomy: dict) -> SkillsAutomaton:
+    aliases = {}
+    for category, skills in taxonomy["categories"].items():
+        for skill, skill_aliases in skills.items():
+            for alias in [skill, *skill_aliases]:
+                aliases.setdefault(alias, (skill, category))
+    case_sensitive = set(taxonomy.get("case_sensitive", []))
+    case_sensitive.update(alias for alias in aliases if len(alias) <= 2)
+    return SkillsAutomaton(aliases, frozenset(case_sensitive))
+
+
+_automaton: Optional[SkillsAutomaton] = None
+_automaton_lock = threading.Lock()
+
+
+def get_skills_automaton() -> SkillsAutomaton:
+    """Return the process-wide automaton, built from the taxonomy on first use"""
+    global _automaton
+    with _automaton_lock:
+        if _automaton is None:
+            _automaton = build_automaton(load_taxonomy())
+        return _automaton
+
+
+def extract_skills(text: str) -> Dict[str, dict]:
+    """Canonical skills mentioned in text, with category and mention count, in order of first mention"""
+    counts = Counter()
+    categories = {}
+    for match in get_skills_automaton().find(text):
+        counts[match.skill] += 1
+        categories.setdefault(match.skill, match.category)
+    return {skill: {"category": categories[skill], "count": counts[skill]} for skill in categories}
+
+
+def skill_gap_report(resume_content: str, job_description: str, resume_skills: Optional[Dict[str, dict]] = None) -> dict:
+    """
+    Compare the skills a job description asks for with those on a resume
+
+    resume_skills, when given, is extract_skills(resume_content) computed
+    earlier (e.g. StructuredResume.keywords), and the resume isn't rescanned.
+
+    Returns:
+        dict: matched and missing job skills (most-mentioned first), skills on
+        the resume the job doesn't mention, per-category missing skills, and
+        coverage, the share of job skills found on the resume (0-100)
+    """
+    job_skills = extract_skills(job_description)
+    if resume_skills is None:
+        resume_skills = extract_skills(resume_content)
+    ranked = sorted(job_skills, key=lambda skill: -job_skills[skill]["count"])
+    matched = [skill for skill in ranked if skill in resume_skills]
+    missing = [skill for skill in ranked if skill not in resume_skills]
+
+    missing_by_category: Dict[str, List[str]] = {}
+    for skill in missing:
+        missing_by_category.setdefault(job_skills[skill]["category"], []).append(skill)
+    return {
+        "job_skills": ranked,
+        "matched": matched,
+        "missing": missing,
+        "extra": [skill for skill in resume_skills if skill not in job_skills],
+        "missing_by_category": missing_by_category,
+        "coverage": round(100 * len(matched) / len(ranked)) if ranked else None,
+    }
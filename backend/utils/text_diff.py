@@ -0,0 +1,233 @@
+"""Line and word level text diffs.
+
+Myers' O((N+M)D) algorithm, in its linear-space form, finds the shortest
+edit script between two token sequences. Texts are first diffed line by
+line; with word granularity only the changed line blocks are diffed again
+word by word, so long documents with a few edits stay cheap. Edit scripts are lists of
+[tag, text] ops: "=" unchanged, "-" deleted, "+" inserted. Joining the "="
+and "-" texts gives the old text, "=" and "+" the new one.
+"""
+import os
+import re
+from collections import Counter
+from typing import List, Optional, Sequence
+
+# Edit distance (per block) beyond which a block is reported as replaced wholesale
+DIFF_MAX_EDITS = int(os.getenv("DIFF_MAX_EDITS", "1000"))
+
+# A word with its trailing whitespace, so tokens concatenate back to the text
+_WORD_TOKEN = re.compile(r"\s+|\S+\s*")
+
+
+def word_tokens(text: str) -> List[str]:
+    return _WORD_TOKEN.findall(text)
+
+
+def myers_edits(a: Sequence, b: Sequence, max_edits: int = DIFF_MAX_EDITS) -> Optional[List[tuple]]:
+    """
+    Shortest edit script turning a into b
+
+    Linear-space variant: the middle snake of the shortest path is found by
+    searching from both ends, and the halves on either side are solved
+    recursively, so memory stays O(N+M) instead of growing with the square
+    of the edit distance.
+
+    Returns:
+        Optional[List[tuple]]: (tag, index) pairs in order, where tag is "="
+        (a[index] kept), "-" (a[index] deleted) or "+" (b[index] inserted);
+        None if more than max_edits edits are needed
+    """
+    if _min_edits(a, b) > max_edits:
+        # Not even the tokens the two sides share could bring it under the limit
+        return None
+    edits = []
+    if not _diff_range(a, b, 0, len(a), 0, len(b), edits, max_edits):
+        return None
+    return edits
+
+
+def _min_edits(a: Sequence, b: Sequence) -> int:
+    """Lower bound on the edit distance: tokens without a counterpart on the other side"""
+    counts = Counter(a)
+    counts.subtract(b)
+    return sum(abs(count) for count in counts.values())
+
+
+def _diff_range(a: Sequence, b: Sequence, a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+                edits: List[tuple], max_edits: Optional[int] = None) -> bool:
+    """Append the edits turning a[a_lo:a_hi] into b[b_lo:b_hi]; False if max_edits is exceeded"""
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        edits.append(("=", a_lo))
+        a_lo, b_lo = a_lo + 1, b_lo + 1
+    suffix = 0
+    while a_hi - suffix > a_lo and b_hi - suffix > b_lo and a[a_hi - 1 - suffix] == b[b_hi - 1 - suffix]:
+        suffix += 1
+    a_end, b_end = a_hi - suffix, b_hi - suffix
+
+    if a_lo == a_end:
+        edits.extend(("+", index) for index in range(b_lo, b_end))
+    elif b_lo == b_end:
+        edits.extend(("-", index) for index in range(a_lo, a_end))
+    else:
+        snake = _middle_snake(a, b, a_lo, a_end, b_lo, b_end, max_edits)
+        if snake is None or (max_edits is not None and snake[0] > max_edits):
+            return False
+        _, x, y, u, v = snake
+        _diff_range(a, b, a_lo, x, b_lo, y, edits)
+        edits.extend(("=", index) for index in range(x, u))
+        _diff_range(a, b, u, a_end, v, b_end, edits)
+    edits.extend(("=", index) for index in range(a_end, a_hi))
+    return True
+
+
+def _middle_snake(a: Sequence, b: Sequence, a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+                  max_edits: Optional[int] = None) -> Optional[tuple]:
+    """
+    Middle snake of the shortest edit path between a[a_lo:a_hi] and b[b_lo:b_hi]
+
+    Returns:
+        Optional[tuple]: (edit distance, x, y, u, v), the snake running from
+        a[x]/b[y] to a[u]/b[v]; None once the search passes max_edits
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta % 2 == 1
+    limit = (n + m + 1) // 2
+    if max_edits is not None:
+        limit = min(limit, (max_edits + 1) // 2)
+    # Indexed by diagonal; negative diagonals wrap to the end of the list
+    forward = [0] * (2 * limit + 3)
+    backward = [0] * (2 * limit + 3)
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            x = forward[k + 1] if k == -d or (k != d and forward[k - 1] < forward[k + 1]) else forward[k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x, y = x + 1, y + 1
+            forward[k] = x
+            if odd and abs(delta - k) <= d - 1 and x + backward[delta - k] >= n:
+                return 2 * d - 1, a_lo + start_x, b_lo + start_y, a_lo + x, b_lo + y
+        # The backward search runs on the reversed sequences; its diagonal k is forward diagonal delta - k
+        for k in range(-d, d + 1, 2):
+            x = backward[k + 1] if k == -d or (k != d and backward[k - 1] < backward[k + 1]) else backward[k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x, y = x + 1, y + 1
+            backward[k] = x
+            if not odd and abs(delta - k) <= d and x + forward[delta - k] >= n:
+                return 2 * d, a_hi - x, b_hi - y, a_hi - start_x, b_hi - start_y
+    return None
+
+
+def diff_tokens(a: Sequence[str], b: Sequence[str], max_edits: int = DIFF_MAX_EDITS) -> List[list]:
+    """Edit script between two token lists, merged into [tag, text] runs"""
+    # Common prefix and suffix never need the search
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < len(a) - prefix and suffix < len(b) - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    middle_a, middle_b = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+
+    ops = [["=", "".join(a[:prefix])]]
+    edits = myers_edits(middle_a, middle_b, max_edits)
+    if edits is None:
+        ops += [["-", "".join(middle_a)], ["+", "".join(middle_b)]]
+    else:
+        ops += [[tag, middle_b[index] if tag == "+" else middle_a[index]] for tag, index in edits]
+    ops.append(["=", "".join(a[len(a) - suffix:])])
+    return merge_ops(ops)
+
+
+def merge_ops(ops: List[list]) -> List[list]:
+    """Join adjacent ops with the same tag and drop empty ones; deletions go before insertions"""
+    merged = []
+    for tag, text in ops:
+        if not text:
+            continue
+        if merged and merged[-1][0] == tag:
+            merged[-1][1] += text
+        elif tag == "-" and len(merged) > 1 and merged[-1][0] == "+" and merged[-2][0] == "-":
+            merged[-2][1] += text
+        elif tag == "-" and merged and merged[-1][0] == "+":
+            merged.insert(len(merged) - 1, [tag, text])
+        else:
+            merged.append([tag, text])
+    return merged
+
+
+def diff_texts(old: str, new: str, granularity: str = "word", max_edits: int = DIFF_MAX_EDITS) -> List[list]:
+    """
+    Diff two texts
+
+    Args:
+        old: Earlier text
+        new: Later text
+        granularity: "line" or "word" (changed lines are refined word by word)
+        max_edits: Per-block edit distance limit
+
+    Returns:
+        List[list]: [tag, text] ops
+    """
+    line_ops = diff_tokens(old.splitlines(keepends=True), new.splitlines(keepends=True), max_edits)
+    if granularity != "word":
+        return line_ops
+
+    ops = []
+    index = 0
+    while index < len(line_ops):
+        tag, text = line_ops[index]
+        if tag == "-" and index + 1 < len(line_ops) and line_ops[index + 1][0] == "+":
+            # A replaced block of lines: refine it word by word
+            ops += diff_tokens(word_tokens(text), word_tokens(line_ops[index + 1][1]), max_edits)
+            index += 2
+            continue
+        ops.append([tag, text])
+        index += 1
+    return merge_ops(ops)
+
+
+def elide_unchanged(ops: List[list], context: int) -> List[list]:
+    """
+    Keep only context lines of unchanged text around each change
+
+    Partial lines next to a change are kept in addition. Longer unchanged
+    runs are cut, and the skipped part is given as ["~", number of lines
+    skipped].
+    """
+    elided = []
+    for index, (tag, text) in enumerate(ops):
+        if tag != "=":
+            elided.append([tag, text])
+            continue
+        lines = text.splitlines(keepends=True)
+        keep_head = keep_tail = 0
+        if index > 0:
+            # The rest of a line a change ends in is always kept
+            keep_head = context + (0 if ops[index - 1][1].endswith("\n") else 1)
+        if index < len(ops) - 1:
+            keep_tail = context + (0 if text.endswith("\n") else 1)
+        if len(lines) <= keep_head + keep_tail + 1:
+            elided.append([tag, text])
+            continue
+        head, tail = "".join(lines[:keep_head]), "".join(lines[len(lines) - keep_tail:])
+        elided += [["=", head], ["~", len(lines) - keep_head - keep_tail], ["=", tail]]
+    return [op for op in elided if op[1]]
+
+
+def diff_stats(ops: List[list]) -> dict:
+    """Word counts per tag and the share of the old text kept"""
+    counts = {"=": 0, "-": 0, "+": 0}
+    for tag, text in ops:
+        if tag in counts:
+            counts[tag] += len(text.split())
+    total = counts["="] * 2 + counts["-"] + counts["+"]
+    return {
+        "unchanged_words": counts["="],
+        "deleted_words": counts["-"],
+        "inserted_words": counts["+"],
+        "similarity": round(counts["="] * 2 / total, 3) if total else 1.0,
+    }
@@ -0,0 +1,45 @@
+import zipfile
+from typing import AsyncIterator, Tuple
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands written bytes back to the caller.
+
+    It has no seek/tell, so zipfile writes entries with data descriptors and
+    the archive can be streamed without knowing sizes up front.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """
+    Build a zip archive incrementally
+
+    Args:
+        entries: Async iterator of (archive name, file bytes), in the order they become available
+
+    Yields:
+        bytes: Archive data as soon as each entry is written, then the central directory
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for name, data in entries:
+            archive.writestr(name, data)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    yield buffer.drain()
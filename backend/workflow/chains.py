@@ -1,7 +1,9 @@
-from langchain.prompts import ChatPromptTemplate 
-from dotenv import load_dotenv
-from langchain_tavily import TavilySearch
-from workflow.helpers import get_chat_model
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from utils.env import load_env
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from workflow.helpers import get_chat_model, get_model_profile
 from workflow.prompts import (
     system_prompt,
     intent_prompt,
@@ -9,91 +11,229 @@ from workflow.prompts import (
     enhancement_prompt,
     research_prompt,
     latex_conversion_prompt,
-    translate_prompt)
+    translate_prompt,
+    section_translate_prompt,
+    memory_summary_prompt)
 
 from workflow.models import (
     IntentResponse,
     JobMatchingResponse,
     EnhancementResponse,
     ResearchResponse,
-    TranslateResponse
+    TranslateResponse,
+    ConversationSummary
 )
 from workflow.latex_models import LaTeXResponse
-load_dotenv()
+from workflow.singleflight import SingleFlight, input_key
+from workflow.llm_gateway import Priority, get_gateway
+from workflow.token_budget import count_prompt_tokens, plan_max_tokens, record_budget, budget_stats
+from workflow.metrics import record_latency, latency_summary, latency_percentile
+from workflow.hedging import (
+    hedged_call,
+    hedging_stats,
+    LLM_HEDGING,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES
+)
+load_env()
+
+CHAIN_NAMES = (
+    "intent", "job_matching", "enhancement", "research",
+    "translate", "translate_section", "latex_conversion", "memory_summary"
+)
+
+# Shared by every chain so duplicate in-flight requests run the LLM once
+_single_flight = SingleFlight()
+
+
+class ManagedChain:
+    """
+    Chain wrapper applied to every LLM chain.
+
+    Concurrent calls with identical input are coalesced into one execution.
+    Each execution counts its prompt tokens and plans max_tokens from the
+    input size, is admitted through the shared LLM gateway and bounded by
+    the profile's deadline, and is hedged when LLM_HEDGING is on and the
+    call is interactive. Latency is recorded under the chain name.
+    """
+
+    def __init__(self, name: str, prompt, structure, priority: Priority = Priority.INTERACTIVE):
+        self.name = name
+        self.prompt = prompt
+        # Builds the model-specific part of the chain for a given client
+        self.structure = structure
+        self.priority = priority
+        self.profile = get_model_profile(name)
+        self._chains = {}
+
+    def _chain(self, max_tokens: int, hedge: bool = False):
+        key = (max_tokens, hedge)
+        if key not in self._chains:
+            self._chains[key] = self.prompt | self.structure(get_chat_model(self.name, hedge, max_tokens))
+        return self._chains[key]
+
+    def _plan(self, inputs: dict) -> tuple:
+        """Count the prompt and pick max_tokens; returns (max_tokens, gateway token estimate)"""
+        prompt_tokens = count_prompt_tokens(self.prompt, inputs)
+        max_tokens, capped = plan_max_tokens(self.name, inputs, self.profile, prompt_tokens)
+        record_budget(self.name, prompt_tokens, max_tokens, capped)
+        return max_tokens, prompt_tokens + max_tokens
+
+    def _hedge_after(self):
+        """Seconds before hedging this call, or None to not hedge"""
+        if not LLM_HEDGING or self.priority != Priority.INTERACTIVE:
+            return None
+        return latency_percentile(self.name, LLM_HEDGE_PERCENTILE, min_samples=LLM_HEDGE_MIN_SAMPLES)
+
+    def _queue_deadline(self, remaining: float) -> float:
+        return min(remaining, get_gateway().queue_deadline)
+
+    def _timed(self, name: str, fn):
+        start = time.perf_counter()
+        result = fn()
+        record_latency(name, time.perf_counter() - start)
+        return result
+
+    def _call(self, hedge: bool, inputs: dict, plan: tuple, config, kwargs, remaining: float):
+        chain = self._chain(plan[0], hedge)
+        name = f"{self.name}_hedge" if hedge else self.name
+        # Queued no longer than the call's own deadline, so an abandoned call isn't admitted later
+        return get_gateway().call(
+            lambda: self._timed(name, lambda: chain.invoke(inputs, config, **kwargs)),
+            priority=self.priority,
+            tokens=plan[1],
+            deadline=self._queue_deadline(remaining),
+        )
+
+    def invoke(self, inputs: dict, config=None, **kwargs):
+        key = input_key(self.name, inputs)
+
+        def execute():
+            plan = self._plan(inputs)
+            return hedged_call(
+                self.name,
+                lambda remaining: self._call(False, inputs, plan, config, kwargs, remaining),
+                self.profile["deadline_seconds"],
+                hedge=lambda remaining: self._call(True, inputs, plan, config, kwargs, remaining),
+                hedge_after=self._hedge_after(),
+                priority=self.priority,
+            )
+
+        return _single_flight.run(self.name, key, execute)
+
+    def batch(self, inputs: List[dict], max_concurrency: int = 4) -> list:
+        """Invoke the chain for each input concurrently, preserving order"""
+        if not inputs:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(inputs)))) as pool:
+            return list(pool.map(self.invoke, inputs))
+
+
+def get_chain_metrics() -> dict:
+    """Return per-chain latency and call counts, gateway admission stats, hedge counters and token budgets"""
+    return {
+        "latency": latency_summary(),
+        "models": {name: get_model_profile(name)["model_id"] for name in CHAIN_NAMES},
+        "single_flight": _single_flight.stats(),
+        "gateway": get_gateway().stats(),
+        "hedging": hedging_stats(),
+        "token_budget": budget_stats(),
+    }
 
-def intent_chain():
-    llm = get_chat_model()
-    structured_llm = llm.with_structured_output(IntentResponse)
+
+def intent_chain(priority: Priority = Priority.INTERACTIVE):
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system",system_prompt),
+            # Earlier turns of the conversation, bounded by workflow.memory
+            MessagesPlaceholder("history", optional=True),
             ("user",intent_prompt)
         ]
     )
-    return prompt | structured_llm 
+    return ManagedChain("intent", prompt, lambda llm: llm.with_structured_output(IntentResponse), priority)
 
 
-def job_matching_chain():
-    llm = get_chat_model()
-    structured_llm = llm.with_structured_output(JobMatchingResponse)
+def job_matching_chain(priority: Priority = Priority.INTERACTIVE):
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system",system_prompt),
+            # Earlier turns of the conversation, bounded by workflow.memory
+            MessagesPlaceholder("history", optional=True),
             ("user",job_matching_prompt)
         ]
     )
-    return prompt | structured_llm 
+    return ManagedChain("job_matching", prompt, lambda llm: llm.with_structured_output(JobMatchingResponse), priority)
 
 
-def enhancement_chain():
-    llm = get_chat_model()
-    structured_llm = llm.with_structured_output(EnhancementResponse)
+def enhancement_chain(priority: Priority = Priority.INTERACTIVE):
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system",system_prompt),
+            # Earlier turns of the conversation, bounded by workflow.memory
+            MessagesPlaceholder("history", optional=True),
             ("user",enhancement_prompt)
         ]
     )
-    return prompt | structured_llm 
-
-
-def research_chain():
-    llm = get_chat_model()
-    
-    # Equip LLM with Tavily search tool
-    search_tool = TavilySearch(max_results=5)
-    llm_with_tools = llm.bind_tools([search_tool])
-    
-    # Then get structured output
-    structured_llm = llm_with_tools.with_structured_output(ResearchResponse)
-    
+    return ManagedChain("enhancement", prompt, lambda llm: llm.with_structured_output(EnhancementResponse), priority)
+
+
+def research_chain(priority: Priority = Priority.INTERACTIVE):
+    def structure(llm):
+        # Imported here: only company research needs Tavily, and it is slow to load
+        from langchain_tavily import TavilySearch
+
+        # Equip LLM with Tavily search tool
+        search_tool = TavilySearch(max_results=5)
+        llm_with_tools = llm.bind_tools([search_tool])
+
+        # Then get structured output
+        return llm_with_tools.with_structured_output(ResearchResponse)
+
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system",system_prompt),
+            # Earlier turns of the conversation, bounded by workflow.memory
+            MessagesPlaceholder("history", optional=True),
             ("user",research_prompt)
         ]
     )
-    return prompt | structured_llm
+    return ManagedChain("research", prompt, structure, priority)
 
-def translate_chain():
-    llm = get_chat_model()
-    structured_llm = llm.with_structured_output(TranslateResponse)
+def translate_chain(priority: Priority = Priority.INTERACTIVE):
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system",system_prompt),
             ("user",translate_prompt)
         ]
     )
-    return prompt | structured_llm
+    return ManagedChain("translate", prompt, lambda llm: llm.with_structured_output(TranslateResponse), priority)
 
 
-def latex_conversion_chain():
-    llm = get_chat_model()
-    structured_llm = llm.with_structured_output(LaTeXResponse)
+def section_translate_chain(priority: Priority = Priority.INTERACTIVE):
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system",system_prompt),
+            ("user",section_translate_prompt)
+        ]
+    )
+    return ManagedChain("translate_section", prompt, lambda llm: llm.with_structured_output(TranslateResponse), priority)
+
+
+def latex_conversion_chain(priority: Priority = Priority.BACKGROUND):
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system", "You are a LaTeX expert creating professional resume documents."),
             ("user", latex_conversion_prompt)
         ]
     )
-    return prompt | structured_llm
+    return ManagedChain("latex_conversion", prompt, lambda llm: llm.with_structured_output(LaTeXResponse), priority)
+
+
+def memory_summary_chain(priority: Priority = Priority.INTERACTIVE):
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "You summarize conversations accurately and concisely."),
+            ("user", memory_summary_prompt)
+        ]
+    )
+    return ManagedChain("memory_summary", prompt, lambda llm: llm.with_structured_output(ConversationSummary), priority)
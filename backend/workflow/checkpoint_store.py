@@ -0,0 +1,395 @@
+"""Checkpoint storage: backend selection, compressed serialization, retention
+and vacuuming for the LangGraph checkpointer.
+
+CHECKPOINT_BACKEND selects where conversation state lives:
+- sqlite: a single SQLite file (CHECKPOINT_DB_PATH), one host
+- sharded_sqlite: CHECKPOINT_SHARDS SQLite files picked by a stable hash of the
+  thread id, so several uvicorn workers on one host rarely contend for a writer
+- postgres: a shared network store at CHECKPOINT_DB_URI for multi-node deployments
+  (optional dependency: pip install -r requirements-postgres.txt)
+- memory: an in-process stand-in for the network store, for tests and local runs.
+  State lives in the worker process: it is lost on restart and not shared
+  between uvicorn workers, so use it with a single worker only
+
+Run `python -m workflow.checkpoint_store report` to see database size by thread,
+or `python -m workflow.checkpoint_store compact` to apply the retention policy.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import IO, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, every process runs maintenance
+    fcntl = None
+
+import aiosqlite
+import xxhash
+import zstandard
+from utils.env import load_env
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "resume_agent.db")
+CHECKPOINT_SHARDS = int(os.getenv("CHECKPOINT_SHARDS", "8"))
+CHECKPOINT_DB_URI = os.getenv("CHECKPOINT_DB_URI", "")
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "10"))
+CHECKPOINT_THREAD_TTL_HOURS = float(os.getenv("CHECKPOINT_THREAD_TTL_HOURS", "168"))
+CHECKPOINT_VACUUM_INTERVAL_MINUTES = float(os.getenv("CHECKPOINT_VACUUM_INTERVAL_MINUTES", "60"))
+# Set to false to run `compact` from cron instead; otherwise one API process on the host runs it
+CHECKPOINT_MAINTENANCE = os.getenv("CHECKPOINT_MAINTENANCE", "true").lower() == "true"
+CHECKPOINT_COMPRESSION_LEVEL = int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", "3"))
+CHECKPOINT_COMPRESSION = os.getenv("CHECKPOINT_COMPRESSION", "zstd").lower()
+
+CHECKPOINT_BACKENDS = ("sqlite", "sharded_sqlite", "postgres", "memory")
+
+ZSTD_SUFFIX = "+zstd"
+
+# Offset between the UUID epoch (1582-10-15) and the Unix epoch, in 100ns units
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+class ZstdSerializer(JsonPlusSerializer):
+    """JsonPlus serializer that zstd-compresses checkpoint blobs.
+
+    The compressed payload is tagged by appending "+zstd" to the stored type,
+    so rows written before compression was enabled still load unchanged.
+    """
+
+    def __init__(self, level: int = CHECKPOINT_COMPRESSION_LEVEL, **kwargs):
+        super().__init__(**kwargs)
+        self.level = level
+
+    def dumps_typed(self, obj) -> Tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+        if type_ in ("null", "empty") or not data:
+            return type_, data
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        return f"{type_}{ZSTD_SUFFIX}", compressed
+
+    def loads_typed(self, data: Tuple[str, bytes]):
+        type_, payload = data
+        if type_.endswith(ZSTD_SUFFIX):
+            type_ = type_[: -len(ZSTD_SUFFIX)]
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        return super().loads_typed((type_, payload))
+
+
+def get_checkpoint_serde():
+    """Return the serializer configured by CHECKPOINT_COMPRESSION"""
+    if CHECKPOINT_COMPRESSION == "zstd":
+        return ZstdSerializer()
+    return JsonPlusSerializer()
+
+
+@asynccontextmanager
+async def open_sqlite_checkpointer(db_path: str = CHECKPOINT_DB_PATH):
+    """Open an AsyncSqliteSaver on db_path using the configured serializer"""
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute("PRAGMA busy_timeout = 5000")
+        yield AsyncSqliteSaver(conn, serde=get_checkpoint_serde())
+
+
+def shard_db_path(thread_id: str, shards: int = CHECKPOINT_SHARDS, db_path: str = CHECKPOINT_DB_PATH) -> str:
+    """Return the SQLite shard file for a thread (stable across processes)"""
+    return _shard_path(db_path, xxhash.xxh64_intdigest(thread_id) % shards)
+
+
+def _shard_path(db_path: str, shard: int) -> str:
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.{shard}{ext or '.db'}"
+
+
+def checkpoint_db_paths() -> List[str]:
+    """Return every SQLite file used by the configured backend"""
+    if CHECKPOINT_BACKEND == "sqlite":
+        return [CHECKPOINT_DB_PATH]
+    if CHECKPOINT_BACKEND == "sharded_sqlite":
+        return [_shard_path(CHECKPOINT_DB_PATH, shard) for shard in range(CHECKPOINT_SHARDS)]
+    return []
+
+
+# Shared by every request in the process, like a connection to a network store
+_memory_saver = None
+_postgres_ready = False
+
+
+@asynccontextmanager
+async def open_checkpointer(thread_id: str):
+    """Open the checkpointer configured by CHECKPOINT_BACKEND for thread_id"""
+    global _memory_saver, _postgres_ready
+
+    if CHECKPOINT_BACKEND == "sqlite":
+        async with open_sqlite_checkpointer(CHECKPOINT_DB_PATH) as checkpointer:
+            yield checkpointer
+    elif CHECKPOINT_BACKEND == "sharded_sqlite":
+        async with open_sqlite_checkpointer(shard_db_path(thread_id)) as checkpointer:
+            yield checkpointer
+    elif CHECKPOINT_BACKEND == "postgres":
+        try:
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        except ImportError:
+            raise RuntimeError(
+                "CHECKPOINT_BACKEND=postgres requires langgraph-checkpoint-postgres "
+                "(pip install -r requirements-postgres.txt)"
+            )
+        if not CHECKPOINT_DB_URI:
+            raise RuntimeError("CHECKPOINT_BACKEND=postgres requires CHECKPOINT_DB_URI")
+        async with AsyncPostgresSaver.from_conn_string(
+            CHECKPOINT_DB_URI, serde=get_checkpoint_serde()
+        ) as checkpointer:
+            if not _postgres_ready:
+                await checkpointer.setup()
+                _postgres_ready = True
+            yield checkpointer
+    elif CHECKPOINT_BACKEND == "memory":
+        if _memory_saver is None:
+            _memory_saver = InMemorySaver(serde=get_checkpoint_serde())
+        yield _memory_saver
+    else:
+        raise ValueError(
+            f"Unknown CHECKPOINT_BACKEND '{CHECKPOINT_BACKEND}', expected one of {CHECKPOINT_BACKENDS}"
+        )
+
+
+def checkpoint_id_timestamp(checkpoint_id: str) -> Optional[float]:
+    """Return the Unix time encoded in a LangGraph (uuid6) checkpoint id"""
+    try:
+        value = int(checkpoint_id.replace("-", ""), 16)
+    except (AttributeError, ValueError):
+        return None
+    if (value >> 76) & 0xF != 6:
+        return None
+    uuid_time = ((value >> 80) << 12) | ((value >> 64) & 0x0FFF)
+    return (uuid_time - _UUID_EPOCH_OFFSET) / 1e7
+
+
+def _tables_exist(conn: sqlite3.Connection) -> bool:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('checkpoints', 'writes')"
+    ).fetchall()
+    return len(rows) == 2
+
+
+def compact_checkpoints(
+    db_path: str = CHECKPOINT_DB_PATH,
+    keep_last: int = CHECKPOINT_KEEP_LAST,
+    ttl_hours: float = CHECKPOINT_THREAD_TTL_HOURS,
+    vacuum: bool = False,
+) -> dict:
+    """
+    Apply the retention policy to a checkpoint database
+
+    Args:
+        db_path: SQLite checkpoint database
+        keep_last: Checkpoints to keep per thread and namespace (0 keeps all)
+        ttl_hours: Delete threads whose newest checkpoint is older than this (0 disables)
+        vacuum: Reclaim free pages and truncate the WAL afterwards
+
+    Returns:
+        dict: Counts of expired threads and deleted checkpoints/writes
+    """
+    stats = {"expired_threads": 0, "deleted_checkpoints": 0, "deleted_writes": 0}
+    if not os.path.exists(db_path):
+        return stats
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if not _tables_exist(conn):
+            return stats
+
+        if ttl_hours > 0:
+            cutoff = time.time() - ttl_hours * 3600
+            latest = conn.execute(
+                "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+            ).fetchall()
+            expired = [
+                (thread_id,)
+                for thread_id, checkpoint_id in latest
+                if (ts := checkpoint_id_timestamp(checkpoint_id)) is not None and ts < cutoff
+            ]
+            if expired:
+                with conn:
+                    stats["deleted_writes"] += conn.executemany(
+                        "DELETE FROM writes WHERE thread_id = ?", expired
+                    ).rowcount
+                    stats["deleted_checkpoints"] += conn.executemany(
+                        "DELETE FROM checkpoints WHERE thread_id = ?", expired
+                    ).rowcount
+                stats["expired_threads"] = len(expired)
+
+        if keep_last > 0:
+            # Checkpoint ids are uuid6, so lexical order is creation order
+            stale = """
+                SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                    SELECT thread_id, checkpoint_ns, checkpoint_id,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY thread_id, checkpoint_ns
+                               ORDER BY checkpoint_id DESC
+                           ) AS rank
+                    FROM checkpoints
+                ) WHERE rank > ?
+            """
+            with conn:
+                conn.execute("CREATE TEMP TABLE stale AS " + stale, (keep_last,))
+                stats["deleted_writes"] += conn.execute(
+                    "DELETE FROM writes WHERE (thread_id, checkpoint_ns, checkpoint_id) IN "
+                    "(SELECT thread_id, checkpoint_ns, checkpoint_id FROM stale)"
+                ).rowcount
+                stats["deleted_checkpoints"] += conn.execute(
+                    "DELETE FROM checkpoints WHERE (thread_id, checkpoint_ns, checkpoint_id) IN "
+                    "(SELECT thread_id, checkpoint_ns, checkpoint_id FROM stale)"
+                ).rowcount
+                conn.execute("DROP TABLE stale")
+
+        if vacuum:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+    return stats
+
+
+def report_checkpoint_usage(db_path: str = CHECKPOINT_DB_PATH, limit: Optional[int] = None) -> List[dict]:
+    """Return per-thread checkpoint counts and stored bytes, largest first"""
+    if not os.path.exists(db_path):
+        return []
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if not _tables_exist(conn):
+            return []
+        rows = conn.execute(
+            """
+            SELECT c.thread_id, c.checkpoints, c.bytes + COALESCE(w.bytes, 0), COALESCE(w.writes, 0), c.latest
+            FROM (
+                SELECT thread_id, COUNT(*) AS checkpoints, MAX(checkpoint_id) AS latest,
+                       SUM(LENGTH(checkpoint) + LENGTH(metadata)) AS bytes
+                FROM checkpoints GROUP BY thread_id
+            ) c
+            LEFT JOIN (
+                SELECT thread_id, COUNT(*) AS writes, SUM(LENGTH(value)) AS bytes
+                FROM writes GROUP BY thread_id
+            ) w ON w.thread_id = c.thread_id
+            ORDER BY 3 DESC
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+
+    usage = [
+        {
+            "thread_id": thread_id,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "bytes": size or 0,
+            "last_active": checkpoint_id_timestamp(latest),
+        }
+        for thread_id, checkpoints, size, writes, latest in rows
+    ]
+    return usage[:limit] if limit else usage
+
+
+def _maintenance_lock(db_path: str = CHECKPOINT_DB_PATH) -> Optional[IO]:
+    """Try to take the host-wide maintenance lock; the open file holds it until the process exits.
+
+    VACUUM needs an exclusive lock on the database, so with several uvicorn
+    workers only the one holding this lock compacts. If it exits, another
+    worker takes over at its next interval.
+    """
+    lock_file = open(f"{db_path}.maintenance.lock", "a")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+async def checkpoint_maintenance_loop(interval_minutes: float = CHECKPOINT_VACUUM_INTERVAL_MINUTES):
+    """Background task applying retention and vacuuming every interval_minutes, in one process per host"""
+    db_paths = checkpoint_db_paths()
+    if not CHECKPOINT_MAINTENANCE or interval_minutes <= 0 or not db_paths:
+        return
+    lock = None
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        if lock is None:
+            lock = _maintenance_lock()
+            if lock is None:
+                continue
+        for db_path in db_paths:
+            try:
+                stats = await asyncio.to_thread(compact_checkpoints, db_path, vacuum=True)
+                logger.info(f"Checkpoint maintenance on {db_path}: {stats}")
+            except Exception as e:
+                logger.error(f"Checkpoint maintenance failed on {db_path}: {str(e)}")
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and compact the checkpoint database")
+    parser.add_argument("--db", help="SQLite checkpoint database (default: every file of the configured backend)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="Show database size by thread")
+    report.add_argument("--limit", type=int, default=20, help="Number of threads to show (0 for all)")
+
+    compact = subparsers.add_parser("compact", help="Apply the retention policy")
+    compact.add_argument("--keep-last", type=int, default=CHECKPOINT_KEEP_LAST)
+    compact.add_argument("--ttl-hours", type=float, default=CHECKPOINT_THREAD_TTL_HOURS)
+    compact.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after deleting")
+
+    args = parser.parse_args(argv)
+    db_paths = [args.db] if args.db else checkpoint_db_paths()
+    if not db_paths:
+        parser.error(f"CHECKPOINT_BACKEND={CHECKPOINT_BACKEND} has no SQLite files to inspect")
+
+    for db_path in db_paths:
+        if not os.path.exists(db_path):
+            continue
+        if args.command == "report":
+            usage = report_checkpoint_usage(db_path)
+            total = sum(row["bytes"] for row in usage)
+            print(f"{db_path}: {_format_bytes(os.path.getsize(db_path))} on disk, "
+                  f"{_format_bytes(total)} in {len(usage)} threads")
+            print(f"{'THREAD':<60} {'CHECKPOINTS':>11} {'WRITES':>8} {'SIZE':>10}  LAST ACTIVE")
+            for row in usage[:args.limit] if args.limit else usage:
+                last_active = (
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(row["last_active"]))
+                    if row["last_active"] else "-"
+                )
+                print(f"{row['thread_id']:<60} {row['checkpoints']:>11} {row['writes']:>8} "
+                      f"{_format_bytes(row['bytes']):>10}  {last_active}")
+            print()
+        else:
+            stats = compact_checkpoints(
+                db_path,
+                keep_last=args.keep_last,
+                ttl_hours=args.ttl_hours,
+                vacuum=not args.no_vacuum,
+            )
+            print(f"{db_path}: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,45 @@
+from langgraph.types import Send
 from workflow.state import ResumeState
 
 # Add routing logic
 def route_to_agent(state: ResumeState) -> str:
     intent = state["current_intent"]
+    if intent == "enhancement" and state["context"].get("enhancement_mode") == "fanout":
+        return "enhancement_fanout"
+    if intent == "multi":
+        return "plan"
     return intent  # Returns the routing key
 
 
+def fan_out_sections(state: ResumeState):
+    """Send one enhancement task per planned section, or fall back to single-shot"""
+    plan = state["context"].get("enhancement_plan", [])
+    tasks = [
+        Send("section_enhancer", {
+            "section_index": index,
+            "section_name": section["name"],
+            "section_text": section["text"],
+            "user_query": state["user_query"]
+        })
+        for index, section in enumerate(plan)
+        if section["enhance"]
+    ]
+    return tasks or "enhancer"
+
+
+def dispatch_plan_stage(state: ResumeState):
+    """Send every step of the current plan stage in parallel, or finish the plan"""
+    stage = state["context"].get("plan_current_stage", 0)
+    stages = state["context"].get("plan_stages", [])
+    if stage >= len(stages):
+        return "plan_combiner"
+    plan = state["context"]["plan"]
+    return [
+        Send("plan_step", {
+            "step_index": index,
+            "step": plan[index],
+            "resume_content": state["context"]["plan_resume"],
+            "request_options": state.get("request_options") or {}
+        })
+        for index in stages[stage]
+    ]
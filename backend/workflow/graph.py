@@ -1,5 +1,4 @@
 from langgraph.graph import START, StateGraph, END
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 import asyncio
 
 from workflow.state import ResumeState
@@ -7,10 +6,18 @@ from workflow.nodes import (
     classify_intent,
     job_matching_agent,
     enhancement_agent,
+    enhancement_planner,
+    section_enhancer,
+    enhancement_merger,
     company_research_agent,
-    translation_agent
+    translation_agent,
+    plan_dispatcher,
+    plan_step,
+    plan_combiner
 )
-from workflow.edges import route_to_agent
+from workflow.edges import route_to_agent, fan_out_sections, dispatch_plan_stage
+from workflow.checkpoint_store import open_checkpointer
+from workflow.memory import compact_memory
 
 # Create the graph structure
 workflow = StateGraph(ResumeState)
@@ -19,8 +26,14 @@ workflow = StateGraph(ResumeState)
 workflow.add_node("classifier", classify_intent)
 workflow.add_node("job_matcher", job_matching_agent)
 workflow.add_node("enhancer", enhancement_agent)
+workflow.add_node("enhancement_planner", enhancement_planner)
+workflow.add_node("section_enhancer", section_enhancer)
+workflow.add_node("enhancement_merger", enhancement_merger)
 workflow.add_node("researcher", company_research_agent)
 workflow.add_node("translator", translation_agent)
+workflow.add_node("plan_dispatcher", plan_dispatcher)
+workflow.add_node("plan_step", plan_step)
+workflow.add_node("plan_combiner", plan_combiner)
 
 # Add edges
 workflow.add_edge(START, "classifier")
@@ -30,10 +43,29 @@ workflow.add_conditional_edges(
     {
         "job_matching": "job_matcher",
         "enhancement": "enhancer", 
+        "enhancement_fanout": "enhancement_planner",
         "company_research": "researcher",
-        "translation": "translator"
+        "translation": "translator",
+        "plan": "plan_dispatcher"
     }
 )
+# Fan-out enhancement: one section_enhancer branch per section, run concurrently
+workflow.add_conditional_edges(
+    "enhancement_planner",
+    fan_out_sections,
+    ["section_enhancer", "enhancer"]
+)
+workflow.add_edge("section_enhancer", "enhancement_merger")
+workflow.add_edge("enhancement_merger", END)
+# Multi-intent plans: each stage's independent steps run in parallel, then
+# control returns to the dispatcher for the next (dependent) stage
+workflow.add_conditional_edges(
+    "plan_dispatcher",
+    dispatch_plan_stage,
+    ["plan_step", "plan_combiner"]
+)
+workflow.add_edge("plan_step", "plan_dispatcher")
+workflow.add_edge("plan_combiner", END)
 workflow.add_edge("job_matcher", END)
 workflow.add_edge("enhancer", END)
 workflow.add_edge("researcher", END)
@@ -44,9 +76,52 @@ def get_user_config(user_id: str, session_id: str = None):
     thread_id = f"{user_id}_{session_id}" if session_id else user_id
     return {"configurable": {"thread_id": thread_id}}
 
+def initial_chat_state(message: str, resume_content: str = "", options: dict = None) -> dict:
+    """Initial state for one chat turn; the classifier fills in intent and context"""
+    return {
+        "user_query": message,
+        "resume_content": resume_content or "",
+        "messages": [{"role": "user", "content": message}],
+        "current_intent": "",  # Will be set by the workflow's classify_intent node
+        "context": {},  # Will be populated by the workflow
+        "agent_response": "",
+        "agent_result": {},
+        "resume_versions": [],
+        "request_options": options or {}
+    }
+
+async def with_memory(app, initial_state: dict, config: dict) -> dict:
+    """Prepend the thread's bounded history to a turn's initial state"""
+    snapshot = await app.aget_state(config)
+    previous = snapshot.values if snapshot else {}
+    messages, memory = await asyncio.to_thread(
+        compact_memory, previous.get("messages") or [], previous.get("memory") or {}
+    )
+    return {**initial_state, "messages": messages + initial_state["messages"], "memory": memory}
+
+async def stream_with_checkpointer(initial_state: dict, config: dict):
+    """
+    Run the workflow, yielding progress as nodes finish
+
+    Yields ("update", node_name, update) for every finished node (including
+    each parallel branch) and finally ("final", None, final_state).
+    """
+    async with open_checkpointer(config["configurable"]["thread_id"]) as checkpointer:
+        app = workflow.compile(checkpointer=checkpointer)
+        final_state = None
+        initial_state = await with_memory(app, initial_state, config)
+        async for mode, chunk in app.astream(initial_state, config=config, stream_mode=["updates", "values"]):
+            if mode == "updates":
+                for node, update in chunk.items():
+                    yield "update", node, update
+            else:
+                final_state = chunk
+        yield "final", None, final_state
+
 async def invoke_with_checkpointer(initial_state: dict, config: dict):
     """Invoke the workflow with proper checkpointer context management"""
-    async with AsyncSqliteSaver.from_conn_string("resume_agent.db") as checkpointer:
+    async with open_checkpointer(config["configurable"]["thread_id"]) as checkpointer:
         app = workflow.compile(checkpointer=checkpointer)
+        initial_state = await with_memory(app, initial_state, config)
         result = await app.ainvoke(initial_state, config=config)
         return result
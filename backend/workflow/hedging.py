@@ -0,0 +1,124 @@
+"""Per-call deadlines and hedged LLM requests.
+
+Every managed chain call runs against a deadline. When hedging is enabled and
+the primary call is still running after the chain's recent latency percentile,
+a backup request goes to the secondary model profile (another region or
+model); whichever succeeds first wins and the other is cancelled.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from workflow.llm_gateway import LLMDeadlineExceeded, Priority
+from workflow.metrics import record_latency
+
+logger = logging.getLogger(__name__)
+
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+# Hedge once the primary has run longer than this percentile of recent calls
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Calls recorded for a chain before its percentile is trusted
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Threads per priority that run calls against their deadline
+LLM_CALL_WORKERS = int(os.getenv("LLM_CALL_WORKERS", "32"))
+
+# One pool per priority, so queued batch work never holds the threads interactive calls need
+_executors = {
+    priority: ThreadPoolExecutor(max_workers=LLM_CALL_WORKERS, thread_name_prefix=f"llm-call-{priority.name.lower()}")
+    for priority in Priority
+}
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(name: str, counter: str):
+    with _lock:
+        stats = _stats.setdefault(name, {"calls": 0, "hedges_fired": 0, "hedges_won": 0, "deadline_exceeded": 0})
+        stats[counter] += 1
+
+
+def _deadline_exceeded(name: str, deadline: float) -> LLMDeadlineExceeded:
+    _count(name, "deadline_exceeded")
+    # Count the abandoned call as a deadline-long sample so the percentile keeps seeing slow calls
+    record_latency(name, deadline)
+    logger.warning(f"LLM call for {name} exceeded its {deadline:.0f}s deadline")
+    return LLMDeadlineExceeded(f"{name} did not respond within {deadline:.0f}s")
+
+
+def _run(call: Callable[[float], Any], give_up: float) -> Any:
+    """Start call with the time left before give_up; one that waited out its deadline in the pool never runs"""
+    remaining = give_up - time.monotonic()
+    if remaining <= 0:
+        raise LLMDeadlineExceeded("Deadline passed before the call started")
+    return call(remaining)
+
+
+def hedged_call(
+    name: str,
+    primary: Callable[[float], Any],
+    deadline: float,
+    hedge: Optional[Callable[[float], Any]] = None,
+    hedge_after: Optional[float] = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> Any:
+    """
+    Run primary with a deadline, hedging it after hedge_after seconds
+
+    Args:
+        name: Chain name for the counters
+        primary: The call to make, given the seconds left before the deadline
+        deadline: Seconds before giving up with LLMDeadlineExceeded
+        hedge: Backup call, given the seconds left before the deadline
+        hedge_after: Seconds to wait for primary before starting hedge (None: never hedge)
+        priority: Picks the thread pool the calls run on
+
+    Returns:
+        The result of the first call to succeed
+    """
+    _count(name, "calls")
+    start = time.monotonic()
+    give_up = start + deadline
+    executor = _executors[priority]
+    roles = {executor.submit(_run, primary, give_up): "primary"}
+    pending = set(roles)
+    hedged = hedge is None or hedge_after is None
+    error = None
+
+    while pending:
+        now = time.monotonic()
+        timeout = give_up - now
+        if not hedged:
+            timeout = min(timeout, start + hedge_after - now)
+        done, pending = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    # A call already running on its thread can't be interrupted;
+                    # its result is dropped and the read timeout bounds it
+                    loser.cancel()
+                if roles[future] == "hedge":
+                    _count(name, "hedges_won")
+                return future.result()
+            error = error or future.exception()
+
+        now = time.monotonic()
+        if pending and now >= give_up:
+            for future in pending:
+                future.cancel()
+            raise _deadline_exceeded(name, deadline)
+        if not hedged and pending and now >= start + hedge_after:
+            hedged = True
+            _count(name, "hedges_fired")
+            future = executor.submit(_run, hedge, give_up)
+            roles[future] = "hedge"
+            pending.add(future)
+    raise error
+
+
+def hedging_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-chain counts of calls, hedges fired and won, and deadline misses"""
+    with _lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
@@ -1,21 +1,120 @@
 #Define the llm
 from langchain_aws import ChatBedrock
-from dotenv import load_dotenv
+from botocore.config import Config
+from utils.env import load_env
+import json
 import os
-load_dotenv()
+from functools import lru_cache
+load_env()
 
-def get_chat_model():
+DEFAULT_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "us.anthropic.claude-sonnet-4-20250514-v1:0")
+FAST_MODEL_ID = os.getenv("BEDROCK_FAST_MODEL_ID", "us.anthropic.claude-3-5-haiku-20241022-v1:0")
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+
+DEFAULT_PROFILE = {
+    "model_id": DEFAULT_MODEL_ID,
+    # Output cap; rewriting chains request less, sized to their input (see token_budget)
+    "max_tokens": 16384,
+    "context_window": 200000,
+    "temperature": 0.3,
+    "top_p": 0.9,
+    "region": os.getenv("AWS_REGION"),
+    # Whole-call deadline, also used as the Bedrock client's read timeout
+    "deadline_seconds": float(os.getenv("LLM_DEADLINE_SECONDS", "60")),
+}
+
+# Secondary profile for hedged requests; unset fields fall back to the primary
+HEDGE_PROFILE = {
+    "region": os.getenv("BEDROCK_HEDGE_REGION"),
+    "model_id": os.getenv("BEDROCK_HEDGE_MODEL_ID"),
+}
+
+# Per-chain overrides of DEFAULT_PROFILE. Cheap steps that emit a few short
+# fields use the fast model with a small output limit; full rewrites keep the
+# large model.
+CHAIN_PROFILES = {
+    "intent": {"model_id": FAST_MODEL_ID, "max_tokens": 2048, "temperature": 0.0, "deadline_seconds": 15.0},
+    "memory_summary": {"model_id": FAST_MODEL_ID, "max_tokens": 600, "temperature": 0.0, "deadline_seconds": 15.0},
+}
+
+
+def _load_profile_file() -> dict:
+    """Read per-chain profiles from MODEL_PROFILES_FILE (JSON), if set"""
+    path = os.getenv("MODEL_PROFILES_FILE")
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_file_profiles = _load_profile_file()
+
+
+def get_model_profile(name: str = "default", hedge: bool = False) -> dict:
     """
-    Initialize the Bedrock client with Claude sonnet 4
+    Resolve the model profile for a chain
+
+    Later sources override earlier ones: DEFAULT_PROFILE, CHAIN_PROFILES,
+    MODEL_PROFILES_FILE ("default" and per-chain entries), then environment
+    variables <NAME>_MODEL_ID, <NAME>_MAX_TOKENS, <NAME>_TEMPERATURE and
+    <NAME>_DEADLINE_SECONDS, e.g. INTENT_MODEL_ID.
+
+    With hedge=True the secondary profile used for hedged requests is
+    returned: HEDGE_PROFILE, then the chain's "hedge" entry in the file, then
+    <NAME>_HEDGE_REGION and <NAME>_HEDGE_MODEL_ID.
+    """
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(_file_profiles.get("default", {}))
+    profile.update(CHAIN_PROFILES.get(name, {}))
+    profile.update(_file_profiles.get(name, {}))
+
+    prefix = name.upper()
+    if os.getenv(f"{prefix}_MODEL_ID"):
+        profile["model_id"] = os.getenv(f"{prefix}_MODEL_ID")
+    if os.getenv(f"{prefix}_MAX_TOKENS"):
+        profile["max_tokens"] = int(os.getenv(f"{prefix}_MAX_TOKENS"))
+    if os.getenv(f"{prefix}_TEMPERATURE"):
+        profile["temperature"] = float(os.getenv(f"{prefix}_TEMPERATURE"))
+    if os.getenv(f"{prefix}_DEADLINE_SECONDS"):
+        profile["deadline_seconds"] = float(os.getenv(f"{prefix}_DEADLINE_SECONDS"))
+
+    hedge_overrides = profile.pop("hedge", {})
+    if hedge:
+        profile.update({key: value for key, value in HEDGE_PROFILE.items() if value})
+        profile.update(hedge_overrides)
+        if os.getenv(f"{prefix}_HEDGE_REGION"):
+            profile["region"] = os.getenv(f"{prefix}_HEDGE_REGION")
+        if os.getenv(f"{prefix}_HEDGE_MODEL_ID"):
+            profile["model_id"] = os.getenv(f"{prefix}_HEDGE_MODEL_ID")
+    return profile
+
+
+@lru_cache(maxsize=128)
+def get_chat_model(profile: str = "default", hedge: bool = False, max_tokens: int = None):
+    """
+    Bedrock client for a chain's model profile
+    (Claude Sonnet 4 unless the profile says otherwise)
+
+    Clients are cached per profile, hedge flag and max_tokens, so chains
+    built for every request reuse their HTTP connections.
     """
+    settings = get_model_profile(profile, hedge)
+    if max_tokens:
+        settings["max_tokens"] = max_tokens
     return ChatBedrock(
-        model_id=os.getenv("BEDROCK_MODEL_ID", "us.anthropic.claude-sonnet-4-20250514-v1:0"),
-        region_name=os.getenv("AWS_REGION"),
+        model_id=settings["model_id"],
+        region_name=settings["region"],
+        # Throttling is retried by the LLM gateway, so botocore makes a single attempt
+        config=Config(
+            connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings["deadline_seconds"],
+            retries={"total_max_attempts": 1},
+        ),
         aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
         aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
         model_kwargs={
-            "max_tokens": 4096,
-            "temperature": 0.3,
-            "top_p": 0.9
+            "max_tokens": settings["max_tokens"],
+            "temperature": settings["temperature"],
+            "top_p": settings["top_p"]
         }
-    )
\ No newline at end of file
+    )
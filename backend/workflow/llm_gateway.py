@@ -0,0 +1,258 @@
+"""Admission control for Bedrock calls.
+
+Every chain goes through one process-wide gateway that enforces requests- and
+tokens-per-minute budgets, admits queued work in priority order, retries
+throttling errors with jittered exponential backoff, and sheds load with
+LLMOverloadedError once a call has waited longer than the queue deadline.
+Calls that run past their deadline raise LLMDeadlineExceeded (see hedging.py).
+"""
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Optional
+
+from utils.env import load_env
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "50"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_QUEUE_DEADLINE_SECONDS = float(os.getenv("LLM_QUEUE_DEADLINE_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+
+THROTTLING_MARKERS = (
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "Too many requests",
+    "Rate exceeded",
+)
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are served first"""
+    INTERACTIVE = 0  # chat turns a user is waiting on
+    BACKGROUND = 1   # PDF/LaTeX conversion
+    BATCH = 2        # bulk exports, ingestion, speculative work
+
+
+class LLMUnavailableError(Exception):
+    """Base for LLM calls the API should surface as an HTTP error rather than an apology"""
+
+
+class LLMOverloadedError(LLMUnavailableError):
+    """Raised when a call waited in the admission queue past its deadline"""
+
+    def __init__(self, message: str, retry_after: float = LLM_QUEUE_DEADLINE_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMDeadlineExceeded(LLMUnavailableError):
+    """Raised when a call (and its hedge, if any) did not finish before its deadline"""
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Check whether an exception is a Bedrock throttling/capacity error"""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code", "")
+        if code in ("ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"):
+            return True
+    text = str(error)
+    return any(marker.lower() in text.lower() for marker in THROTTLING_MARKERS)
+
+
+class TokenBucket:
+    """Token bucket holding up to one minute of budget, refilled continuously"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if available now)"""
+        self._refill(now)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= amount
+
+
+class LLMGateway:
+    """Priority admission queue in front of the LLM provider"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        queue_deadline: float = LLM_QUEUE_DEADLINE_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.queue_deadline = queue_deadline
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._stats = {
+            "admitted": 0,
+            "shed": 0,
+            "throttle_retries": 0,
+            "throttle_failures": 0,
+            "max_queue_wait_seconds": 0.0,
+        }
+
+    def acquire(self, priority: Priority, tokens: int, deadline: Optional[float] = None) -> float:
+        """
+        Block until the call is admitted
+
+        Args:
+            priority: Admission priority
+            tokens: Estimated prompt + completion tokens for the call
+            deadline: Maximum seconds to wait (defaults to the gateway deadline)
+
+        Returns:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            LLMOverloadedError: If the call could not be admitted before the deadline
+        """
+        tokens = min(tokens, self.token_bucket.capacity)
+        start = time.monotonic()
+        give_up = start + (self.queue_deadline if deadline is None else deadline)
+        ticket = (int(priority), next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] == ticket and self._active < self.max_concurrency:
+                        wait = max(
+                            self.request_bucket.wait_time(1, now),
+                            self.token_bucket.wait_time(tokens, now),
+                        )
+                        if wait == 0:
+                            heapq.heappop(self._queue)
+                            self.request_bucket.take(1, now)
+                            self.token_bucket.take(tokens, now)
+                            self._active += 1
+                            waited = now - start
+                            self._stats["admitted"] += 1
+                            self._stats["max_queue_wait_seconds"] = max(
+                                self._stats["max_queue_wait_seconds"], waited
+                            )
+                            return waited
+
+                    remaining = give_up - now
+                    if remaining <= 0:
+                        self._stats["shed"] += 1
+                        raise LLMOverloadedError(
+                            f"LLM capacity exhausted: request waited {now - start:.1f}s in queue",
+                            retry_after=max(1.0, wait or self.queue_deadline),
+                        )
+                    self._cond.wait(min(remaining, wait) if wait else remaining)
+            finally:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if not is_throttling_error(error):
+            return False
+        with self._cond:
+            if attempt < self.max_retries:
+                self._stats["throttle_retries"] += 1
+                return True
+            self._stats["throttle_failures"] += 1
+            return False
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        priority: Priority = Priority.INTERACTIVE,
+        tokens: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Run fn once admitted, retrying throttling errors with backoff"""
+        self.acquire(priority, tokens, deadline)
+        try:
+            for attempt in itertools.count():
+                try:
+                    return fn()
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.warning(f"LLM throttled, retrying in {delay:.1f}s (attempt {attempt + 1})")
+                    time.sleep(delay)
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                "queued": len(self._queue),
+                "active": self._active,
+                "requests_available": round(self.request_bucket.tokens, 1),
+                "tokens_available": round(self.token_bucket.tokens),
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide gateway shared by every chain"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token estimate (about 4 characters per token)"""
+    if isinstance(value, dict):
+        return sum(estimate_tokens(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_tokens(v) for v in value)
+    return len(str(value)) // 4 + 1
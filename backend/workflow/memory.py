@@ -0,0 +1,140 @@
+"""Bounded conversation memory.
+
+The checkpointed ResumeState.messages keeps only the last MEMORY_RECENT_TURNS
+turns verbatim. Older turns are folded into a running summary (state
+"memory") at the start of the next turn, so the stored history stays the same
+size however long the session runs. Prompts get the summary plus as many
+recent messages as fit in MEMORY_TOKEN_BUDGET.
+"""
+import logging
+import os
+from typing import List, Tuple
+
+from workflow.token_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "4"))
+# Tokens of history (summary included) added to each agent prompt
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "2000"))
+MEMORY_SUMMARY_MAX_TOKENS = int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", "400"))
+# Longer messages (usually a full resume) are clipped in prompts and summaries
+MEMORY_MESSAGE_MAX_TOKENS = int(os.getenv("MEMORY_MESSAGE_MAX_TOKENS", "600"))
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens (4 characters per token)"""
+    max_chars = max(0, max_tokens) * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " …"
+
+
+def split_turns(messages: List[dict]) -> List[List[dict]]:
+    """Group messages into turns, each starting at a user message"""
+    turns = []
+    for message in messages:
+        if message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _fallback_summary(summary: str, messages: List[dict]) -> str:
+    requests = [f"User asked: {clip(m['content'], 60)}" for m in messages if m["role"] == "user"]
+    return clip("\n".join(part for part in [summary, *requests] if part), MEMORY_SUMMARY_MAX_TOKENS)
+
+
+def summarize(summary: str, messages: List[dict]) -> str:
+    """Fold messages into the running summary"""
+    from workflow.chains import memory_summary_chain
+
+    turns = "\n\n".join(f"{m['role'].upper()}: {clip(m['content'], MEMORY_MESSAGE_MAX_TOKENS)}" for m in messages)
+    try:
+        response = memory_summary_chain().invoke({
+            "summary": summary or "(none yet)",
+            "turns": turns,
+            "max_words": MEMORY_SUMMARY_MAX_TOKENS * 3 // 4
+        })
+        return clip(response.summary.strip(), MEMORY_SUMMARY_MAX_TOKENS)
+    except Exception as e:
+        # Losing detail from old turns beats failing the user's current turn
+        logger.warning(f"Conversation summary failed, keeping a plain digest: {str(e)}")
+        return _fallback_summary(summary, messages)
+
+
+def compact_memory(messages: List[dict], memory: dict) -> Tuple[List[dict], dict]:
+    """
+    Keep the last MEMORY_RECENT_TURNS turns and fold older ones into the summary
+
+    Args:
+        messages: Checkpointed messages from previous turns
+        memory: Checkpointed memory ({"summary", "summarized_turns"})
+
+    Returns:
+        Tuple[List[dict], dict]: The messages to keep and the updated memory
+    """
+    memory = memory or {"summary": "", "summarized_turns": 0}
+    turns = split_turns(messages)
+    if len(turns) <= MEMORY_RECENT_TURNS:
+        return messages, memory
+
+    cut = len(turns) - MEMORY_RECENT_TURNS
+    folded = [m for turn in turns[:cut] for m in turn if m.get("role") in ("user", "assistant")]
+    memory = {
+        "summary": summarize(memory.get("summary", ""), folded) if folded else memory.get("summary", ""),
+        "summarized_turns": memory.get("summarized_turns", 0) + cut
+    }
+    return [m for turn in turns[cut:] for m in turn], memory
+
+
+def prompt_history(state: dict) -> List[dict]:
+    """
+    Conversation history for an agent prompt, within MEMORY_TOKEN_BUDGET
+
+    The summary comes first, then the most recent earlier messages that fit,
+    newest kept first. The current turn (from the last user message on) is
+    not included; the prompt carries the request itself.
+    """
+    messages = state.get("messages") or []
+    current = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=len(messages))
+    earlier = [m for m in messages[:current] if m.get("role") in ("user", "assistant")]
+
+    history = []
+    remaining = MEMORY_TOKEN_BUDGET
+    summary = (state.get("memory") or {}).get("summary")
+    if summary:
+        # Placed right after the system prompt, where Bedrock merges it into the system text
+        content = SUMMARY_PREFIX + clip(summary, min(MEMORY_SUMMARY_MAX_TOKENS, remaining))
+        history.append({"role": "system", "content": content})
+        remaining -= count_tokens(content)
+
+    recent = []
+    for message in reversed(earlier):
+        if remaining < 32:
+            break
+        content = clip(message["content"], min(MEMORY_MESSAGE_MAX_TOKENS, remaining))
+        recent.append({"role": message["role"], "content": content})
+        remaining -= count_tokens(content)
+    recent.reverse()
+    # The conversation must open with a user message
+    while recent and recent[0]["role"] != "user":
+        recent.pop(0)
+    return history + recent
+
+
+def memory_usage(state: dict) -> dict:
+    """Report how much of the memory budget the next prompt uses"""
+    memory = state.get("memory") or {}
+    messages = state.get("messages") or []
+    history = prompt_history({**state, "messages": messages + [{"role": "user", "content": ""}]})
+    return {
+        "recent_turns": len(split_turns(messages)),
+        "summarized_turns": memory.get("summarized_turns", 0),
+        "summary_tokens": count_tokens(memory["summary"]) if memory.get("summary") else 0,
+        "history_tokens": sum(count_tokens(m["content"]) for m in history),
+        "budget_tokens": MEMORY_TOKEN_BUDGET
+    }
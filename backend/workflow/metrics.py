@@ -0,0 +1,57 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyWindow:
+    """Rolling window of recent call latencies"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "avg_seconds": round(sum(self.samples) / len(self.samples), 3),
+            "p50_seconds": round(self.percentile(50), 3),
+            "p95_seconds": round(self.percentile(95), 3),
+        }
+
+
+_lock = threading.Lock()
+_latencies: Dict[str, LatencyWindow] = {}
+
+
+def record_latency(name: str, seconds: float):
+    """Record one call duration under name"""
+    with _lock:
+        _latencies.setdefault(name, LatencyWindow()).add(seconds)
+
+
+def latency_percentile(name: str, pct: float, min_samples: int = 1) -> Optional[float]:
+    """Return the pct percentile of recent latencies for name (None if fewer than min_samples)"""
+    with _lock:
+        window = _latencies.get(name)
+        if window is None or len(window.samples) < min_samples:
+            return None
+        return window.percentile(pct)
+
+
+def latency_summary() -> dict:
+    """Return count/avg/p50/p95 for every recorded name"""
+    with _lock:
+        return {name: window.summary() for name, window in sorted(_latencies.items())}
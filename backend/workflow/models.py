@@ -1,10 +1,20 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+
+# Bump when the shape of AgentResult.data changes incompatibly
+RESPONSE_SCHEMA_VERSION = 1
+
+class PlanStep(BaseModel):
+    intent: str = Field(description="Intent for this step: job_matching, enhancement, company_research, translation")
+    request: str = Field(description="The part of the user's request this step handles, with any details it needs")
+    depends_on_previous: bool = Field(description="True if this step must work on the resume produced by the previous step")
 
 class IntentResponse(BaseModel):
     intent: str = Field(description="Classified intent: job_matching, enhancement, company_research, translation")
     confidence: float = Field(description="Confidence score 0-1")
     reasoning: str = Field(description="Brief explanation of classification")
+    plan: List[PlanStep] = Field(default_factory=list, description="Ordered steps when the request asks for more than one thing; empty otherwise")
+    keyword_gaps_only: bool = Field(default=False, description="True if the user only asks which skills or keywords they are missing for a job, without an analysis or rewrite")
 
 
 class JobMatchingResponse(BaseModel):
@@ -27,4 +37,16 @@ class ResearchResponse(BaseModel):
     key_alignments: List[str] = Field(description="How resume aligns with company")
 
 class TranslateResponse(BaseModel):
-    translated_content: str = Field(description="Translated resume content")
\ No newline at end of file
+    translated_content: str = Field(description="Translated resume content")
+
+class AgentResult(BaseModel):
+    """Typed agent output returned to API clients next to the display text"""
+    type: str = Field(description="job_matching, enhancement, company_research, translation or multi")
+    data: dict = Field(default_factory=dict, description="The agent's structured payload, e.g. JobMatchingResponse fields")
+    resume_output: Optional[str] = Field(default=None, description="Resume text produced by this turn, if any")
+    resume_version: Optional[str] = Field(default=None, description="Version id (content hash) of resume_output in the resume store")
+    error: Optional[str] = Field(default=None, description="Set when the agent failed")
+    steps: List["AgentResult"] = Field(default_factory=list, description="Per-step results of a multi-intent plan")
+
+class ConversationSummary(BaseModel):
+    summary: str = Field(description="Running summary of the conversation so far")
@@ -1,89 +1,240 @@
-from workflow.state import ResumeState
+import os
+import re
+from workflow.state import ResumeState, RESET_SECTION_RESULTS
 from workflow.chains import (
     intent_chain,
     job_matching_chain,
     enhancement_chain,
-    research_chain,
-    translate_chain
+    research_chain
 )
+from workflow.llm_gateway import LLMUnavailableError
+from workflow.models import AgentResult, IntentResponse, JobMatchingResponse
+from workflow.memory import prompt_history
+from workflow.helpers import get_model_profile
+from workflow.token_budget import exceeds_output_budget
+from workflow.speculation import claim_speculation, cancel_speculation, is_general_enhancement
+from workflow.translation import language_display_name, mentioned_language, translate_resume
+from utils.resume_store import store_structured_resume, structured_resume
+from utils.skills_engine import skill_gap_report
+
+# "single" rewrites the whole resume in one call; "fanout" enhances sections in parallel
+ENHANCEMENT_MODE = os.getenv("ENHANCEMENT_MODE", "single").lower()
+FANOUT_SECTIONS = ("summary", "experience", "skills", "projects")
+AGENT_INTENTS = ("job_matching", "enhancement", "company_research", "translation")
+# "Which keywords am I missing?" is answered from the local skills engine, without an LLM call
+GAP_ONLY_QUERY = re.compile(r"\b(missing|lack|lacking|gaps?)\b|\b(which|what)\b.*\b(keywords?|skills?)\b", re.IGNORECASE)
+REWRITE_QUERY = re.compile(r"\b(optimi[sz]e|tailor|rewrite|improve|enhance|update|adapt|score|match score)\b", re.IGNORECASE)
+# A pasted job description starts at a label like "Job description:" or after the request's first line
+JOB_DESCRIPTION_MARKER = re.compile(r"\b(?:job description|job posting|job ad|jd|requirements|responsibilities)\s*:", re.IGNORECASE)
+PASTED_TEXT_MIN_WORDS = 60
+# Words of a pasted job description shown to the intent classifier
+CLASSIFIER_EXCERPT_WORDS = 40
+
+
+def is_gap_only_query(instruction: str) -> bool:
+    """Keyword check on the user's own instruction (without any pasted job description)"""
+    return bool(GAP_ONLY_QUERY.search(instruction)) and not REWRITE_QUERY.search(instruction)
+
+def split_job_description(message: str) -> tuple:
+    """Split a chat message into the user's own instruction and a pasted job description ("" if none)"""
+    text = message.strip()
+    match = JOB_DESCRIPTION_MARKER.search(text)
+    line_end = text.find("\n")
+    if line_end != -1 and len(text[line_end:].split()) >= PASTED_TEXT_MIN_WORDS and (not match or line_end < match.start()):
+        return text[:line_end].strip(), text[line_end:].strip()
+    if match:
+        return text[:match.start()].strip(), text[match.end():].strip()
+    return text, ""
+
+def classifier_query(instruction: str, job_description: str) -> str:
+    """The message as the intent classifier sees it: the instruction and a short excerpt of any job description"""
+    if not job_description:
+        return instruction
+    words = job_description.split()
+    excerpt = " ".join(words[:CLASSIFIER_EXCERPT_WORDS])
+    return f"{instruction}\n\n[Pasted job description, {len(words)} words: {excerpt} ...]"
+
+def fallback_intent(instruction: str, job_description: str) -> str:
+    """Route to a single agent by keywords, for when the classifier's output can't be used"""
+    lowered = instruction.lower()
+    if job_description:
+        return "job_matching"
+    if "translat" in lowered or mentioned_language(lowered):
+        return "translation"
+    if re.search(r"\b(job|role|position|posting|match)\b", lowered):
+        return "job_matching"
+    if re.search(r"\b(company|research|culture)\b", lowered):
+        return "company_research"
+    return "enhancement"
+
+
+def build_intent_context(intent: str, user_query: str, options: dict = None) -> dict:
+    """Extract the agent context (job description, company, language...) for an intent"""
+    options = options or {}
+    if intent == "enhancement":
+        # For enhancement, set a default target section
+        return {
+            "target_section": "general",
+            "enhancement_mode": (options.get("enhancement_mode") or ENHANCEMENT_MODE).lower()
+        }
+    elif intent == "job_matching":
+        # The pasted job description, or the whole message when nothing looks pasted
+        instruction, job_description = split_job_description(user_query)
+        return {
+            "job_description": job_description or user_query,
+            # Answered from the skills engine alone (see job_matching_agent)
+            "gap_only": is_gap_only_query(instruction)
+        }
+    elif intent == "company_research":
+        # Try to extract company name from query
+        company_match = re.search(r'(?:for|at|with)\s+([A-Z][a-zA-Z]+)', user_query, re.IGNORECASE)
+        company_name = company_match.group(1) if company_match else "Unknown Company"
+        return {"company_name": company_name}
+    elif intent == "translation":
+        # Extract target language from query, defaulting to Spanish
+        return {"target_language": mentioned_language(user_query) or "spanish"}
+    return {}
+
+def set_agent_result(state: ResumeState, data: dict = None, resume_output: str = None, error: str = None):
+    """Record the typed result returned to clients alongside agent_response"""
+    state["agent_result"] = AgentResult(
+        type=state["current_intent"],
+        data=data or {},
+        resume_output=resume_output or None,
+        # The final output is stored, so clients can fetch its structure or diff it later
+        resume_version=store_structured_resume(resume_output).version_id if resume_output else None,
+        error=error
+    ).model_dump()
+
+def build_plan(plan: list, options: dict = None, job_description: str = "") -> dict:
+    """
+    Turn the classifier's ordered plan into execution stages
+
+    Steps that depend on the previous step's output start a new stage; steps
+    within a stage are independent and run concurrently. Job-matching steps
+    get the job description pasted in the original message, which the
+    classifier does not copy into its steps.
+    """
+    steps, stages = [], []
+    for index, step in enumerate(plan):
+        context = build_intent_context(step.intent, step.request, options)
+        if step.intent == "job_matching" and job_description:
+            context["job_description"] = job_description
+        steps.append({
+            "intent": step.intent,
+            "request": step.request,
+            "context": context
+        })
+        if not stages or step.depends_on_previous:
+            stages.append([index])
+        else:
+            stages[-1].append(index)
+    return {"plan": steps, "plan_stages": stages, "plan_next_stage": 0}
 
 # Intent classification node
 def classify_intent(state: ResumeState) -> ResumeState:
-    # Classify user intent (job_matching, enhancement, company_research)
+    # Classify user intent (job_matching, enhancement, company_research, translation)
     chain = intent_chain()
-    response = chain.invoke({
-        "user_query": state["user_query"],
-        "resume_content": state["resume_content"]
-    })
-    
-    # Update the current state with classification
-    state["current_intent"] = response.intent
+    instruction, job_description = split_job_description(state["user_query"])
+    classified = True
+    try:
+        response = chain.invoke({
+            "user_query": classifier_query(instruction, job_description),
+            "resume_content": state["resume_content"],
+            "history": prompt_history(state)
+        })
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        # Output that doesn't parse (e.g. cut off at max_tokens): route to a single agent instead of failing
+        classified = False
+        response = IntentResponse(
+            intent=fallback_intent(instruction, job_description),
+            confidence=0.0,
+            reasoning=f"Keyword fallback, classifier output unusable: {str(e)}"
+        )
     
-    # Extract context based on intent
-    if response.intent == "enhancement":
-        # For enhancement, set a default target section
-        state["context"] = {"target_section": "general"}
-    elif response.intent == "job_matching":
-        # Try to extract job description from query
-        query_lower = state["user_query"].lower()
-        if "job description:" in query_lower or "requirements:" in query_lower:
-            # Extract job description after the indicator
-            job_desc = state["user_query"].split(":")[-1].strip()
-            state["context"] = {"job_description": job_desc}
-        else:
-            state["context"] = {"job_description": state["user_query"]}
-    elif response.intent == "company_research":
-        # Try to extract company name from query
-        import re
-        company_match = re.search(r'(?:for|at|with)\s+([A-Z][a-zA-Z]+)', state["user_query"], re.IGNORECASE)
-        company_name = company_match.group(1) if company_match else "Unknown Company"
-        state["context"] = {"company_name": company_name}
-    elif response.intent == "translation":
-        # Extract target language from query
-        import re
-        query_lower = state["user_query"].lower()
-        
-        # Language detection patterns
-        language_patterns = {
-            "spanish": ["spanish", "español", "mexican", "mexico", "castellano"],
-            "french": ["french", "français", "francais"],
-            "german": ["german", "deutsch", "alemán"],
-            "portuguese": ["portuguese", "português", "portugues", "brazilian", "brasil"],
-            "italian": ["italian", "italiano"],
-            "chinese": ["chinese", "mandarin", "中文"],
-            "japanese": ["japanese", "日本語", "nihongo"],
-            "korean": ["korean", "한국어", "hangul"]
-        }
-        
-        detected_language = "spanish"  # Default fallback
-        for lang, patterns in language_patterns.items():
-            if any(pattern in query_lower for pattern in patterns):
-                detected_language = lang
-                break
-        
-        state["context"] = {"target_language": detected_language}
+    plan = [step for step in (response.plan or []) if step.intent in AGENT_INTENTS]
+    if len(plan) > 1:
+        # Several requests in one message: execute them as a plan
+        state["current_intent"] = "multi"
+        state["context"] = build_plan(plan, state.get("request_options"), job_description)
+        summary = " -> ".join(step.intent for step in plan)
     else:
-        state["context"] = {}
+        # Update the current state with classification
+        state["current_intent"] = response.intent
+        state["context"] = build_intent_context(
+            response.intent, state["user_query"], state.get("request_options")
+        )
+        summary = response.intent
+        if response.intent == "job_matching" and classified:
+            # The classifier decides whether only the keyword gaps were asked for
+            state["context"]["gap_only"] = response.keyword_gaps_only and not REWRITE_QUERY.search(instruction)
+        if (
+            response.intent == "enhancement"
+            and state["context"]["enhancement_mode"] == "single"
+            and exceeds_output_budget("enhancement", state["resume_content"], get_model_profile("enhancement"))
+        ):
+            # A one-shot rewrite would be cut off at max_tokens; enhance section by section
+            state["context"]["enhancement_mode"] = "fanout"
+    
+    # A speculative enhancement started at upload only answers a plain general enhancement
+    if not (
+        state["current_intent"] == "enhancement"
+        and state["context"].get("enhancement_mode") != "fanout"
+        and is_general_enhancement(state["user_query"])
+    ):
+        cancel_speculation(state["resume_content"])
     
     state["messages"].append({
         "role":"system",
-        "content":f"Intent classified as: {response.intent} (confidence: {response.confidence})"
+        "content":f"Intent classified as: {summary} (confidence: {response.confidence})"
     })
     return state
   
 
+def skill_facts_text(report: dict) -> str:
+    """Describe a skill gap report for the job-matching prompt"""
+    if not report["job_skills"]:
+        return "No taxonomy skills found in the job description."
+    return f"Coverage: {report['coverage']}% of {len(report['job_skills'])} job skills\n" + \
+           f"Present on resume: {', '.join(report['matched']) or 'none'}\n" + \
+           f"Missing from resume: {', '.join(report['missing']) or 'none'}"
+
+def keyword_gap_response(report: dict) -> JobMatchingResponse:
+    """Answer a keyword gap question from the skills engine alone"""
+    recommendations = [
+        f"Missing {category.replace('_', ' ')} keywords: {', '.join(skills)}"
+        for category, skills in report["missing_by_category"].items()
+    ]
+    if report["missing"]:
+        recommendations.append("Add the missing keywords you have real experience with, each backed by a concrete example")
+    return JobMatchingResponse(
+        match_score=report["coverage"],
+        key_strengths=report["matched"],
+        skill_gaps=report["missing"],
+        optimized_sections={},
+        recommendations=recommendations
+    )
+
 def job_matching_agent(state: ResumeState) -> ResumeState:
     """Analyze job description and optimize resume match"""
-    chain = job_matching_chain()
-    
     # Extract job description from context or query
     job_description = state["context"].get("job_description", "")
+    resume = structured_resume(state["resume_content"])
+    report = skill_gap_report(state["resume_content"], job_description, resume.keywords)
     
-    response = chain.invoke({
-        "resume_content": state["resume_content"],
-        "job_description": job_description,
-        "user_query": state["user_query"]
-    })
+    if report["job_skills"] and state["context"].get("gap_only"):
+        response = keyword_gap_response(report)
+    else:
+        chain = job_matching_chain()
+        response = chain.invoke({
+            "resume_content": state["resume_content"],
+            "job_description": job_description,
+            "user_query": state["user_query"],
+            "skill_facts": skill_facts_text(report),
+            "history": prompt_history(state)
+        })
     
     # Build optimized resume content from optimized sections
     optimized_resume = ""
@@ -109,8 +260,14 @@ def job_matching_agent(state: ResumeState) -> ResumeState:
     
     if optimized_resume and optimized_resume != state["resume_content"]:
         state["agent_response"] = f"{analysis_text}\n\n--- JOB-OPTIMIZED RESUME ---\n{optimized_resume}"
+        state["context"]["resume_output"] = optimized_resume
     else:
         state["agent_response"] = analysis_text
+    set_agent_result(
+        state,
+        {**response.model_dump(), "keyword_report": report},
+        state["context"].get("resume_output")
+    )
     
     state["messages"].append({
         "role": "assistant",
@@ -124,11 +281,15 @@ def enhancement_agent(state: ResumeState) -> ResumeState:
     chain = enhancement_chain()
     
     try:
-        response = chain.invoke({
-            "resume_content": state["resume_content"],
-            "user_query": state["user_query"],
-            "target_section": state["context"].get("target_section", "general")
-        })
+        # Reuse the enhancement precomputed after upload when it answers this request
+        response = claim_speculation(state["resume_content"], state["user_query"])
+        if response is None:
+            response = chain.invoke({
+                "resume_content": state["resume_content"],
+                "user_query": state["user_query"],
+                "target_section": state["context"].get("target_section", "general"),
+                "history": prompt_history(state)
+            })
         print(response)
         
         # Validate response has required fields
@@ -136,16 +297,22 @@ def enhancement_agent(state: ResumeState) -> ResumeState:
             raise ValueError("Invalid response: missing enhanced_content")
         
         # Update state with enhanced content
+        state["context"]["resume_output"] = response.enhanced_content
         state["agent_response"] = f"Enhanced Content:\n{response.enhanced_content}\n\n" + \
                                  f"Changes Made:\n" + \
                                  "\n".join(f"• {change}" for change in response.changes_made) + \
                                  f"\n\nImpact Score: {response.impact_score}/10"
+        set_agent_result(state, response.model_dump(), response.enhanced_content)
         
+    except LLMUnavailableError:
+        # Let the API answer 429/504 instead of apologising
+        raise
     except Exception as e:
         # Fallback response if LLM fails
         state["agent_response"] = f"I apologize, but I encountered an issue while enhancing your resume. " + \
                                  f"Error: {str(e)}\n\n" + \
                                  f"Please try rephrasing your request or contact support if the issue persists."
+        set_agent_result(state, error=str(e))
     
     state["messages"].append({
         "role": "assistant", 
@@ -154,6 +321,89 @@ def enhancement_agent(state: ResumeState) -> ResumeState:
     
     return state
 
+def enhancement_planner(state: ResumeState) -> dict:
+    """Split the resume into sections for parallel enhancement"""
+    plan = []
+    for index, section in enumerate(structured_resume(state["resume_content"]).sections):
+        # Header-less text at the top is the name and contact block, not a summary to rewrite
+        name = "contact" if index == 0 and section.header is None else section.name
+        plan.append({"name": name, "text": section.text, "enhance": name in FANOUT_SECTIONS and bool(section.text.strip())})
+    return {
+        "context": {**state["context"], "enhancement_plan": plan},
+        "section_results": RESET_SECTION_RESULTS
+    }
+
+def section_enhancer(task: dict) -> dict:
+    """Enhance a single resume section (one branch of the fan-out)"""
+    chain = enhancement_chain()
+    
+    try:
+        response = chain.invoke({
+            "resume_content": task["section_text"],
+            "user_query": task["user_query"],
+            "target_section": task["section_name"]
+        })
+        if not response.enhanced_content:
+            raise ValueError("Invalid response: missing enhanced_content")
+        result = {
+            "enhanced_content": response.enhanced_content.strip(),
+            "changes_made": response.changes_made,
+            "impact_score": response.impact_score
+        }
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        # Keep the original section so one failed branch doesn't lose the rest
+        result = {
+            "enhanced_content": task["section_text"].strip(),
+            "changes_made": [],
+            "impact_score": 0,
+            "error": str(e)
+        }
+    
+    return {"section_results": {str(task["section_index"]): result}}
+
+def enhancement_merger(state: ResumeState) -> ResumeState:
+    """Reassemble enhanced sections in order and combine their changes"""
+    plan = state["context"].get("enhancement_plan", [])
+    results = state.get("section_results") or {}
+    
+    parts, changes, scores, failed = [], [], [], []
+    for index, section in enumerate(plan):
+        result = results.get(str(index))
+        if not result:
+            parts.append(section["text"].strip())
+            continue
+        parts.append(result["enhanced_content"])
+        if result.get("error"):
+            failed.append(section["name"])
+            continue
+        changes.extend(f"{section['name'].title()}: {change}" for change in result["changes_made"])
+        scores.append(result["impact_score"])
+    
+    impact_score = round(sum(scores) / len(scores)) if scores else 0
+    state["context"]["resume_output"] = "\n\n".join(part for part in parts if part)
+    state["agent_response"] = f"Enhanced Content:\n{state['context']['resume_output']}\n\n" + \
+                             "Changes Made:\n" + \
+                             "\n".join(f"• {change}" for change in changes) + \
+                             f"\n\nImpact Score: {impact_score}/10"
+    if failed:
+        state["agent_response"] += f"\n\nThese sections were left unchanged after an error: {', '.join(failed)}"
+    set_agent_result(state, {
+        "enhanced_content": state["context"]["resume_output"],
+        "changes_made": changes,
+        "impact_score": impact_score,
+        "suggestions": [],
+        "unchanged_sections": failed
+    }, state["context"]["resume_output"])
+    
+    state["messages"].append({
+        "role": "assistant",
+        "content": state["agent_response"]
+    })
+    
+    return state
+
 def company_research_agent(state: ResumeState) -> ResumeState:
     """Research company and optimize resume accordingly"""
     chain = research_chain()
@@ -164,7 +414,8 @@ def company_research_agent(state: ResumeState) -> ResumeState:
     response = chain.invoke({
         "resume_content": state["resume_content"],
         "company_name": company_name,
-        "user_query": state["user_query"]
+        "user_query": state["user_query"],
+        "history": prompt_history(state)
     })
     
     # Format company insights for display
@@ -186,10 +437,16 @@ def company_research_agent(state: ResumeState) -> ResumeState:
     # Include optimized content if available
     if hasattr(response, 'optimized_content') and response.optimized_content and response.optimized_content.strip():
         state["agent_response"] = f"{analysis_text}\n\n--- COMPANY-OPTIMIZED RESUME ---\n{response.optimized_content}"
+        state["context"]["resume_output"] = response.optimized_content
     else:
         state["agent_response"] = analysis_text
     
     state["context"]["company_info"] = response.company_insights
+    set_agent_result(
+        state,
+        {**response.model_dump(), "company_name": company_name},
+        state["context"].get("resume_output")
+    )
     state["messages"].append({
         "role": "assistant",
         "content": state["agent_response"]
@@ -199,44 +456,122 @@ def company_research_agent(state: ResumeState) -> ResumeState:
 
 def translation_agent(state: ResumeState) -> ResumeState:
     """Translate and culturally adapt resume to target language"""
-    chain = translate_chain()
-    
     # Extract target language from context
     target_language = state["context"].get("target_language", "spanish")
     
     try:
-        response = chain.invoke({
-            "resume_content": state["resume_content"],
-            "user_query": state["user_query"],
-            "target_language": target_language
-        })
-        
-        # Validate response has required fields
-        if not hasattr(response, 'translated_content') or not response.translated_content:
-            raise ValueError("Invalid response: missing translated_content")
+        # Long resumes are translated section by section in parallel
+        translated_content = translate_resume(
+            state["resume_content"],
+            target_language,
+            state["user_query"]
+        )
         
         # Update state with translated content
-        language_names = {
-            "spanish": "Spanish",
-            "french": "French", 
-            "german": "German",
-            "portuguese": "Portuguese",
-            "italian": "Italian",
-            "chinese": "Chinese",
-            "japanese": "Japanese",
-            "korean": "Korean"
-        }
-        
-        language_display = language_names.get(target_language, target_language.title())
+        language_display = language_display_name(target_language)
         
-        state["agent_response"] = f"Resume translated to {language_display}:\n\n--- TRANSLATED RESUME ---\n{response.translated_content}"
+        state["agent_response"] = f"Resume translated to {language_display}:\n\n--- TRANSLATED RESUME ---\n{translated_content}"
+        state["context"]["resume_output"] = translated_content
+        set_agent_result(state, {
+            "target_language": target_language,
+            "language_name": language_display,
+            "translated_content": translated_content
+        }, translated_content)
         
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         # Fallback response if translation fails
         state["agent_response"] = f"I apologize, but I encountered an issue while translating your resume. " + \
                                  f"Error: {str(e)}\n\n" + \
                                  f"Please try rephrasing your request or contact support if the issue persists."
+        set_agent_result(state, error=str(e))
+    
+    state["messages"].append({
+        "role": "assistant",
+        "content": state["agent_response"]
+    })
+    
+    return state
+
+AGENTS = {
+    "job_matching": job_matching_agent,
+    "enhancement": enhancement_agent,
+    "company_research": company_research_agent,
+    "translation": translation_agent
+}
+
+def plan_dispatcher(state: ResumeState) -> dict:
+    """Advance a multi-intent plan to its next stage"""
+    stage = state["context"].get("plan_next_stage", 0)
+    stages = state["context"].get("plan_stages", [])
+    results = state.get("plan_results") or {}
+    
+    # Dependent stages work on the resume produced by the previous stage
+    resume_content = state["context"].get("plan_resume") or state["resume_content"]
+    if stage > 0:
+        previous = results.get(str(stages[stage - 1][-1]), {})
+        resume_content = previous.get("resume_output") or resume_content
+    
+    context = {**state["context"], "plan_current_stage": stage, "plan_next_stage": stage + 1, "plan_resume": resume_content}
+    update = {"context": context}
+    if stage == 0:
+        update["plan_results"] = RESET_SECTION_RESULTS
+    return update
+
+def plan_step(task: dict) -> dict:
+    """Run one plan step's agent on its own copy of the state"""
+    step = task["step"]
+    step_state = {
+        "messages": [],
+        "resume_content": task["resume_content"],
+        "resume_versions": [],
+        "current_intent": step["intent"],
+        "agent_response": "",
+        "agent_result": {},
+        "user_query": step["request"],
+        "context": dict(step["context"]),
+        "request_options": task.get("request_options") or {}
+    }
+    
+    try:
+        step_state = AGENTS[step["intent"]](step_state)
+        result = {
+            "intent": step["intent"],
+            "response": step_state["agent_response"],
+            "resume_output": step_state["context"].get("resume_output", ""),
+            "agent_result": step_state.get("agent_result") or {}
+        }
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        result = {"intent": step["intent"], "response": "", "resume_output": "", "error": str(e)}
+    
+    return {"plan_results": {str(task["step_index"]): result}}
+
+def plan_combiner(state: ResumeState) -> ResumeState:
+    """Combine the plan's step results into one response, in plan order"""
+    results = state.get("plan_results") or {}
+    parts, steps, resume_output = [], [], None
+    for index, step in enumerate(state["context"].get("plan", [])):
+        result = results.get(str(index), {})
+        title = f"--- STEP {index + 1}: {step['intent'].replace('_', ' ').upper()} ---"
+        if result.get("error"):
+            parts.append(f"{title}\nThis step could not be completed. Error: {result['error']}")
+            steps.append(AgentResult(type=step["intent"], error=result["error"]))
+        else:
+            parts.append(f"{title}\n{result.get('response', '')}")
+            steps.append(AgentResult(**result["agent_result"]) if result.get("agent_result") else AgentResult(type=step["intent"]))
+            # The last step that produced a resume has the plan's final version
+            resume_output = result.get("resume_output") or resume_output
     
+    state["agent_response"] = "\n\n".join(parts)
+    state["agent_result"] = AgentResult(
+        type="multi",
+        resume_output=resume_output,
+        resume_version=store_structured_resume(resume_output).version_id if resume_output else None,
+        steps=steps
+    ).model_dump()
     state["messages"].append({
         "role": "assistant",
         "content": state["agent_response"]
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import re
+from typing import AsyncIterator, List, Tuple
+
+from workflow.llm_gateway import Priority
+from workflow.pdf_jobs import render_resume_pdf
+from workflow.response_cache import content_hash
+
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", "4"))
+
+
+def safe_filename(name: str, default: str = "resume") -> str:
+    name = re.sub(r"[^\w\-. ]+", "_", name).strip(" ._")
+    return name[:80] or default
+
+
+async def export_version_pdfs(
+    versions: List[dict],
+    max_concurrency: int = EXPORT_MAX_CONCURRENCY,
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """
+    Render several resume versions to PDF concurrently
+
+    Versions with identical content are converted and compiled once. Entries
+    are yielded as each PDF finishes: "<name>.pdf" on success,
+    "<name>.error.txt" on failure, then a manifest.json describing the export.
+
+    Args:
+        versions: Dicts with "name" and "content"
+        max_concurrency: Maximum PDFs rendered at once
+    """
+    # Unique archive names, grouped by content so duplicates render once
+    names_by_hash = {}
+    content_by_hash = {}
+    used_names = set()
+    for index, version in enumerate(versions):
+        name = safe_filename(version.get("name") or f"resume_v{index + 1}")
+        base, suffix = name, 2
+        while name in used_names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+        digest = content_hash(version["content"])
+        names_by_hash.setdefault(digest, []).append(name)
+        content_by_hash[digest] = version["content"]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def render(digest: str):
+        async with semaphore:
+            try:
+                pdf_bytes = await asyncio.to_thread(render_resume_pdf, content_by_hash[digest], Priority.BATCH)
+                return digest, pdf_bytes, None
+            except Exception as e:
+                return digest, None, str(e)
+
+    manifest = []
+    tasks = [asyncio.create_task(render(digest)) for digest in content_by_hash]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            digest, pdf_bytes, error = await finished
+            for name in names_by_hash[digest]:
+                if error:
+                    manifest.append({"name": name, "success": False, "error": error})
+                    yield f"{name}.error.txt", error.encode("utf-8")
+                else:
+                    manifest.append({"name": name, "success": True, "file": f"{name}.pdf"})
+                    yield f"{name}.pdf", pdf_bytes
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    summary = {"versions": len(versions), "rendered": len(content_by_hash), "files": manifest}
+    yield "manifest.json", json.dumps(summary, indent=2).encode("utf-8")
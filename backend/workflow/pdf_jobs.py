@@ -0,0 +1,319 @@
+"""Background PDF generation.
+
+Jobs are persisted in a local SQLite queue so they survive client disconnects
+and server restarts, and are processed by a pool of worker threads sized
+independently of the API workers. Several API processes can share the same
+queue file; each job is claimed by exactly one worker.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils.env import load_env
+
+from utils.latex_compiler import compile_latex_to_pdf
+from utils.latex_template import is_renderable, render_latex
+from utils.resume_store import structured_resume
+from workflow.llm_gateway import Priority
+from workflow.response_cache import response_cache, content_hash
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+PDF_JOBS_DB_PATH = os.getenv("PDF_JOBS_DB_PATH", "pdf_jobs.db")
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", "2"))
+PDF_JOB_LEASE_SECONDS = float(os.getenv("PDF_JOB_LEASE_SECONDS", "600"))
+PDF_JOB_TTL_HOURS = float(os.getenv("PDF_JOB_TTL_HOURS", "24"))
+PDF_JOB_POLL_SECONDS = float(os.getenv("PDF_JOB_POLL_SECONDS", "1.0"))
+PDF_JOB_PURGE_INTERVAL_MINUTES = float(os.getenv("PDF_JOB_PURGE_INTERVAL_MINUTES", "60"))
+# Attempts to record a finished job before giving up (e.g. "database is locked")
+PDF_JOB_FINISH_ATTEMPTS = int(os.getenv("PDF_JOB_FINISH_ATTEMPTS", "3"))
+# llm: always convert with the LLM; auto: fill the built-in template when the parsed
+# structure is complete, else use the LLM; template: always use the template
+LATEX_RENDERER = os.getenv("LATEX_RENDERER", "llm").lower()
+
+LOCAL_CALLBACK_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+def convert_to_latex(content: str, priority: Priority = Priority.BACKGROUND) -> str:
+    """LaTeX source for resume text, reusing an earlier (or speculative) conversion"""
+    if LATEX_RENDERER != "llm":
+        structured = structured_resume(content)
+        if LATEX_RENDERER == "template" or is_renderable(structured):
+            return render_latex(structured)
+    cache_key = ("latex", content_hash(content))
+    latex_content = response_cache.get(cache_key)
+    if latex_content is None:
+        # Imported on first conversion so the API process starts without the LLM stack
+        from workflow.chains import latex_conversion_chain
+
+        latex_content = latex_conversion_chain(priority).invoke({"enhanced_content": content}).latex_content
+        response_cache.set(cache_key, latex_content)
+    return latex_content
+
+
+def render_resume_pdf(content: str, priority: Priority = Priority.BACKGROUND) -> bytes:
+    """Convert resume text to LaTeX with the LLM and compile it to PDF bytes"""
+    return compile_latex_to_pdf(convert_to_latex(content, priority))
+
+
+def is_local_callback(url: str) -> bool:
+    """Only http(s) callbacks to this host are allowed"""
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and parsed.hostname in LOCAL_CALLBACK_HOSTS
+
+
+class PDFJobQueue:
+    """Persistent PDF job queue with a worker thread pool"""
+
+    def __init__(self, db_path: str = PDF_JOBS_DB_PATH, workers: int = PDF_JOB_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[Callable[[dict], None]] = []
+        self._purge_lock = threading.Lock()
+        self._next_purge = 0.0
+        self._setup()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _setup(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pdf_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    callback_url TEXT,
+                    error TEXT,
+                    pdf BLOB,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pdf_jobs_status ON pdf_jobs (status, created_at)")
+        finally:
+            conn.close()
+
+    def submit(self, content: str, filename: str = "resume", callback_url: Optional[str] = None) -> str:
+        """Queue a PDF job and return its id"""
+        if callback_url and not is_local_callback(callback_url):
+            raise ValueError("callback_url must be an http(s) URL on localhost")
+        job_id = str(uuid.uuid4())
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO pdf_jobs (id, status, filename, content, callback_url, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, content, callback_url, time.time()),
+            )
+        finally:
+            conn.close()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str, include_pdf: bool = False) -> Optional[dict]:
+        """Return a job's status (and PDF bytes if requested), or None if unknown"""
+        columns = "id, status, filename, callback_url, error, created_at, started_at, finished_at"
+        if include_pdf:
+            columns += ", pdf"
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT {columns} FROM pdf_jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = dict(row)
+        job["queue_position"] = self._queue_position(job) if job["status"] == QUEUED else None
+        return job
+
+    def _queue_position(self, job: dict) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM pdf_jobs WHERE status = ? AND created_at < ?",
+                (QUEUED, job["created_at"]),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """Call listener(job) whenever a job finishes (from a worker thread)"""
+        self._listeners.append(listener)
+
+    def _claim(self) -> Optional[dict]:
+        """Atomically move the oldest queued job (or an expired lease) to running"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT id, filename, content, callback_url FROM pdf_jobs "
+                "WHERE status = ? OR (status = ? AND started_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now - PDF_JOB_LEASE_SECONDS),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE pdf_jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            return dict(row)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update_finished(self, job_id: str, status: str, pdf: Optional[bytes], error: Optional[str]):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE pdf_jobs SET status = ?, pdf = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, pdf, error, time.time(), job_id),
+            )
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, status: str, pdf: Optional[bytes] = None,
+                error: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Record a finished job, retrying; returns the (status, error) actually stored.
+
+        If the result can't be stored the job is marked failed instead; if even that
+        fails the error propagates and the job is re-claimed when its lease expires.
+        """
+        for attempt in range(1, PDF_JOB_FINISH_ATTEMPTS + 1):
+            try:
+                self._update_finished(job_id, status, pdf, error)
+                return status, error
+            except sqlite3.Error as e:
+                logger.warning(f"PDF job {job_id}: storing the result failed (attempt {attempt}): {str(e)}")
+                last_error = e
+                time.sleep(min(2 ** attempt * 0.1, 2.0))
+        error = f"Could not store the job result: {str(last_error)}"
+        self._update_finished(job_id, FAILED, None, error)
+        return FAILED, error
+
+    def _notify(self, job: dict):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"PDF job listener failed: {str(e)}")
+        if job.get("callback_url"):
+            import requests
+
+            try:
+                requests.post(
+                    job["callback_url"],
+                    json={key: job[key] for key in ("id", "status", "filename", "error")},
+                    timeout=10,
+                )
+            except Exception as e:
+                logger.warning(f"PDF job callback to {job['callback_url']} failed: {str(e)}")
+
+    def _process(self, job: dict):
+        logger.info(f"PDF job {job['id']} started")
+        try:
+            pdf_bytes = render_resume_pdf(job["content"])
+        except Exception as e:
+            logger.error(f"PDF job {job['id']} failed: {str(e)}")
+            status, error = self._finish(job["id"], FAILED, error=str(e))
+        else:
+            logger.info(f"PDF job {job['id']} succeeded, PDF size: {len(pdf_bytes)} bytes")
+            status, error = self._finish(job["id"], SUCCEEDED, pdf=pdf_bytes)
+        self._notify({**job, "status": status, "error": error})
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error(f"PDF job queue error: {str(e)}")
+                job = None
+            if job is None:
+                self._purge_if_due()
+                self._wakeup.wait(PDF_JOB_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                # Keep the worker alive; the job is re-claimed when its lease expires
+                logger.error(f"PDF job {job['id']} could not be recorded: {str(e)}")
+
+    def _purge_if_due(self):
+        """Purge finished jobs from an idle worker every PDF_JOB_PURGE_INTERVAL_MINUTES"""
+        if time.time() < self._next_purge or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            if time.time() < self._next_purge:
+                return
+            self._next_purge = time.time() + PDF_JOB_PURGE_INTERVAL_MINUTES * 60
+            purged = self.purge_finished()
+            if purged:
+                logger.info(f"Purged {purged} finished PDF jobs")
+        except Exception as e:
+            logger.warning(f"PDF job purge failed: {str(e)}")
+        finally:
+            self._purge_lock.release()
+
+    def purge_finished(self, ttl_hours: float = PDF_JOB_TTL_HOURS) -> int:
+        """Delete finished jobs older than ttl_hours"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "DELETE FROM pdf_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, time.time() - ttl_hours * 3600),
+            ).rowcount
+        finally:
+            conn.close()
+
+    def start(self):
+        """Start the worker threads; idle workers purge finished jobs periodically"""
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"pdf-job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop taking new jobs; running jobs are re-claimed after their lease if interrupted"""
+        self._stopping.set()
+        self._wakeup.set()
+        self._threads = []
+
+
+_queue = None
+
+
+def get_pdf_job_queue() -> PDFJobQueue:
+    """Return the process-wide PDF job queue"""
+    global _queue
+    if _queue is None:
+        _queue = PDFJobQueue()
+    return _queue
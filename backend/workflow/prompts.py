@@ -26,7 +26,7 @@ Resume Content: {resume_content}
 
 You must provide a structured response with these specific fields:
 
-1. intent: Must be exactly one of these values: "job_matching", "enhancement", or "company_research"
+1. intent: Must be exactly one of these values: "job_matching", "enhancement", "company_research", or "translation"
    - job_matching: User wants to match resume to a specific job description
    - enhancement: User wants to improve specific resume sections or overall quality  
    - company_research: User wants to optimize resume for a specific company
@@ -36,6 +36,14 @@ You must provide a structured response with these specific fields:
 
 3. reasoning: A brief string explaining why you chose this classification
 
+4. plan: Only when the user asks for MORE THAN ONE of these things in the same message, an ordered list of steps; otherwise an empty list. Each step has:
+   - intent: one of the intent values above
+   - request: a short instruction for this step with the details it needs, such as the company name or target language (e.g. "tailor the resume to the job description", "translate the resume to German"). Never copy the job description or resume text into it; the pasted job description is passed to job matching steps separately
+   - depends_on_previous: true if the step must work on the resume produced by the previous step (e.g. "tailor for Google and then translate to German" - the translation depends on the tailored resume); false if it only needs the original resume (e.g. "analyze my match for this job and research Netflix")
+   When a plan is given, set intent to the first step's intent.
+
+5. keyword_gaps_only: true only when the user's own request just asks which skills or keywords their resume is missing for the job (e.g. "which keywords am I missing?"); false when they also want a match analysis, a score or an optimized resume. Words in a pasted job description (like "skills" or "what you'll bring") do not count
+
 Analyze the user's query carefully to determine their primary intent.
 """
 
@@ -48,8 +56,11 @@ RESUME TO ANALYZE & OPTIMIZE:
 JOB DESCRIPTION: {job_description}
 USER REQUEST: {user_query}
 
+KEYWORD ANALYSIS (exact matches against a skills taxonomy, computed before this request):
+{skill_facts}
+
 TASK: 
-1. Analyze the match between resume and job requirements
+1. Analyze the match between resume and job requirements. Treat the keyword analysis as ground truth for which listed skills the resume has or lacks, and add gaps it cannot see (seniority, domain, certifications)
 2. Optimize the resume content to better align with the job description
 3. Focus on ATS keywords, quantifiable achievements, and job-specific alignment
 
@@ -379,3 +390,48 @@ QUALITY STANDARDS:
 
 Now translate and adapt the resume following these guidelines:
 """
+
+section_translate_prompt = """
+You are an expert resume translator. You are translating ONE section of a longer resume; the other sections are being translated separately and will be joined with yours in the original order.
+
+SECTION ({section_name}) TO TRANSLATE:
+{resume_content}
+
+USER REQUEST: {user_query}
+TARGET LANGUAGE: {target_language}
+
+GLOSSARY - keep these terms exactly as written, in English:
+{glossary}
+
+RULES:
+1. Translate the section heading and all content of this section into the target language
+2. Keep every glossary term unchanged so terminology is consistent across sections
+3. Keep the section's line structure, bullets and ordering
+4. Do not add, summarize or invent content, and do not add other sections
+5. Adapt job titles and phrasing to professional conventions of the target language
+
+You must provide a structured response with:
+
+1. translated_content: The translated text of this section only
+"""
+
+memory_summary_prompt = """
+You keep a running summary of a resume-editing conversation so older turns can be dropped from the prompt.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW TURNS TO FOLD IN:
+{turns}
+
+Update the summary with the new turns. Keep:
+- What the user asked for and what was changed (sections, target jobs, companies, languages)
+- Preferences and constraints the user stated (tone, length, things to keep or avoid)
+- Open follow-ups the user may refer back to
+
+Drop resume text, greetings and anything already superseded. Write plain sentences, at most {max_words} words.
+
+You must provide a structured response with:
+
+1. summary: The updated summary
+"""
@@ -0,0 +1,286 @@
+"""WebSocket session channel.
+
+One connection per chat session carries chat turns, partial results, PDF job
+notices and heartbeats as JSON messages. Every client request has an "id"
+that is echoed on all messages it produces, so several requests can be in
+flight on one connection. The session remembers the last resume sent, so
+follow-up chat messages don't need to repeat it.
+
+Client -> server:
+    {"type": "chat", "id": "c1", "message": "...", "resume_content": "...",    # resume optional
+     "enhancement_mode": "fanout", "include_text": true}
+    {"type": "set_resume", "resume_content": "..."}
+    {"type": "cancel", "id": "c1"}
+    {"type": "pdf_job", "id": "p1", "enhanced_content": "...", "filename": "resume"}
+    {"type": "watch_pdf_job", "job_id": "..."}
+    {"type": "ping"}
+
+Server -> client:
+    {"type": "started" | "cancelled", "id": ...}
+    {"type": "progress", "id": ..., "node": "classifier", ...}
+    {"type": "partial", "id": ..., "node": "section_enhancer" | "plan_step", "data": {...}}
+    {"type": "result", "id": ..., <same fields as the /chat response>}
+    {"type": "pdf_job_queued", "id": ..., "job_id": ...}
+    {"type": "pdf_job", "id": ..., "job_id": ..., "status": "succeeded" | "failed", ...}
+    {"type": "error", "id": ..., "status": 400 | 429 | 500 | 504, "detail": ..., "retry_after": ...}
+    {"type": "heartbeat", "time": ..., "in_flight": [...]}, {"type": "pong"}
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Set
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+
+from workflow.llm_gateway import LLMOverloadedError, LLMDeadlineExceeded
+from workflow.memory import memory_usage
+from workflow.models import RESPONSE_SCHEMA_VERSION
+from workflow.pdf_jobs import get_pdf_job_queue, SUCCEEDED, FAILED
+from workflow.startup import ensure_loaded
+
+logger = logging.getLogger(__name__)
+
+WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+# Connections that send nothing (not even a ping) for this long are closed
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "120"))
+
+# job id -> channels waiting for that job
+_pdf_watchers: Dict[str, Set["SessionChannel"]] = {}
+_pdf_watchers_lock = threading.Lock()
+
+
+def notify_pdf_job(job: dict):
+    """PDF job queue listener (runs on a worker thread): push the result to watching channels"""
+    with _pdf_watchers_lock:
+        channels = list(_pdf_watchers.get(job["id"], ()))
+    for channel in channels:
+        channel.loop.call_soon_threadsafe(channel.pdf_job_finished, job)
+
+
+def pdf_job_message(job: dict, request_id: str = None) -> dict:
+    return {
+        "type": "pdf_job",
+        "id": request_id,
+        "job_id": job["id"],
+        "status": job["status"],
+        "filename": job.get("filename"),
+        "error": job.get("error"),
+        "result_url": f"/pdf-jobs/{job['id']}/result" if job["status"] == SUCCEEDED else None
+    }
+
+
+def node_update_message(request_id: str, node: str, update: dict) -> dict:
+    """Turn a finished graph node into a progress or partial-result message"""
+    update = update or {}
+    if node == "section_enhancer":
+        index, result = next(iter(update.get("section_results", {}).items()), (None, {}))
+        return {"type": "partial", "id": request_id, "node": node, "data": {"section_index": index, **result}}
+    if node == "plan_step":
+        index, result = next(iter(update.get("plan_results", {}).items()), (None, {}))
+        return {"type": "partial", "id": request_id, "node": node, "data": {"step_index": index, **result}}
+
+    message = {"type": "progress", "id": request_id, "node": node}
+    if node == "classifier":
+        message["intent"] = update.get("current_intent")
+        if update.get("current_intent") == "multi":
+            message["plan"] = [step["intent"] for step in update["context"].get("plan", [])]
+    elif node == "enhancement_planner":
+        message["sections"] = [
+            section["name"] for section in update.get("context", {}).get("enhancement_plan", [])
+            if section["enhance"]
+        ]
+    return message
+
+
+class SessionChannel:
+    """Serves one WebSocket connection for a user's chat session"""
+
+    def __init__(self, websocket: WebSocket, user_id: str, session_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.session_id = session_id
+        self.resume_content = ""
+        self.loop = asyncio.get_running_loop()
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._requests: Dict[str, asyncio.Task] = {}
+        # Chat turns share one checkpoint thread, so they run one at a time in arrival order
+        self._turn_lock = asyncio.Lock()
+        self._watched_jobs: Dict[str, str] = {}  # job id -> request id
+
+    def send(self, message: dict):
+        self._outbox.put_nowait(message)
+
+    async def run(self):
+        """Accept the connection and serve it until the client leaves or goes idle"""
+        await self.websocket.accept()
+        sender = asyncio.create_task(self._sender())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(self.websocket.receive_text(), WS_IDLE_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    logger.info(f"Closing idle session channel {self.session_id}")
+                    await self.websocket.close(code=1001)
+                    break
+                self._dispatch(raw)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            heartbeat.cancel()
+            for task in self._requests.values():
+                task.cancel()
+            for job_id in list(self._watched_jobs):
+                self._unwatch(job_id)
+            sender.cancel()
+
+    async def _sender(self):
+        # A single writer keeps frames from concurrent requests from interleaving
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self.websocket.send_text(orjson.dumps(message).decode())
+            except Exception:
+                return
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(WS_HEARTBEAT_SECONDS)
+            self.send({"type": "heartbeat", "time": time.time(), "in_flight": list(self._requests)})
+            # Jobs finished by another API process don't reach this process's listener
+            for job_id in list(self._watched_jobs):
+                job = await asyncio.to_thread(get_pdf_job_queue().get, job_id)
+                if job and job["status"] in (SUCCEEDED, FAILED):
+                    self.pdf_job_finished(job)
+
+    def _dispatch(self, raw: str):
+        try:
+            message = orjson.loads(raw)
+            kind = message["type"]
+        except Exception:
+            self.send({"type": "error", "id": None, "status": 400, "detail": "Messages must be JSON objects with a type"})
+            return
+        request_id = message.get("id")
+
+        if kind == "ping":
+            self.send({"type": "pong", "id": request_id})
+        elif kind == "set_resume":
+            self.resume_content = message.get("resume_content") or ""
+        elif kind == "chat":
+            if not request_id or not message.get("message"):
+                self.send({"type": "error", "id": request_id, "status": 400, "detail": "chat requires id and message"})
+            elif request_id in self._requests:
+                self.send({"type": "error", "id": request_id, "status": 400, "detail": "Request id is already in use"})
+            else:
+                task = asyncio.create_task(self._chat(request_id, message))
+                self._requests[request_id] = task
+                task.add_done_callback(lambda _: self._requests.pop(request_id, None))
+        elif kind == "cancel":
+            task = self._requests.get(request_id)
+            if task:
+                task.cancel()
+                self.send({"type": "cancelled", "id": request_id})
+        elif kind == "pdf_job":
+            self._submit_pdf_job(request_id, message)
+        elif kind == "watch_pdf_job":
+            self._watch(message.get("job_id"), request_id)
+        else:
+            self.send({"type": "error", "id": request_id, "status": 400, "detail": f"Unknown message type: {kind}"})
+
+    async def _chat(self, request_id: str, message: dict):
+        """Run one chat turn, streaming node progress and partial results"""
+        async with self._turn_lock:
+            self.send({"type": "started", "id": request_id})
+            await ensure_loaded("workflow.graph")
+            from workflow.graph import get_user_config, initial_chat_state, stream_with_checkpointer
+
+            if message.get("resume_content") is not None:
+                self.resume_content = message["resume_content"]
+            initial_state = initial_chat_state(
+                message["message"],
+                self.resume_content,
+                {"enhancement_mode": message.get("enhancement_mode")}
+            )
+
+            try:
+                final_state = {}
+                async for kind, node, payload in stream_with_checkpointer(
+                    initial_state, get_user_config(self.user_id, self.session_id)
+                ):
+                    if kind == "update":
+                        self.send(node_update_message(request_id, node, payload))
+                    else:
+                        final_state = payload or {}
+            except LLMOverloadedError as e:
+                self.send({
+                    "type": "error", "id": request_id, "status": 429,
+                    "detail": f"The assistant is busy, please retry shortly: {str(e)}",
+                    "retry_after": e.retry_after
+                })
+                return
+            except LLMDeadlineExceeded as e:
+                self.send({
+                    "type": "error", "id": request_id, "status": 504,
+                    "detail": f"The assistant took too long to respond, please retry: {str(e)}"
+                })
+                return
+            except Exception as e:
+                logger.error(f"Session channel chat failed: {str(e)}")
+                self.send({"type": "error", "id": request_id, "status": 500, "detail": f"Error processing chat: {str(e)}"})
+                return
+
+            self.send({
+                "type": "result",
+                "id": request_id,
+                "success": True,
+                "schema_version": RESPONSE_SCHEMA_VERSION,
+                "response": final_state.get("agent_response", "") if message.get("include_text", True) else "",
+                "intent": final_state.get("current_intent", ""),
+                "session_id": self.session_id,
+                "result": final_state.get("agent_result") or None,
+                "memory": memory_usage(final_state)
+            })
+
+    def _submit_pdf_job(self, request_id: str, message: dict):
+        try:
+            job_id = get_pdf_job_queue().submit(
+                message.get("enhanced_content") or "",
+                filename=message.get("filename") or "resume"
+            )
+        except Exception as e:
+            self.send({"type": "error", "id": request_id, "status": 500, "detail": f"Could not queue PDF job: {str(e)}"})
+            return
+        self.send({"type": "pdf_job_queued", "id": request_id, "job_id": job_id})
+        self._watch(job_id, request_id)
+
+    def _watch(self, job_id: str, request_id: str = None):
+        job = get_pdf_job_queue().get(job_id) if job_id else None
+        if job is None:
+            self.send({"type": "error", "id": request_id, "status": 404, "detail": "PDF job not found"})
+            return
+        self._watched_jobs[job_id] = request_id
+        with _pdf_watchers_lock:
+            _pdf_watchers.setdefault(job_id, set()).add(self)
+        # The job may have finished before we started watching it
+        if job["status"] in (SUCCEEDED, FAILED):
+            self.pdf_job_finished(job)
+
+    def _unwatch(self, job_id: str):
+        self._watched_jobs.pop(job_id, None)
+        with _pdf_watchers_lock:
+            channels = _pdf_watchers.get(job_id)
+            if channels is not None:
+                channels.discard(self)
+                if not channels:
+                    del _pdf_watchers[job_id]
+
+    def pdf_job_finished(self, job: dict):
+        """Send a job's completion once (called on the event loop)"""
+        if job["id"] not in self._watched_jobs:
+            return
+        request_id = self._watched_jobs[job["id"]]
+        self._unwatch(job["id"])
+        self.send(pdf_job_message(job, request_id))
@@ -0,0 +1,65 @@
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+import xxhash
+
+
+def input_key(name: str, inputs: Any) -> str:
+    """Hash a chain name and its input into a coalescing key"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return f"{name}:{xxhash.xxh3_128_hexdigest(payload)}"
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is
+    still in flight wait on the same future and share its result (or error).
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _join(self, key: str, name: str):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "executed": 0, "coalesced": 0})
+            stats["calls"] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                stats["coalesced"] += 1
+                return future, False
+            stats["executed"] += 1
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def run(self, name: str, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers with the same key"""
+        future, leader = self._join(key, name)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return per-name counts of calls, executions and coalesced calls"""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
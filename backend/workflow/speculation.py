@@ -0,0 +1,149 @@
+"""Speculative pre-computation after upload.
+
+Most users follow an upload with "enhance my resume overall". When enabled,
+the upload starts that enhancement (and the LaTeX conversion of its output)
+in the background at BATCH priority, keyed by the resume's content hash.
+The first chat turn on that resume either claims the result, waiting for it
+if it is still running, or cancels the speculation when it asks for
+something else.
+"""
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from utils.latex_compiler import is_latex_available
+from workflow.llm_gateway import Priority
+from workflow.models import EnhancementResponse
+from workflow.pdf_jobs import convert_to_latex
+from workflow.response_cache import response_cache, content_hash
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_PRECOMPUTE = os.getenv("SPECULATIVE_PRECOMPUTE", "false").lower() == "true"
+SPECULATIVE_LATEX = os.getenv("SPECULATIVE_LATEX", "true").lower() == "true"
+SPECULATION_WORKERS = int(os.getenv("SPECULATION_WORKERS", "2"))
+SPECULATION_TTL_SECONDS = float(os.getenv("SPECULATION_TTL_SECONDS", "1800"))
+# How long a matching first request waits for a speculation still in flight
+SPECULATION_WAIT_SECONDS = float(os.getenv("SPECULATION_WAIT_SECONDS", "120"))
+
+SPECULATIVE_QUERY = "Please enhance my resume overall"
+# Requests answered by the speculative result (compared after normalize_query)
+GENERAL_ENHANCEMENT_QUERIES = {
+    "please enhance my resume overall",
+    "enhance my resume overall",
+    "enhance my resume",
+    "please enhance my resume",
+    "improve my resume",
+    "please improve my resume",
+}
+
+_executor = ThreadPoolExecutor(max_workers=SPECULATION_WORKERS, thread_name_prefix="speculation")
+_lock = threading.Lock()
+_inflight: Dict[str, Future] = {}
+_stats = {"started": 0, "hits": 0, "cancelled": 0, "failed": 0}
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def is_general_enhancement(query: str) -> bool:
+    return normalize_query(query) in GENERAL_ENHANCEMENT_QUERIES
+
+
+def _cache_key(resume_hash: str) -> tuple:
+    return ("speculative_enhancement", resume_hash)
+
+
+def _speculate(resume_content: str) -> EnhancementResponse:
+    from workflow.chains import enhancement_chain
+
+    response = enhancement_chain(Priority.BATCH).invoke({
+        "resume_content": resume_content,
+        "user_query": SPECULATIVE_QUERY,
+        "target_section": "general"
+    })
+    if not response.enhanced_content:
+        raise ValueError("Invalid response: missing enhanced_content")
+    if SPECULATIVE_LATEX and is_latex_available():
+        # Pre-render the LaTeX source the PDF download would ask for next
+        try:
+            convert_to_latex(response.enhanced_content, Priority.BATCH)
+        except Exception as e:
+            logger.warning(f"Speculative LaTeX conversion failed: {str(e)}")
+    return response
+
+
+def _finished(resume_hash: str, future: Future):
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        logger.warning(f"Speculative enhancement failed: {str(future.exception())}")
+    with _lock:
+        if future.exception() is not None:
+            _stats["failed"] += 1
+        if _inflight.get(resume_hash) is not future:
+            return  # claimed or cancelled while running: the result is not cached
+        del _inflight[resume_hash]
+        if future.exception() is None:
+            # Published under the lock so a claim sees either the future or the cached result
+            response_cache.set(_cache_key(resume_hash), future.result(), SPECULATION_TTL_SECONDS)
+
+
+def start_speculation(resume_content: str) -> bool:
+    """Start the speculative enhancement for a resume; True if a result is ready or on its way"""
+    if not resume_content.strip():
+        return False
+    resume_hash = content_hash(resume_content)
+    with _lock:
+        if resume_hash in _inflight or response_cache.get(_cache_key(resume_hash)) is not None:
+            return True
+        future = _executor.submit(_speculate, resume_content)
+        _inflight[resume_hash] = future
+        _stats["started"] += 1
+    future.add_done_callback(lambda done: _finished(resume_hash, done))
+    return True
+
+
+def cancel_speculation(resume_content: str):
+    """Drop the speculation for a resume whose first request asked for something else"""
+    resume_hash = content_hash(resume_content)
+    with _lock:
+        future = _inflight.pop(resume_hash, None)
+    # A running call can't be interrupted; its result is simply discarded
+    cancelled = future.cancel() if future else False
+    if response_cache.pop(_cache_key(resume_hash)) is not None or future is not None:
+        with _lock:
+            _stats["cancelled"] += 1
+        logger.info(f"Speculative enhancement dropped (started: {future is not None and not cancelled})")
+
+
+def claim_speculation(resume_content: str, user_query: str) -> Optional[EnhancementResponse]:
+    """Return the speculative enhancement if it answers this request, else None"""
+    if not is_general_enhancement(user_query):
+        return None
+    resume_hash = content_hash(resume_content)
+    with _lock:
+        # Claimed atomically: a future taken out of _inflight is never cached by _finished,
+        # so the speculative answer is served once and can't resurface on a later turn
+        future = _inflight.pop(resume_hash, None)
+        response = response_cache.pop(_cache_key(resume_hash)) if future is None else None
+    if future is not None:
+        try:
+            response = future.result(timeout=SPECULATION_WAIT_SECONDS)
+        except Exception:
+            # Still queued after the wait: don't run it at all
+            future.cancel()
+            return None
+    if response is not None:
+        with _lock:
+            _stats["hits"] += 1
+    return response
+
+
+def speculation_stats() -> dict:
+    with _lock:
+        return {**_stats, "in_flight": len(_inflight), "enabled": SPECULATIVE_PRECOMPUTE}
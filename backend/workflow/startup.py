@@ -0,0 +1,97 @@
+"""API startup budget and lazy loading of heavy subsystems.
+
+main.py imports this module first: it starts the startup clock and loads
+.env once for the process. LangGraph, Bedrock (boto3), Tavily and the PDF
+parsers are not imported at startup; a background thread loads them once
+the app is serving (WARM_IMPORTS), and a request that needs one earlier
+imports it off the event loop with ensure_loaded. /health reports the
+measured import and ready times against STARTUP_BUDGET_SECONDS.
+
+Profile what the API imports with `python -m benchmarks.bench_startup`.
+"""
+import time
+
+_started = time.perf_counter()
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Set
+
+from utils.env import load_env
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Seconds from the start of the API import until it serves requests
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "1.5"))
+WARM_IMPORTS = os.getenv("WARM_IMPORTS", "true").lower() == "true"
+# Loaded in the background after startup, in this order
+WARM_MODULES = (
+    "workflow.graph",
+    "workflow.translation",
+    "workflow.checkpoint_store",
+    "pymupdf",
+    "langchain_pymupdf4llm",
+    "langchain_community.document_loaders",
+    "langchain_tavily",
+)
+
+_marks: Dict[str, float] = {}
+_lock = threading.Lock()
+# Modules whose import has finished; sys.modules also holds modules mid-import
+_loaded: Set[str] = set()
+
+
+def mark_startup(name: str):
+    """Record seconds since the startup clock started for a milestone"""
+    with _lock:
+        _marks[name] = round(time.perf_counter() - _started, 3)
+    if name == "ready" and _marks[name] > STARTUP_BUDGET_SECONDS:
+        logger.warning(f"API startup took {_marks[name]:.2f}s, over the {STARTUP_BUDGET_SECONDS:.2f}s budget")
+
+
+def _import(name: str):
+    importlib.import_module(name)
+    _loaded.add(name)
+
+
+def _warm(modules: Iterable[str]):
+    for name in modules:
+        try:
+            _import(name)
+        except Exception as e:
+            # The request that needs it will raise the real error
+            logger.warning(f"Warm-up import of {name} failed: {str(e)}")
+    mark_startup("warm")
+
+
+def start_warm_up(modules: Iterable[str] = WARM_MODULES):
+    """Import heavy subsystems in a background thread so first requests don't pay for them"""
+    if WARM_IMPORTS:
+        threading.Thread(target=_warm, args=(tuple(modules),), name="warm-imports", daemon=True).start()
+
+
+async def ensure_loaded(name: str):
+    """Import a module off the event loop if it isn't loaded yet.
+
+    A module the warm-up thread is still importing is in sys.modules already, so
+    this waits in a worker thread (on the import lock) until its import finishes.
+    """
+    if name not in _loaded:
+        await asyncio.to_thread(_import, name)
+
+
+def startup_report() -> dict:
+    """Measured startup milestones, in seconds since the API module started importing"""
+    with _lock:
+        marks = dict(_marks)
+    return {
+        **marks,
+        "budget_seconds": STARTUP_BUDGET_SECONDS,
+        "within_budget": marks["ready"] <= STARTUP_BUDGET_SECONDS if "ready" in marks else None,
+        "warmed": "warm" in marks,
+    }
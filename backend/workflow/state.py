@@ -1,10 +1,25 @@
-from typing import TypedDict, List, Optional
+from typing import TypedDict, List, Optional, Annotated
+
+# Written by a fan-out planner to clear results left from an earlier turn
+# (used for both section_results and plan_results)
+RESET_SECTION_RESULTS = {"__reset__": True}
+
+def merge_section_results(left: dict, right: dict) -> dict:
+    """Reducer for parallel section results: merge by key, or reset"""
+    if right and right.get("__reset__"):
+        return {key: value for key, value in right.items() if key != "__reset__"}
+    return {**(left or {}), **(right or {})}
 
 class ResumeState(TypedDict):
-    messages: List[dict]
+    messages: List[dict]  # last MEMORY_RECENT_TURNS turns (see workflow.memory)
+    memory: dict  # {"summary", "summarized_turns"} for turns folded out of messages
     resume_content: str
     resume_versions: List[dict]
     current_intent: str
     agent_response: str
+    agent_result: dict  # AgentResult payload for API clients
     user_query: str
     context: dict
+    request_options: dict
+    section_results: Annotated[dict, merge_section_results]
+    plan_results: Annotated[dict, merge_section_results]
@@ -0,0 +1,137 @@
+"""Token accounting and output-length planning for LLM calls.
+
+Prompt tokens are counted locally before every call. Rewriting chains (and
+the intent classifier, whose plan grows with the request) get max_tokens
+sized from the text they work on and the chain's expected output/input
+ratio, capped by the profile's max_tokens. Short calls stop reserving
+gateway budget they never use, and long resumes stop being truncated. A
+resume whose planned output would not fit under the cap is processed
+section by section instead (see exceeds_output_budget).
+"""
+import math
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+# Multiplier on planned output, since token counts are estimates
+TOKEN_SAFETY_MARGIN = float(os.getenv("TOKEN_SAFETY_MARGIN", "1.15"))
+MIN_OUTPUT_TOKENS = int(os.getenv("MIN_OUTPUT_TOKENS", "1024"))
+# Planned max_tokens are rounded up to this step so a few client configurations are reused
+OUTPUT_TOKEN_STEP = 512
+
+# chain -> (input holding the text being rewritten, output tokens per input token, fixed extra)
+# Chains not listed (memory_summary) use their profile's max_tokens as is.
+OUTPUT_PLANS = {
+    # The plan's steps restate parts of the request
+    "intent": ("user_query", 0.6, 400),
+    "enhancement": ("resume_content", 1.3, 600),
+    "job_matching": ("resume_content", 1.0, 1000),
+    "research": ("resume_content", 1.0, 1200),
+    "translate": ("resume_content", 1.8, 300),
+    "translate_section": ("resume_content", 1.8, 200),
+    "latex_conversion": ("enhanced_content", 2.2, 1200),
+}
+
+# Words and number groups are counted in pieces; CJK characters and symbols one token each
+_TOKEN_PIECE = re.compile(r"[぀-ヿ㐀-鿿가-힯]|[^\W\d_]+|\d{1,3}|[^\w\s]")
+
+
+class PromptTooLargeError(ValueError):
+    """Raised when a prompt alone does not fit in the model's context window"""
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the model's token count for text without a tokenizer
+
+    Latin-script words count one token per started 5 characters, digits one
+    per group of three, and CJK characters and punctuation one each.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        tokens += 1 if len(piece) <= 5 else math.ceil(len(piece) / 5)
+    return tokens
+
+
+def count_prompt_tokens(prompt, inputs: dict) -> int:
+    """Count the tokens of a prompt template rendered with inputs"""
+    messages = prompt.format_messages(**inputs)
+    # A few tokens of role/turn framing per message
+    return sum(count_tokens(message.content) + 4 for message in messages if isinstance(message.content, str))
+
+
+def planned_output_tokens(name: str, text: str) -> Optional[int]:
+    """Output tokens a chain is expected to need for text, or None if it has no plan"""
+    plan = OUTPUT_PLANS.get(name)
+    if plan is None:
+        return None
+    _, ratio, extra = plan
+    return int((count_tokens(text) * ratio + extra) * TOKEN_SAFETY_MARGIN)
+
+
+def plan_max_tokens(name: str, inputs: dict, profile: dict, prompt_tokens: int) -> Tuple[int, bool]:
+    """
+    Pick max_tokens for one call
+
+    Args:
+        name: Chain name
+        inputs: The call's inputs
+        profile: The chain's model profile (max_tokens is the cap)
+        prompt_tokens: Counted prompt tokens for the call
+
+    Returns:
+        Tuple[int, bool]: max_tokens to request, and whether the plan hit the cap
+    """
+    cap = profile["max_tokens"]
+    plan = OUTPUT_PLANS.get(name)
+    capped = False
+    if plan is None:
+        max_tokens = cap
+    else:
+        wanted = planned_output_tokens(name, str(inputs.get(plan[0], "")))
+        capped = wanted > cap
+        max_tokens = min(cap, OUTPUT_TOKEN_STEP * math.ceil(max(wanted, MIN_OUTPUT_TOKENS) / OUTPUT_TOKEN_STEP))
+
+    room = profile["context_window"] - prompt_tokens
+    if room < min(max_tokens, MIN_OUTPUT_TOKENS):
+        raise PromptTooLargeError(
+            f"{name} prompt is about {prompt_tokens} tokens, too long for the "
+            f"{profile['context_window']}-token context window"
+        )
+    return min(max_tokens, room), capped
+
+
+def exceeds_output_budget(name: str, text: str, profile: dict) -> bool:
+    """True if rewriting text in one call would not fit the chain's max_tokens"""
+    wanted = planned_output_tokens(name, text)
+    return wanted is not None and wanted > profile["max_tokens"]
+
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def record_budget(name: str, prompt_tokens: int, max_tokens: int, capped: bool):
+    """Record one call's prompt size and planned output"""
+    with _lock:
+        stats = _stats.setdefault(name, {"calls": 0, "prompt_tokens": 0, "max_tokens": 0, "capped": 0})
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["max_tokens"] += max_tokens
+        stats["capped"] += int(capped)
+
+
+def budget_stats() -> Dict[str, dict]:
+    """Return per-chain average prompt tokens and planned max_tokens"""
+    with _lock:
+        return {
+            name: {
+                "calls": stats["calls"],
+                "avg_prompt_tokens": stats["prompt_tokens"] // stats["calls"],
+                "avg_max_tokens": stats["max_tokens"] // stats["calls"],
+                # Calls whose plan hit the profile cap (output may be cut short)
+                "capped": stats["capped"],
+            }
+            for name, stats in _stats.items()
+        }
@@ -0,0 +1,216 @@
+import asyncio
+import os
+import re
+from typing import AsyncIterator, List, Optional
+
+from utils.resume_store import structured_resume
+from workflow.chains import translate_chain, section_translate_chain
+from workflow.helpers import get_model_profile
+from workflow.token_budget import exceeds_output_budget
+from workflow.response_cache import response_cache, content_hash
+
+TRANSLATION_MAX_CONCURRENCY = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "4"))
+# auto: chunk resumes longer than TRANSLATION_CHUNK_THRESHOLD_CHARS; single/chunked force a mode
+TRANSLATION_MODE = os.getenv("TRANSLATION_MODE", "auto").lower()
+TRANSLATION_CHUNK_THRESHOLD_CHARS = int(os.getenv("TRANSLATION_CHUNK_THRESHOLD_CHARS", "6000"))
+TRANSLATION_SECTION_CONCURRENCY = int(os.getenv("TRANSLATION_SECTION_CONCURRENCY", "6"))
+
+# Language detection patterns; the first entry of each is its ISO 639-1 code
+LANGUAGE_PATTERNS = {
+    "spanish": ["es", "spanish", "español", "mexican", "mexico", "castellano"],
+    "french": ["fr", "french", "français", "francais"],
+    "german": ["de", "german", "deutsch", "alemán"],
+    "portuguese": ["pt", "portuguese", "português", "portugues", "brazilian", "brasil"],
+    "italian": ["it", "italian", "italiano"],
+    "chinese": ["zh", "chinese", "mandarin", "中文"],
+    "japanese": ["ja", "japanese", "日本語", "nihongo"],
+    "korean": ["ko", "korean", "한국어", "hangul"]
+}
+
+LANGUAGE_NAMES = {
+    "spanish": "Spanish",
+    "french": "French",
+    "german": "German",
+    "portuguese": "Portuguese",
+    "italian": "Italian",
+    "chinese": "Chinese",
+    "japanese": "Japanese",
+    "korean": "Korean"
+}
+
+
+def normalize_language(language: str) -> str:
+    """Map a language name, alias or ISO code (e.g. "Deutsch", "de") to its canonical key"""
+    value = language.strip().lower()
+    # Region subtags such as "pt-BR" or "zh_CN"
+    base = re.split(r"[-_]", value)[0]
+    for lang, patterns in LANGUAGE_PATTERNS.items():
+        if value == lang or value in patterns or base in patterns[:1]:
+            return lang
+    return value
+
+
+def language_display_name(language: str) -> str:
+    return LANGUAGE_NAMES.get(normalize_language(language), language.title())
+
+
+def mentioned_language(text: str) -> Optional[str]:
+    """The first language named in free text, or None.
+
+    ISO codes are only recognised as a whole value (normalize_language): in a
+    sentence, "it", "de" and "es" are ordinary words.
+    """
+    lowered = text.lower()
+    for lang, patterns in LANGUAGE_PATTERNS.items():
+        if any(pattern in lowered for pattern in patterns[1:]):
+            return lang
+    return None
+
+
+# Terms that read as technology names: acronyms (AWS, SQL), mixed case
+# (JavaScript, PostgreSQL), or names with digits/symbols (C++, Node.js, EC2)
+_TECH_TERM = re.compile(
+    r"(?<![\w.+#-])("
+    r"[A-Z]{2,6}s?\d*"
+    r"|[A-Za-z]+[A-Z][A-Za-z0-9]*"
+    r"|[A-Za-z]+(?:\+\+|#)"
+    r"|\.?[A-Za-z][A-Za-z0-9]*\.(?:js|NET|io|py)"
+    r"|[A-Za-z]+\d+[A-Za-z0-9]*"
+    r"|\.NET"
+    r")(?![\w+#-])"
+)
+_GLOSSARY_LIMIT = 150
+
+
+def build_translation_glossary(resume_content: str) -> List[str]:
+    """Collect technical terms to keep in English across all translated sections"""
+    resume = structured_resume(resume_content)
+    # Every listed skill is a term, even if lowercase
+    terms = {skill: None for skill in resume.skills if len(skill) <= 30}
+    for _, text in resume.section_texts():
+        for match in _TECH_TERM.finditer(text):
+            terms.setdefault(match.group(1), None)
+    return list(terms)[:_GLOSSARY_LIMIT]
+
+
+def should_chunk_translation(resume_content: str, mode: str = TRANSLATION_MODE) -> bool:
+    if mode == "chunked":
+        return True
+    if mode == "single":
+        return False
+    # Chunk long resumes for latency, and any whose translation would not fit max_tokens
+    return (
+        len(resume_content) > TRANSLATION_CHUNK_THRESHOLD_CHARS
+        or exceeds_output_budget("translate", resume_content, get_model_profile("translate"))
+    )
+
+
+def translate_sections(
+    resume_content: str,
+    target_language: str,
+    user_query: str,
+    max_concurrency: int = TRANSLATION_SECTION_CONCURRENCY,
+) -> str:
+    """
+    Translate a resume section by section in parallel and reassemble it
+
+    Each section is translated with the same glossary of technical terms so
+    terminology stays consistent; wall-clock time is roughly that of the
+    slowest section.
+    """
+    chunks = [(section, text) for section, text in structured_resume(resume_content).section_texts() if text.strip()]
+    glossary = build_translation_glossary(resume_content)
+    glossary_text = ", ".join(glossary) if glossary else "(none)"
+
+    responses = section_translate_chain().batch(
+        [
+            {
+                "section_name": section,
+                "resume_content": text,
+                "user_query": user_query,
+                "target_language": target_language,
+                "glossary": glossary_text
+            }
+            for section, text in chunks
+        ],
+        max_concurrency=max_concurrency,
+    )
+    for (section, _), response in zip(chunks, responses):
+        if not response.translated_content:
+            raise ValueError(f"Invalid response: missing translated_content for {section}")
+    return "\n\n".join(response.translated_content.strip() for response in responses)
+
+
+def translate_resume(resume_content: str, target_language: str, user_query: str, mode: str = TRANSLATION_MODE) -> str:
+    """Translate a resume in one call, or section by section for long resumes"""
+    if should_chunk_translation(resume_content, mode) and len(structured_resume(resume_content).sections) > 1:
+        return translate_sections(resume_content, target_language, user_query)
+
+    response = translate_chain().invoke({
+        "resume_content": resume_content,
+        "user_query": user_query,
+        "target_language": target_language
+    })
+    if not response.translated_content:
+        raise ValueError("Invalid response: missing translated_content")
+    return response.translated_content
+
+
+def translation_cache_key(resume_content: str, language: str, instructions: str = "") -> tuple:
+    key = ("translation", content_hash(resume_content), language)
+    if instructions:
+        key += (content_hash(instructions),)
+    return key
+
+
+async def translate_to_languages(
+    resume_content: str,
+    languages: List[str],
+    instructions: str = "",
+    max_concurrency: int = TRANSLATION_MAX_CONCURRENCY,
+) -> AsyncIterator[dict]:
+    """
+    Translate a resume into several languages concurrently
+
+    Args:
+        resume_content: Resume text to translate
+        languages: Target languages (names or aliases, duplicates ignored)
+        instructions: Optional extra instructions passed as the user request
+        max_concurrency: Maximum translations running at once
+
+    Yields:
+        dict: One result per language in completion order, with either
+        translated_content or error
+    """
+    targets = list(dict.fromkeys(normalize_language(lang) for lang in languages if lang.strip()))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def translate_one(language: str) -> dict:
+        result = {"language": language, "language_name": language_display_name(language)}
+        cache_key = translation_cache_key(resume_content, language, instructions)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return {**result, "success": True, "cached": True, "translated_content": cached}
+
+        async with semaphore:
+            try:
+                translated = await asyncio.to_thread(
+                    translate_resume,
+                    resume_content,
+                    language,
+                    instructions or f"Translate this resume to {language_display_name(language)}"
+                )
+            except Exception as e:
+                return {**result, "success": False, "error": str(e)}
+
+        response_cache.set(cache_key, translated)
+        return {**result, "success": True, "cached": False, "translated_content": translated}
+
+    tasks = [asyncio.create_task(translate_one(language)) for language in targets]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Stop outstanding work if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
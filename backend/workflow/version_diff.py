@@ -0,0 +1,84 @@
+"""Resume version comparison.
+
+Diffs two versions from the resume store by version id (content hash), so
+clients send two ids instead of two documents and get back an edit script
+to render. Results are cached per version pair and granularity; versions
+are immutable, so an entry never goes stale.
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from utils.resume_store import get_resume, get_structured_resume
+from utils.text_diff import diff_stats, diff_texts, elide_unchanged
+from workflow.response_cache import response_cache
+
+DIFF_GRANULARITIES = ("word", "line")
+
+
+def _section_starts(version_id: str) -> tuple:
+    """Start offsets and names of a version's sections"""
+    structured = get_structured_resume(version_id)
+    starts, names, offset = [], [], 0
+    for section in structured.sections if structured else []:
+        starts.append(offset)
+        names.append(section.name)
+        offset += len(section.text) + 1  # sections are joined with "\n"
+    return starts, names
+
+
+def section_changes(ops: List[list], old_id: str, new_id: str) -> Dict[str, dict]:
+    """Words deleted and inserted per resume section (by the section the change starts in)"""
+    old_starts, old_names = _section_starts(old_id)
+    new_starts, new_names = _section_starts(new_id)
+    changes: Dict[str, dict] = {}
+    old_pos = new_pos = 0
+    for tag, text in ops:
+        if tag == "-" and old_names:
+            name = old_names[max(0, bisect_right(old_starts, old_pos) - 1)]
+            changes.setdefault(name, {"deleted_words": 0, "inserted_words": 0})["deleted_words"] += len(text.split())
+        elif tag == "+" and new_names:
+            name = new_names[max(0, bisect_right(new_starts, new_pos) - 1)]
+            changes.setdefault(name, {"deleted_words": 0, "inserted_words": 0})["inserted_words"] += len(text.split())
+        if tag in ("=", "-"):
+            old_pos += len(text)
+        if tag in ("=", "+"):
+            new_pos += len(text)
+    return changes
+
+
+def diff_versions(old_id: str, new_id: str, granularity: str = "word", context: Optional[int] = None) -> Optional[dict]:
+    """
+    Compare two stored resume versions
+
+    Args:
+        old_id: Version id of the earlier resume
+        new_id: Version id of the later resume
+        granularity: "word" or "line"
+        context: Lines of unchanged text kept around each change (None keeps all)
+
+    Returns:
+        Optional[dict]: ops ([tag, text] edit script, see utils.text_diff),
+        word stats and per-section changes; None if a version is not stored
+    """
+    cache_key = ("diff", old_id, new_id, granularity)
+    diff = response_cache.get(cache_key)
+    if diff is None:
+        old, new = get_resume(old_id), get_resume(new_id)
+        if old is None or new is None:
+            return None
+        ops = diff_texts(old["content"], new["content"], granularity)
+        diff = {
+            "ops": ops,
+            "stats": diff_stats(ops),
+            "sections": section_changes(ops, old_id, new_id),
+        }
+        response_cache.set(cache_key, diff)
+
+    return {
+        "old_version": old_id,
+        "new_version": new_id,
+        "granularity": granularity,
+        "stats": diff["stats"],
+        "sections": diff["sections"],
+        "ops": diff["ops"] if context is None else elide_unchanged(diff["ops"], context),
+    }
@@ -23,8 +23,9 @@ import ReactMarkdown from 'react-markdown';
 
 import { sessionManager, SessionData } from './utils/sessionManager';
 import { apiService, fileUtils, connectionChecker } from './services/api';
-import { parseAgentResponse } from './utils/responseParser';
+import { parseAgentResponse, describeResumeVersion } from './utils/responseParser';
 import StructuredResponse from './components/StructuredResponse';
+import VersionDiff from './components/VersionDiff';
 
 function App() {
   // State management
@@ -88,7 +89,8 @@ function App() {
           response.content,
           `Original resume from ${file.name}`,
           [],
-          'upload'
+          'upload',
+          response.version_id || undefined
         );
         setSession(updatedSession);
         setSuccess('Resume uploaded successfully!');
@@ -156,11 +158,27 @@ function App() {
           updatedSession,
           'assistant',
           response.response,
-          response.intent
+          response.intent,
+          response.result || undefined
         );
 
+        // The structured result carries the new resume version directly
+        const result = response.result;
+        if (result && result.resume_output) {
+          const version = describeResumeVersion(result, userMessage);
+          updatedSession = sessionManager.addResumeVersion(
+            updatedSession,
+            result.resume_output,
+            version.description,
+            version.changes,
+            response.intent,
+            result.resume_version || undefined
+          );
+        }
+        const legacyResponse = !result;
+
         // If it's an enhancement, try to extract and save new version
-        if (response.intent === 'enhancement' && response.response.includes('Enhanced Content:')) {
+        if (legacyResponse && response.intent === 'enhancement' && response.response.includes('Enhanced Content:')) {
           try {
             const enhancedContent = response.response
               .split('Enhanced Content:')[1]
@@ -182,7 +200,7 @@ function App() {
         }
 
         // If it's a translation, extract and save new version
-        if (response.intent === 'translation' && response.response.includes('--- TRANSLATED RESUME ---')) {
+        if (legacyResponse && response.intent === 'translation' && response.response.includes('--- TRANSLATED RESUME ---')) {
           try {
             const translatedContent = response.response
               .split('--- TRANSLATED RESUME ---')[1]
@@ -207,7 +225,7 @@ function App() {
         }
 
         // If it's job matching with optimized resume, extract and save new version
-        if (response.intent === 'job_matching' && response.response.includes('--- JOB-OPTIMIZED RESUME ---')) {
+        if (legacyResponse && response.intent === 'job_matching' && response.response.includes('--- JOB-OPTIMIZED RESUME ---')) {
           try {
             const optimizedContent = response.response
               .split('--- JOB-OPTIMIZED RESUME ---')[1]
@@ -228,7 +246,7 @@ function App() {
         }
 
         // If it's company research with optimized resume, extract and save new version
-        if (response.intent === 'company_research' && response.response.includes('--- COMPANY-OPTIMIZED RESUME ---')) {
+        if (legacyResponse && response.intent === 'company_research' && response.response.includes('--- COMPANY-OPTIMIZED RESUME ---')) {
           try {
             const optimizedContent = response.response
               .split('--- COMPANY-OPTIMIZED RESUME ---')[1]
@@ -581,7 +599,7 @@ function App() {
                               
                               {message.role === 'assistant' ? (
                                 <StructuredResponse 
-                                  parsedResponse={parseAgentResponse(message.content, message.intent)} 
+                                  parsedResponse={parseAgentResponse(message.content, message.intent, message.result)} 
                                 />
                               ) : (
                                 <div className="message-bubble">
@@ -757,6 +775,14 @@ function App() {
                       exit={{ opacity: 0, x: -20 }}
                     >
                       {session.resumeVersions.length > 1 ? (
+                        <>
+                        <div style={{ marginBottom: '24px' }}>
+                          <VersionDiff
+                            key={session.resumeVersions.slice(-2).map(version => version.id).join(':')}
+                            oldVersion={session.resumeVersions[session.resumeVersions.length - 2]}
+                            newVersion={session.resumeVersions[session.resumeVersions.length - 1]}
+                          />
+                        </div>
                         <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(300px, 1fr))', gap: '24px' }}>
                           {session.resumeVersions.slice(-2).map((version, index) => (
                             <motion.div
@@ -797,6 +823,7 @@ function App() {
                             </motion.div>
                           ))}
                         </div>
+                        </>
                       ) : (
                         <div className="welcome">
                           <History size={64} style={{ color: '#d1d5db', margin: '0 auto 16px' }} />
@@ -0,0 +1,122 @@
+import React, { useEffect, useState } from 'react';
+import { GitCompare, Loader2 } from 'lucide-react';
+import { apiService, ResumeDiff } from '../services/api';
+import { ResumeVersion } from '../utils/sessionManager';
+
+interface VersionDiffProps {
+  oldVersion: ResumeVersion;
+  newVersion: ResumeVersion;
+}
+
+// Unchanged lines shown around each change
+const DIFF_CONTEXT_LINES = 3;
+
+// Versions saved before the server returned ids are stored on demand
+const versionId = async (version: ResumeVersion, signal: AbortSignal, reuse = true): Promise<string> =>
+  (reuse && version.versionId) || apiService.storeResumeVersion(version.content, signal);
+
+const loadDiff = async (oldVersion: ResumeVersion, newVersion: ResumeVersion, signal: AbortSignal, reuse: boolean) => {
+  const [oldId, newId] = await Promise.all([
+    versionId(oldVersion, signal, reuse),
+    versionId(newVersion, signal, reuse),
+  ]);
+  return apiService.diffVersions(oldId, newId, { granularity: 'word', context: DIFF_CONTEXT_LINES }, signal);
+};
+
+const VersionDiff: React.FC<VersionDiffProps> = ({ oldVersion, newVersion }) => {
+  const [diff, setDiff] = useState<ResumeDiff | null>(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    setLoading(true);
+    setDiff(null);
+
+    (async () => {
+      try {
+        let result: ResumeDiff;
+        try {
+          result = await loadDiff(oldVersion, newVersion, controller.signal, true);
+        } catch (error) {
+          // Stored versions expire server-side; store the content again and retry once
+          if (controller.signal.aborted || !(oldVersion.versionId || newVersion.versionId)) {
+            throw error;
+          }
+          result = await loadDiff(oldVersion, newVersion, controller.signal, false);
+        }
+        setDiff(result);
+      } catch (error) {
+        // The side-by-side view below still shows both versions
+        if (!controller.signal.aborted) {
+          console.warn('Could not load version diff:', error);
+        }
+      } finally {
+        if (!controller.signal.aborted) {
+          setLoading(false);
+        }
+      }
+    })();
+
+    return () => controller.abort();
+  }, [oldVersion, newVersion]);
+
+  if (loading) {
+    return (
+      <div className="card" style={{ display: 'flex', alignItems: 'center', gap: '8px', color: '#6b7280' }}>
+        <Loader2 size={16} className="animate-spin" />
+        <span>Comparing versions...</span>
+      </div>
+    );
+  }
+
+  if (!diff) {
+    return null;
+  }
+
+  const { stats } = diff;
+  return (
+    <div className="card">
+      <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginBottom: '12px' }}>
+        <h4 style={{ fontWeight: '600', display: 'flex', alignItems: 'center', gap: '8px' }}>
+          <GitCompare size={16} style={{ color: '#3b82f6' }} />
+          Changes
+        </h4>
+        <span style={{ fontSize: '12px', color: '#6b7280' }}>
+          {stats.deleted_words} words removed, {stats.inserted_words} added ({Math.round(stats.similarity * 100)}% similar)
+        </span>
+      </div>
+      <div style={{
+        background: '#f9fafb',
+        borderRadius: '8px',
+        padding: '16px',
+        maxHeight: '600px',
+        overflowY: 'auto',
+        border: '1px solid #e5e7eb',
+        fontSize: '14px',
+        lineHeight: '1.6',
+        whiteSpace: 'pre-wrap',
+        color: '#374151'
+      }} className="custom-scrollbar">
+        {diff.ops.map((op, index) => {
+          if (op[0] === '~') {
+            return (
+              <div key={index} style={{ color: '#9ca3af', fontStyle: 'italic', margin: '4px 0' }}>
+                … {op[1]} unchanged lines …
+              </div>
+            );
+          }
+          const [tag, text] = op;
+          if (tag === '-') {
+            return <del key={index} style={{ background: '#fee2e2', color: '#991b1b' }}>{text}</del>;
+          }
+          if (tag === '+') {
+            return <ins key={index} style={{ background: '#dcfce7', color: '#166534', textDecoration: 'none' }}>{text}</ins>;
+          }
+          return <span key={index}>{text}</span>;
+        })}
+      </div>
+    </div>
+  );
+};
+
+export default VersionDiff;
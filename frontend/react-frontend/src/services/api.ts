@@ -39,6 +39,33 @@ export interface UploadResponse {
   content: string;
   sections: Record<string, string>;
   session_id: string;
+  speculating?: boolean;
+  version_id?: string | null;
+  structured?: StructuredResume | null;
+}
+
+// Resume fields parsed once per version (see backend utils/resume_structure.py)
+export interface ResumeEntry {
+  title?: string | null;
+  organization?: string | null;
+  location?: string | null;
+  start?: string | null;
+  end?: string | null;
+  bullets: string[];
+  header: string;
+}
+
+export interface StructuredResume {
+  version_id: string;
+  structure_version: number;
+  contact: { name?: string | null; email?: string | null; phone?: string | null; links: string[] };
+  summary: string;
+  experience: ResumeEntry[];
+  education: ResumeEntry[];
+  projects: ResumeEntry[];
+  skills: string[];
+  keywords: Record<string, { category: string; count: number }>;
+  sections: { name: string; header?: string | null; text: string }[];
 }
 
 export interface ChatRequest {
@@ -46,13 +73,49 @@ export interface ChatRequest {
   session_id?: string;
   message: string;
   resume_content?: string;
+  include_text?: boolean;
+}
+
+// Matches AgentResult in backend/workflow/models.py (schema_version 1)
+export interface AgentResult {
+  type: 'job_matching' | 'enhancement' | 'company_research' | 'translation' | 'multi' | string;
+  data: Record<string, any>;
+  resume_output?: string | null;
+  resume_version?: string | null;
+  error?: string | null;
+  steps: AgentResult[];
 }
 
 export interface ChatResponse {
   success: boolean;
+  schema_version?: number;
   response: string;
   intent: string;
   session_id?: string;
+  result?: AgentResult | null;
+  memory?: MemoryUsage | null;
+}
+
+// Conversation memory kept for the session (see backend workflow/memory.py)
+export interface MemoryUsage {
+  recent_turns: number;
+  summarized_turns: number;
+  summary_tokens: number;
+  history_tokens: number;
+  budget_tokens: number;
+}
+
+// Server-side version comparison (see backend utils/text_diff.py)
+// ops: ['=', text] unchanged, ['-', text] deleted, ['+', text] inserted, ['~', n] n unchanged lines skipped
+export type DiffOp = ['=' | '-' | '+', string] | ['~', number];
+
+export interface ResumeDiff {
+  old_version: string;
+  new_version: string;
+  granularity: 'word' | 'line';
+  stats: { unchanged_words: number; deleted_words: number; inserted_words: number; similarity: number };
+  sections: Record<string, { deleted_words: number; inserted_words: number }>;
+  ops: DiffOp[];
 }
 
 export interface LaTeXDownloadRequest {
@@ -95,6 +158,26 @@ export const apiService = {
     return response.data;
   },
 
+  // Store a resume version (e.g. a manual edit) and get its version id
+  async storeResumeVersion(content: string, signal?: AbortSignal): Promise<string> {
+    const response = await api.post<{ version_id: string }>('/resumes', { content }, { signal });
+    return response.data.version_id;
+  },
+
+  // Diff two stored versions; context limits unchanged lines around each change
+  async diffVersions(
+    oldVersion: string,
+    newVersion: string,
+    options: { granularity?: 'word' | 'line'; context?: number } = {},
+    signal?: AbortSignal
+  ): Promise<ResumeDiff> {
+    const response = await api.get<ResumeDiff>('/resumes/diff', {
+      params: { old: oldVersion, new: newVersion, ...options },
+      signal,
+    });
+    return response.data;
+  },
+
   // Download professional PDF
   async downloadProfessionalPDF(request: LaTeXDownloadRequest, signal?: AbortSignal): Promise<Blob> {
     const response = await api.post('/download-latex-pdf', request, {
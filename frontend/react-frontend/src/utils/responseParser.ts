@@ -1,4 +1,5 @@
 // Utility functions for parsing and formatting agent responses
+import { AgentResult } from '../services/api';
 
 export interface ParsedResponse {
   type: 'enhancement' | 'job_matching' | 'company_research' | 'translation' | 'general';
@@ -13,7 +14,13 @@ export interface ResponseSection {
   data?: any;
 }
 
-export function parseAgentResponse(content: string, intent?: string): ParsedResponse {
+export function parseAgentResponse(content: string, intent?: string, result?: AgentResult): ParsedResponse {
+  // Servers with the structured contract send the typed payload: no text parsing needed.
+  // The text parsers below remain for messages saved before it existed.
+  if (result) {
+    return buildFromAgentResult(result);
+  }
+
   const sections: ResponseSection[] = [];
   let enhancedResume: string | undefined;
 
@@ -231,3 +238,115 @@ function extractTranslatedResume(content: string): string | undefined {
   const match = content.match(/--- TRANSLATED RESUME ---\s*([\s\S]*?)$/);
   return match ? match[1].trim() : content; // Fallback to full content if no marker found
 }
+
+const RESPONSE_TYPES: ParsedResponse['type'][] = ['enhancement', 'job_matching', 'company_research', 'translation'];
+
+function listSection(title: string, items?: string[]): ResponseSection[] {
+  return items && items.length
+    ? [{ title, content: items.map(item => `• ${item}`).join('\n'), type: 'list' }]
+    : [];
+}
+
+export function buildFromAgentResult(result: AgentResult): ParsedResponse {
+  const enhancedResume = result.resume_output || undefined;
+
+  if (result.type === 'multi') {
+    // One group of sections per plan step, in plan order
+    const sections = result.steps.flatMap((step, index) =>
+      buildFromAgentResult(step).sections.map(section => ({
+        ...section,
+        title: `Step ${index + 1}: ${section.title}`
+      }))
+    );
+    return { type: 'general', sections, enhancedResume };
+  }
+
+  const type = RESPONSE_TYPES.includes(result.type as ParsedResponse['type'])
+    ? (result.type as ParsedResponse['type'])
+    : 'general';
+  if (result.error) {
+    return { type, sections: [{ title: 'Error', content: result.error, type: 'text' }] };
+  }
+
+  const data = result.data || {};
+  const sections: ResponseSection[] = [];
+  if (type === 'enhancement') {
+    sections.push({ title: 'Enhanced Resume', content: data.enhanced_content || '', type: 'resume' });
+    sections.push(...listSection('Changes Made', data.changes_made));
+    sections.push({
+      title: 'Impact Score',
+      content: `${data.impact_score}/10`,
+      type: 'score',
+      data: { score: data.impact_score, maxScore: 10 }
+    });
+  } else if (type === 'job_matching') {
+    sections.push({
+      title: 'Match Score',
+      content: `${data.match_score}%`,
+      type: 'score',
+      data: { score: data.match_score, maxScore: 100 }
+    });
+    sections.push(...listSection('Key Strengths', data.key_strengths));
+    sections.push(...listSection('Skill Gaps', data.skill_gaps));
+    sections.push(...listSection('Recommendations', data.recommendations));
+  } else if (type === 'company_research') {
+    const insights = data.company_insights || {};
+    sections.push({
+      title: 'Company Insights',
+      content: JSON.stringify(insights),
+      type: 'insights',
+      data: {
+        culture: insights.culture || 'N/A',
+        techStack: insights.tech_stack || 'N/A',
+        values: insights.values || 'N/A',
+        hiringFocus: insights.hiring_focus || 'N/A'
+      }
+    });
+    sections.push({ title: 'Optimization Strategy', content: data.optimization_strategy || '', type: 'text' });
+    sections.push(...listSection('Key Alignments', data.key_alignments));
+  } else if (type === 'translation') {
+    const language = data.language_name || 'Target Language';
+    sections.push({
+      title: 'Translation Summary',
+      content: `Your resume has been successfully translated to ${language} with cultural adaptations for the local job market.`,
+      type: 'text'
+    });
+    sections.push({
+      title: `Translated Resume (${language})`,
+      content: data.translated_content || '',
+      type: 'resume',
+      data: { language: data.target_language }
+    });
+  }
+
+  return { type, sections, enhancedResume };
+}
+
+// Description and change list for the resume version a result produces
+export function describeResumeVersion(result: AgentResult, userMessage: string): { description: string; changes: string[] } {
+  const data = result.data || {};
+  switch (result.type) {
+    case 'enhancement':
+      return { description: `Enhanced: ${userMessage.substring(0, 50)}...`, changes: data.changes_made || [] };
+    case 'translation':
+      return {
+        description: `Translated to ${data.language_name}`,
+        changes: [`Resume translated to ${data.language_name}`, 'Cultural adaptations applied', 'Professional formatting maintained']
+      };
+    case 'job_matching':
+      return {
+        description: `Job-optimized: ${userMessage.substring(0, 50)}...`,
+        changes: ['Resume optimized for job requirements', 'Keywords and skills aligned', 'ATS compatibility improved']
+      };
+    case 'company_research':
+      return {
+        description: `Optimized for ${data.company_name || 'Target Company'}`,
+        changes: [`Resume tailored for ${data.company_name || 'Target Company'}`, 'Company culture alignment', 'Tech stack and values matched']
+      };
+    default:
+      return {
+        description: `${result.steps.map(step => step.type.replace('_', ' ')).join(' + ')}: ${userMessage.substring(0, 50)}...`,
+        changes: result.steps.flatMap(step => describeResumeVersion(step, userMessage).changes)
+      };
+  }
+}
@@ -1,3 +1,5 @@
+import { AgentResult } from '../services/api';
+
 export interface ResumeVersion {
   id: string;
   content: string;
@@ -5,6 +7,7 @@ export interface ResumeVersion {
   timestamp: string;
   changes: string[];
   intent?: string;
+  versionId?: string; // Server-side resume version, used for diffs
 }
 
 export interface ChatMessage {
@@ -13,6 +16,7 @@ export interface ChatMessage {
   content: string;
   timestamp: string;
   intent?: string;
+  result?: AgentResult;
 }
 
 export interface SessionData {
@@ -104,7 +108,7 @@ class SessionManager {
   }
 
   // Add new resume version
-  addResumeVersion(session: SessionData, content: string, description: string, changes: string[] = [], intent?: string): SessionData {
+  addResumeVersion(session: SessionData, content: string, description: string, changes: string[] = [], intent?: string, versionId?: string): SessionData {
     const newVersion: ResumeVersion = {
       id: this.generateId(),
       content,
@@ -112,6 +116,7 @@ class SessionManager {
       timestamp: new Date().toISOString(),
       changes,
       intent,
+      versionId,
     };
 
     const updatedSession = {
@@ -153,13 +158,14 @@ class SessionManager {
   }
 
   // Add chat message
-  addMessage(session: SessionData, role: 'user' | 'assistant', content: string, intent?: string): SessionData {
+  addMessage(session: SessionData, role: 'user' | 'assistant', content: string, intent?: string, result?: AgentResult): SessionData {
     const newMessage: ChatMessage = {
       id: this.generateId(),
       role,
       content,
       timestamp: new Date().toISOString(),
       intent,
+      result,
     };
 
     const updatedSession = {
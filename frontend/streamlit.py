@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 import uuid
 from datetime import datetime
 import io
+import html
 
 # Configure Streamlit page
 st.set_page_config(
@@ -68,6 +69,16 @@ def send_chat_message(message: str, resume_content: str = "") -> Optional[Dict]:
         st.error(f"Error sending message: {str(e)}")
         return None
 
+def store_resume_version(content: str) -> Optional[str]:
+    """Store a version on the backend and return its version id (used for server-side diffs)"""
+    try:
+        response = requests.post(f"{API_BASE_URL}/resumes", json={"content": content}, timeout=10)
+        if response.status_code == 200:
+            return response.json()["version_id"]
+    except Exception:
+        pass
+    return None
+
 def save_resume_version(content: str, description: str):
     """Save a new version of the resume"""
     version = {
@@ -75,7 +86,8 @@ def save_resume_version(content: str, description: str):
         "content": content,
         "description": description,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "changes": []
+        "changes": [],
+        "version_id": store_resume_version(content)
     }
     st.session_state.resume_versions.append(version)
     st.session_state.current_version = len(st.session_state.resume_versions) - 1
@@ -88,12 +100,55 @@ def display_typing_indicator():
         time.sleep(0.5)
     placeholder.empty()
 
+def fetch_version_diff(old_id: str, new_id: str) -> Optional[Dict]:
+    """Word-level diff of two stored versions, with 2 lines of context around changes"""
+    try:
+        response = requests.get(
+            f"{API_BASE_URL}/resumes/diff",
+            params={"old": old_id, "new": new_id, "granularity": "word", "context": 2},
+            timeout=30
+        )
+        if response.status_code == 200:
+            return response.json()
+    except Exception:
+        pass
+    return None
+
+def render_diff_ops(ops: List) -> str:
+    """HTML for a diff edit script: deletions struck through, insertions highlighted"""
+    parts = []
+    for tag, payload in ops:
+        if tag == "~":
+            parts.append(f'<div style="color:#9ca3af;">⋯ {payload} unchanged lines ⋯</div>')
+            continue
+        text = html.escape(payload)
+        if tag == "-":
+            text = f'<del style="background:#fee2e2;color:#991b1b;">{text}</del>'
+        elif tag == "+":
+            text = f'<ins style="background:#dcfce7;color:#166534;text-decoration:none;">{text}</ins>'
+        parts.append(text)
+    return '<div style="white-space:pre-wrap;font-family:monospace;font-size:13px;">' + "".join(parts) + "</div>"
+
 def compare_resume_versions(version1_idx: int, version2_idx: int):
     """Compare two resume versions"""
     if version1_idx < len(st.session_state.resume_versions) and version2_idx < len(st.session_state.resume_versions):
         v1 = st.session_state.resume_versions[version1_idx]
         v2 = st.session_state.resume_versions[version2_idx]
         
+        diff = None
+        if v1.get("version_id") and v2.get("version_id"):
+            diff = fetch_version_diff(v1["version_id"], v2["version_id"])
+        if diff:
+            stats = diff["stats"]
+            st.caption(
+                f"Version {version1_idx + 1} → Version {version2_idx + 1}: "
+                f"{stats['deleted_words']} words removed, {stats['inserted_words']} added "
+                f"({stats['similarity']:.0%} similar)"
+            )
+            st.markdown(render_diff_ops(diff["ops"]), unsafe_allow_html=True)
+            return
+        
+        # Versions not stored on the backend: show them side by side
         col1, col2 = st.columns(2)
         
         with col1:
@@ -139,6 +194,34 @@ def download_professional_pdf(resume_content: str):
         st.error(f"❌ Error generating professional PDF: {str(e)}")
         st.info("💡 You can still download the text version and format it manually.")
 
+def export_all_versions():
+    """Export every resume version as professional PDFs in one zip archive"""
+    try:
+        with st.spinner(f"🎓 Generating {len(st.session_state.resume_versions)} PDFs... This may take a moment."):
+            payload = {
+                "versions": [
+                    {"name": f"professional_resume_v{i + 1}", "content": v["content"]}
+                    for i, v in enumerate(st.session_state.resume_versions)
+                ],
+                "filename": "resume_versions"
+            }
+            
+            response = requests.post(f"{API_BASE_URL}/export-versions", json=payload)
+            
+            if response.status_code == 200:
+                st.download_button(
+                    label="📥 Download All Versions (ZIP)",
+                    data=response.content,
+                    file_name="resume_versions.zip",
+                    mime="application/zip"
+                )
+                st.success("✅ All versions exported successfully!")
+            else:
+                st.error(f"❌ Failed to export versions: {response.text}")
+                
+    except Exception as e:
+        st.error(f"❌ Error exporting versions: {str(e)}")
+
 # Main UI Layout
 st.title("📄 Resume Optimization Assistant")
 st.markdown("Upload your resume and get AI-powered optimization suggestions!")
@@ -366,6 +449,10 @@ else:
         with col3:
             if st.button("🎓 Download Professional PDF", use_container_width=True, key="download_latex_pdf_btn"):
                 download_professional_pdf(st.session_state.resume_content)
+        
+        if len(st.session_state.resume_versions) > 1:
+            if st.button("🗂️ Export All Versions as PDFs", use_container_width=True, key="export_all_versions_btn"):
+                export_all_versions()
     
     with tab3:
         st.header("🔍 Version Comparison")